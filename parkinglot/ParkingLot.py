@@ -9,13 +9,28 @@ Created on Wed Jul  4 09:14:28 2018
 
 #%%  vehicle
 
-from random import shuffle
+import sys
+import os
+from array import array
+from collections import Counter, defaultdict, deque
+from heapq import heapify, heappop, heappush
+
+import numpy as np
+
+# Add the current directory to the path to import the lot's own modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from allocation_policies import POLICIES, AllocationPolicy, FirstFit
+from parking_events import NullSink
+from parking_snapshot import number_vehicles, read_snapshot, write_snapshot
 
 class Vehicle:
+    __slots__ = ('_car_type', '_wheel_num', '_size')
        
     def __init__(self,wheel_num,car_type):
         self._car_type = car_type
         self._wheel_num = wheel_num
+        # size class = smallest spot size the vehicle fits in (wheels/2 rounded up)
+        self._size = -(-wheel_num // 2)
 
     # getters       
     def getType(self):
@@ -24,63 +39,391 @@ class Vehicle:
     def getWheelNum(self):
         return self._wheel_num
 
+    def getSize(self):
+        return self._size
+
 class Motorcycle(Vehicle): 
+        __slots__ = ()
+
         def __init__(self):
             Vehicle.__init__(self,2,'MOTORCYCLE')
 
 class Car(Vehicle):  
+        __slots__ = ()
+
         def __init__(self):
             Vehicle.__init__(self,4,'CAR')
             
 class Bus(Vehicle):  
+        __slots__ = ()
+
         def __init__(self):
             Vehicle.__init__(self,6,'BUS')
 
+VEHICLE_BY_SIZE = {1: Motorcycle, 2: Car, 3: Bus}
+# (size class, type) of the vehicle classes that fix both
+VEHICLE_KINDS = {vehicle_class: (vehicle_class()._size, vehicle_class()._car_type)
+                 for vehicle_class in VEHICLE_BY_SIZE.values()}
+
+# a wave of vehicles as arrays: the vehicles (an object array), the size of
+# each and the code of its type, plus the type names by code. One type() per
+# vehicle describes Motorcycles, Cars and Buses, the size and type of any
+# other Vehicle are read one by one
+def wave_arrays(vehicles):
+    vehicles_sz = len(vehicles)
+    vehicles = np.fromiter(vehicles, dtype=object, count=vehicles_sz)
+    class_codes = defaultdict(lambda: len(class_codes))
+    classes = np.fromiter(map(class_codes.__getitem__, map(type, vehicles)), dtype=np.intp, count=vehicles_sz)
+    type_codes = defaultdict(lambda: len(type_codes))
+    sizes = np.empty(vehicles_sz, dtype=np.int64)
+    types = np.empty(vehicles_sz, dtype=np.intp)
+    for code, vehicle_class in enumerate(class_codes):
+        members = classes == code
+        if vehicle_class in VEHICLE_KINDS:
+            size, vehicle_type = VEHICLE_KINDS[vehicle_class]
+            sizes[members] = size
+            types[members] = type_codes[vehicle_type]
+        else:
+            others = vehicles[members]
+            sizes[members] = [vehicle._size for vehicle in others]
+            types[members] = [type_codes[vehicle._car_type] for vehicle in others]
+    return vehicles, sizes, types, list(type_codes)
+
+# a new instance of the policy of that name in allocation_policies.POLICIES
+def policy_named(name):
+    if name not in POLICIES:
+        raise ValueError(f"unknown parking policy: {name}")
+    return POLICIES[name]()
+
+#%% display cells
+
+SPOTS_PER_ROW = 20
+SPOT_BRACKETS = {1: "()", 2: "[]", 3: "{}"}
+VEHICLE_LETTERS = {None: " ", "MOTORCYCLE": "M", "CAR": "C", "BUS": "B"}
+# (spot size, parked vehicle type or None) -> the spot's display cell
+SPOT_CELLS = {(spot_size, vehicle_type): f" {brackets[0]}{letter}{brackets[1]}"
+              for spot_size, brackets in SPOT_BRACKETS.items()
+              for vehicle_type, letter in VEHICLE_LETTERS.items()}
+LEGEND = ("Legend: ( )=Small spot, [ ]=Medium spot, { }=Big spot\n"
+          "        M=Motorcycle, C=Car, B=Bus")
+
+# display cell of spot sizes / vehicle types that are not in the table
+def spot_cell(spot_size, vehicle):
+    brackets = SPOT_BRACKETS.get(spot_size, "[]")
+    letter = " " if vehicle is None else VEHICLE_LETTERS.get(vehicle.getType(), "?")
+    return f" {brackets[0]}{letter}{brackets[1]}"
+
 #%% parking lot
 class ParkingLot:
+
+    # event sink (see parking_events.py) - None means nothing is reported
+    _sink = None
+    # write-ahead journal (see parking_journal.py) - None means no journal
+    _journal = None
+    # allocation policy of arrivals (see allocation_policies.py)
+    _policy = FirstFit()
+    # where the spots and entrances are (see lot_layout.py) - None means no geography
+    _layout = None
     
-    def __init__(self,small_spot_sz, med_spot_sz,big_spot_sz):          
-        self._vehicle_set = []
-        self._total_spots = self.generateOpenSpots(small_spot_sz, med_spot_sz,big_spot_sz)
+    # rng    - a seed, numpy.random.Generator or random.Random to shuffle the spots
+    #          with (default: drawn from the random module) - see lot_generation.py
+    # layout - a LotLayout with the coordinates of the spots and the entrances
+    def __init__(self,small_spot_sz, med_spot_sz,big_spot_sz, rng=None, layout=None):          
+        # parked vehicles, each mapped to the index of its spot
+        self._vehicle_spots = {}
+        self._layout = layout
+        self._total_spots = self.generateOpenSpots(small_spot_sz, med_spot_sz,big_spot_sz, rng)
 
     # creat a parking lot with X1 small spots, x2 medium spots and x3 big spots    
-    def generateOpenSpots(self,small_spot_sz, med_spot_sz,big_spot_sz):
-        self._total_spots = []   
-
-        for i in range(small_spot_sz):
-            self._total_spots.append(SmallSpot())
-        for i in range(med_spot_sz):
-            self._total_spots.append(MedSpot())
-        for i in range(big_spot_sz):
-            self._total_spots.append(BigSpot())
-            
-        shuffle(self._total_spots)         
+    def generateOpenSpots(self,small_spot_sz, med_spot_sz,big_spot_sz, rng=None):
+        # the same shuffled sizes as ArrayParkingLot for the same rng, then
+        # create the spots in one pass (imported here - lot_generation imports us)
+        from lot_generation import generate_spot_sizes
+        spot_sizes = generate_spot_sizes(small_spot_sz, med_spot_sz, big_spot_sz, rng).tolist()
+        self._total_spots = [SPOT_BY_SIZE[spot_size]() for spot_size in spot_sizes]
+        self._build_free_index()
         return self._total_spots
-      
+
+    # index the open spots by size class - one FreeSpots heap per size.
+    # the first open spot that fits a vehicle is the smallest head among the
+    # heaps of the sizes it fits in, so an arrival never rescans the lot
+    def _build_free_index(self):
+        open_spots = {}
+        self._spot_counts = Counter()
+        for i, spot in enumerate(self._total_spots):
+            indexes = open_spots.setdefault(spot.getSpotSize(), [])
+            self._spot_counts[spot.getSpotSize()] += 1
+            if spot.is_open():
+                indexes.append(i)
+        # in ascending size order - the allocation policies rely on it
+        self._free_spots = {spot_size: FreeSpots(open_spots[spot_size]) for spot_size in sorted(open_spots)}
+        self._apply_layout()
+        self._count_parked()
+
+    # with a layout, every size class also keeps its open spots ordered by
+    # distance from each entrance (NearestFreeSpots)
+    def _apply_layout(self):
+        if self._layout is None:
+            return
+        if self._layout.getSpotsSz() != self.getTotalSpotsSz():
+            raise ValueError(f"layout has {self._layout.getSpotsSz()} spots, the lot {self.getTotalSpotsSz()}")
+        self._free_spots = {spot_size: NearestFreeSpots(free.take(len(free)), self._layout.distances)
+                            for spot_size, free in self._free_spots.items()}
+
+    # live counters: parked vehicles per spot size class and vehicle type,
+    # {spot size: Counter({vehicle type: count})}, updated on every park and
+    # unpark. Keyed by spot size first, so each size class's counter only
+    # changes together with that class's FreeSpots (under the same lock in
+    # ConcurrentParkingLot)
+    def _count_parked(self):
+        self._parked_counts = {spot_size: Counter() for spot_size in self._free_spots}
+        for vehicle, i in self._vehicle_spots.items():
+            self._parked_counts[self._spot_size_at(i)][vehicle.getType()] += 1
+
+    # storage hooks - the only places that touch the spots themselves,
+    # so another backend (see array_parking_lot.py) only has to override these
+    def _spot_size_at(self, i):
+        return self._total_spots[i].getSpotSize()
+
+    def _occupy(self, i, vehicle):
+        self._total_spots[i].park_vehicle(vehicle)
+
+    # park vehicles[k] in spot taken[k], returns the spot indexes as a list
+    # (the spots are known to fit - the slots are set without park_vehicle's check)
+    def _occupy_many(self, taken, vehicles):
+        deque(map(SET_SPOT_CAR, map(self._total_spots.__getitem__, taken), vehicles), maxlen=0)
+        return taken
+
+    def _vacate(self, i):
+        return self._total_spots[i].unpark_vehicle()
+
+    # park the vehicle in the open spot of the size class the allocation policy
+    # picks - the lowest one unless the policy takes another (by default the
+    # first open spot that fits, in lot order)
+    # returns the spot index, or -1 if the vehicle was not parked (also if it
+    # is parked already - a second spot would leak the first one)
+    def _park(self, new_vehicle, policy=None):
+        if new_vehicle in self._vehicle_spots:
+            return -1
+        policy = policy or self._policy
+        spot_size = policy.pick(self._free_spots, new_vehicle._size)
+        if spot_size is None:
+            return -1
+
+        i = policy.take(self._free_spots[spot_size])
+        self._occupy(i, new_vehicle)
+        self._parked_counts[spot_size][new_vehicle._car_type] += 1
+        if self._journal is not None:
+            self._journal.parked(i, new_vehicle._size)
+        # add car to the parkingLot cars map
+        self._vehicle_spots[new_vehicle] = i
+        return i
+
     # find next open spot and park the given car if posible
     # if there is no good spot, enter the next car
     def park_new_vec(self, new_vehicle):
-        print(f"🚗 {new_vehicle.getType()} trying to park...")
-        
-        total_spots_sz = self.getTotalSpotsSz()
-        parked = False
-        
-        for i in range(total_spots_sz):
-            if self._total_spots[i].is_open():
-                #set spot to hold the car
-                if self._total_spots[i].park_vehicle(new_vehicle):
-                    print(f"✅ {new_vehicle.getType()} parked in spot {i} (size {self._total_spots[i].getSpotSize()})")
-                    # add car to the parkingLot cars list
-                    self._vehicle_set.append(new_vehicle)
-                    parked = True
-                    break
-                else:
-                    print(f"   Spot {i} (size {self._total_spots[i].getSpotSize()}) too small for {new_vehicle.getType()}")
-        
-        if not parked:
-            print(f"❌ {new_vehicle.getType()} could not find a suitable spot!")
-        
-        return parked
+        sink = self._sink
+        if sink is None:
+            return self._park(new_vehicle) >= 0
+
+        sink.arriving(new_vehicle)
+        i = self._park(new_vehicle)
+        if sink.wants_spot_events:
+            self._report_too_small(new_vehicle, i)
+        if i < 0:
+            sink.rejected(new_vehicle)
+            return False
+        sink.parked(new_vehicle, i, self._spot_size_at(i))
+        return True
+
+    # park the given car if there is a spot for it, returns the spot index or -1.
+    # Unlike park_new_vec nothing is reported unless it parks - the caller
+    # reports its arrival once and decides when it is rejected (e.g. a
+    # vehicle waiting in the queue of parking_sim.py tries again later)
+    def try_park(self, new_vehicle):
+        i = self._park(new_vehicle)
+        sink = self._sink
+        if sink is not None and i >= 0:
+            if sink.wants_spot_events:
+                self._report_too_small(new_vehicle, i)
+            sink.parked(new_vehicle, i, self._spot_size_at(i))
+        return i
+
+    # tell the sink about every open spot before spot i (the whole lot if the
+    # vehicle was rejected) that was too small for the vehicle
+    def _report_too_small(self, vehicle, i):
+        spots = self.getAllSpots()
+        for j, spot in enumerate(spots[:i] if i >= 0 else spots):
+            if spot.is_open() and spot.getSpotSize() < vehicle.getSize():
+                self._sink.spot_too_small(vehicle, j, spot.getSpotSize())
+
+    # send the parking lot events to the given sink (None for no reporting)
+    def setEventSink(self, sink):
+        self._sink = None if isinstance(sink, NullSink) else sink
+
+    def getEventSink(self):
+        return self._sink
+
+    # how arrivals pick their spot from now on, e.g. setPolicy(ReservedQuota({3: 10}))
+    # or setPolicy('worst_fit') for a policy in allocation_policies.POLICIES
+    def setPolicy(self, policy):
+        self._policy = policy_named(policy) if isinstance(policy, str) else policy
+
+    def getPolicy(self):
+        return self._policy
+
+    # give the lot a geography (a LotLayout, None for none) - the free spot
+    # index is rebuilt, so set it before the gates open
+    def setLayout(self, layout):
+        self._layout = layout
+        self._build_free_index()
+
+    def getLayout(self):
+        return self._layout
+
+    # record every park and unpark in the given journal (None for no journal)
+    def setJournal(self, journal):
+        self._journal = journal
+
+    def getJournal(self):
+        return self._journal
+
+    # park a whole wave of arriving vehicles at once
+    # policy:
+    #   'optimal'   - maximize the number of parked vehicles: the most constrained
+    #                 vehicles (buses, then cars, then motorcycles) each take the
+    #                 smallest size class that still fits them
+    #   'best_fit'  - in arrival order, each vehicle takes the smallest size class
+    #                 that still has an open spot
+    #   'first_fit' - in arrival order, same as calling park_new_vec on each vehicle
+    #   an AllocationPolicy - in arrival order, each vehicle placed by that policy
+    # returns a list with the spot index of each vehicle (-1 if it was not parked,
+    # or was parked already, or is listed again later in the wave)
+    def park_many(self, vehicles, policy='optimal'):
+        if isinstance(policy, str) and policy not in ('optimal', 'best_fit', 'first_fit'):
+            # any other policy by its name, e.g. 'worst_fit', parks vehicle by vehicle
+            policy = policy_named(policy)
+        if policy == 'first_fit' or isinstance(policy, AllocationPolicy):
+            policy = None if policy == 'first_fit' else policy
+            spots = [self._park(vehicle, policy) for vehicle in vehicles]
+            if self._sink is not None:
+                self._report_batch(vehicles, spots)
+            return spots
+        if policy not in ('optimal', 'best_fit'):
+            raise ValueError(f"unknown parking policy: {policy}")
+
+        # count how many vehicles of each size go to each spot size class,
+        # then hand out the actual spots class by class. The vehicles are
+        # grouped as arrays of positions - no per-vehicle Python work until
+        # the spots are occupied
+        vehicles, sizes, types, type_names = wave_arrays(vehicles)
+        spot_sizes = sorted(self._free_spots)
+        # vehicles that must not get a spot look bigger than any spot
+        sizes[self._repeated(vehicles)] = max(spot_sizes, default=0) + 1
+        open_count = {spot_size: len(self._free_spots[spot_size]) for spot_size in spot_sizes}
+        spots = np.full(len(vehicles), -1, dtype=np.int64)
+
+        if policy == 'optimal':
+            # positions grouped by vehicle size, largest first, arrival order within a size
+            order = np.argsort(-sizes, kind='stable')
+            needs, starts = np.unique(-sizes[order], return_index=True)
+            for need, group in zip((-needs).tolist(), np.split(order, starts[1:])):
+                for spot_size in spot_sizes:
+                    if spot_size < need or open_count[spot_size] == 0:
+                        continue
+                    taken = min(len(group), open_count[spot_size])
+                    open_count[spot_size] -= taken
+                    self._assign(vehicles, group[:taken], spot_size, spots, sizes, types, type_names)
+                    group = group[taken:]
+                    if not len(group):
+                        break
+        else:
+            # arrival order - a size class goes to the first vehicles (by arrival)
+            # that fit it and did not get a smaller class, the others try the next class
+            waiting = np.zeros(0, dtype=np.int64)
+            tried = np.zeros(len(vehicles), dtype=bool)
+            for spot_size in spot_sizes:
+                fits = sizes <= spot_size
+                fitting = np.flatnonzero(fits & ~tried)
+                waiting = np.union1d(waiting, fitting) if len(waiting) else fitting
+                taken = min(len(waiting), open_count[spot_size])
+                self._assign(vehicles, waiting[:taken], spot_size, spots, sizes, types, type_names)
+                waiting = waiting[taken:]
+                tried = fits
+
+        spots = spots.tolist()
+        if self._sink is not None:
+            self._report_batch(vehicles, spots)
+        return spots
+
+    # mask of the vehicles of a wave that are parked already, or listed earlier
+    # in the wave - one pass in C when there are none
+    def _repeated(self, vehicles):
+        repeated = np.zeros(len(vehicles), dtype=bool)
+        wave = set(vehicles.tolist())
+        if len(wave) == len(vehicles) and wave.isdisjoint(self._vehicle_spots):
+            return repeated
+        parked = self._vehicle_spots
+        seen = set()
+        for pos, vehicle in enumerate(vehicles.tolist()):
+            if vehicle in parked or vehicle in seen:
+                repeated[pos] = True
+            seen.add(vehicle)
+        return repeated
+
+    def _report_batch(self, vehicles, spots):
+        sink = self._sink
+        for vehicle, i in zip(vehicles, spots):
+            sink.arriving(vehicle)
+            if i < 0:
+                sink.rejected(vehicle)
+            else:
+                sink.parked(vehicle, i, self._spot_size_at(i))
+
+    # park vehicles[pos] for every pos in the group (an array of positions) in
+    # the lowest open spots of the given size class, and record each spot index
+    # in spots[pos]. sizes / types are the size and type code of every vehicle
+    def _assign(self, vehicles, group, spot_size, spots, sizes, types, type_names):
+        if not len(group):
+            return
+        parked = vehicles[group].tolist()
+        taken = self._occupy_many(self._free_spots[spot_size].take(len(group)), parked)
+        counts = self._parked_counts[spot_size]
+        type_counts = np.bincount(types[group], minlength=len(type_names))
+        for code in np.flatnonzero(type_counts).tolist():
+            counts[type_names[code]] += int(type_counts[code])
+        if self._journal is not None:
+            self._journal.parked_many(taken, sizes[group])
+        spots[group] = taken
+        self._vehicle_spots.update(zip(parked, taken))
+
+    # the given vehicle leaves the lot and its spot is open again
+    # returns False if the vehicle is not parked here
+    def unpark(self, vehicle):
+        i = self._vehicle_spots.get(vehicle)
+        if i is None:
+            return False
+        self.unpark_spot(i)
+        return True
+
+    # free the spot at the given index and return the vehicle that left it
+    # (None if the spot was already open)
+    def unpark_spot(self, i):
+        # a negative index would wrap around and corrupt the free spot heap
+        if not 0 <= i < self.getTotalSpotsSz():
+            raise IndexError("spot index out of range")
+        vehicle = self._vacate(i)
+        if vehicle is None:
+            return None
+        del self._vehicle_spots[vehicle]
+        spot_size = self._spot_size_at(i)
+        self._free_spots[spot_size].push(i)
+        self._parked_counts[spot_size][vehicle._car_type] -= 1
+        if self._journal is not None:
+            self._journal.unparked(i, vehicle._size)
+        if self._sink is not None:
+            self._sink.unparked(vehicle, i, spot_size)
+        return vehicle
                 
     def is_park_open(self):
         return (self.getOpenSpotsSz() > 0)
@@ -90,165 +433,260 @@ class ParkingLot:
         return len(self._total_spots)
     
     def getVehicleSet(self):
-        return self._vehicle_set
+        return list(self._vehicle_spots)
+
+    # index of the spot the vehicle is parked in, or -1 if it is not parked here
+    def getVehicleSpot(self, vehicle):
+        return self._vehicle_spots.get(vehicle, -1)
     
     def getOpenSpotsSz(self):
-        return self.getTotalSpotsSz() - len(self.getVehicleSet())
+        return sum(len(free) for free in self._free_spots.values())
+
+    # occupancy getters - all O(1), read from the live counters
+    # number of spots per size class, e.g. {1: 20, 2: 60, 3: 20}
+    def getSpotsBySize(self):
+        return dict(self._spot_counts)
+
+    def getOpenSpotsBySize(self):
+        return {spot_size: len(free) for spot_size, free in self._free_spots.items()}
+
+    def getOccupiedSpotsBySize(self):
+        return {spot_size: self._spot_counts[spot_size] - len(free) for spot_size, free in self._free_spots.items()}
+
+    # parked vehicles per vehicle type, e.g. {'CAR': 41, 'BUS': 3}
+    def getParkedByType(self):
+        parked = Counter()
+        for counts in self._parked_counts.values():
+            parked.update(counts)
+        return {vehicle_type: count for vehicle_type, count in parked.items() if count > 0}
+
+    def getParkedSz(self):
+        return len(self._vehicle_spots)
+
+    # share of the spots that are taken, of the whole lot or of one size class
+    def getUtilization(self, spot_size=None):
+        if spot_size is None:
+            total = self.getTotalSpotsSz()
+            return (total - self.getOpenSpotsSz()) / total if total else 0.0
+        total = self._spot_counts[spot_size]
+        return (total - len(self._free_spots[spot_size])) / total if total else 0.0
+
+    # how many more vehicles like the given one still fit, e.g. getRoomFor(Bus())
+    def getRoomFor(self, vehicle):
+        need = vehicle.getSize()
+        return sum(len(free) for spot_size, free in self._free_spots.items() if spot_size >= need)
     
     def getAllSpots(self):
         return self._total_spots
     
-    def display_parking_lot(self):
-        """Display the current parking lot status visually"""
-        spots = self._total_spots
-        total_spots = len(spots)
-        
-        print("🅿️  Current Parking Lot Status:")
-        
-        # If too many spots, display in multiple rows
-        if total_spots > 20:
-            spots_per_row = 20
-            rows = (total_spots + spots_per_row - 1) // spots_per_row
-            
-            for row in range(rows):
-                start_idx = row * spots_per_row
-                end_idx = min(start_idx + spots_per_row, total_spots)
-                row_spots = spots[start_idx:end_idx]
-                
-                print("┌" + "─" * (len(row_spots) * 4 - 1) + "┐")
-                print("│", end="")
-                
-                for spot in row_spots:
-                    spot_size = spot.getSpotSize()
-                    if spot.is_open():
-                        if spot_size == 1:  # Small spot
-                            print(" ( )", end="")
-                        elif spot_size == 2:  # Medium spot
-                            print(" [ ]", end="")
-                        elif spot_size == 3:  # Big spot
-                            print(" { }", end="")
-                        else:
-                            print(" [ ]", end="")
-                    else:
-                        vehicle = spot.getParkedVec()
-                        if vehicle.getType() == "MOTORCYCLE":
-                            if spot_size == 1:
-                                print(" (M)", end="")
-                            elif spot_size == 2:
-                                print(" [M]", end="")
-                            elif spot_size == 3:
-                                print(" {M}", end="")
-                            else:
-                                print(" [M]", end="")
-                        elif vehicle.getType() == "CAR":
-                            if spot_size == 1:
-                                print(" (C)", end="")
-                            elif spot_size == 2:
-                                print(" [C]", end="")
-                            elif spot_size == 3:
-                                print(" {C}", end="")
-                            else:
-                                print(" [C]", end="")
-                        elif vehicle.getType() == "BUS":
-                            if spot_size == 1:
-                                print(" (B)", end="")
-                            elif spot_size == 2:
-                                print(" [B]", end="")
-                            elif spot_size == 3:
-                                print(" {B}", end="")
-                            else:
-                                print(" [B]", end="")
-                        else:
-                            if spot_size == 1:
-                                print(" (?)", end="")
-                            elif spot_size == 2:
-                                print(" [?]", end="")
-                            elif spot_size == 3:
-                                print(" {?}", end="")
-                            else:
-                                print(" [?]", end="")
-                
-                print(" │")
-                print("└" + "─" * (len(row_spots) * 4 - 1) + "┘")
-        else:
-            # Single row display for smaller parking lots
-            print("┌" + "─" * (total_spots * 4 - 1) + "┐")
-            print("│", end="")
-            
-            for i, spot in enumerate(spots):
-                spot_size = spot.getSpotSize()
-                if spot.is_open():
-                    if spot_size == 1:  # Small spot
-                        print(" ( )", end="")
-                    elif spot_size == 2:  # Medium spot
-                        print(" [ ]", end="")
-                    elif spot_size == 3:  # Big spot
-                        print(" { }", end="")
-                    else:
-                        print(" [ ]", end="")
-                else:
-                    vehicle = spot.getParkedVec()
-                    if vehicle.getType() == "MOTORCYCLE":
-                        if spot_size == 1:
-                            print(" (M)", end="")
-                        elif spot_size == 2:
-                            print(" [M]", end="")
-                        elif spot_size == 3:
-                            print(" {M}", end="")
-                        else:
-                            print(" [M]", end="")
-                    elif vehicle.getType() == "CAR":
-                        if spot_size == 1:
-                            print(" (C)", end="")
-                        elif spot_size == 2:
-                            print(" [C]", end="")
-                        elif spot_size == 3:
-                            print(" {C}", end="")
-                        else:
-                            print(" [C]", end="")
-                    elif vehicle.getType() == "BUS":
-                        if spot_size == 1:
-                            print(" (B)", end="")
-                        elif spot_size == 2:
-                            print(" [B]", end="")
-                        elif spot_size == 3:
-                            print(" {B}", end="")
-                        else:
-                            print(" [B]", end="")
-                    else:
-                        if spot_size == 1:
-                            print(" (?)", end="")
-                        elif spot_size == 2:
-                            print(" [?]", end="")
-                        elif spot_size == 3:
-                            print(" {?}", end="")
-                        else:
-                            print(" [?]", end="")
-            
-            print(" │")
-            print("└" + "─" * (total_spots * 4 - 1) + "┘")
+    # save the spot layout and the parked vehicles as a binary snapshot
+    # (format in parking_snapshot.py). vehicle_ids - a dict vehicle -> id to
+    # save the vehicles under (default: numbered in spot order)
+    def save(self, path, vehicle_ids=None):
+        spot_sizes = array('b', [spot._spot_size for spot in self._total_spots])
+        occupants = array('q', [-1]) * len(spot_sizes)
+        parked = [i for i, spot in enumerate(self._total_spots) if spot._spot_car is not None]
+        vehicles = [self._total_spots[i]._spot_car for i in parked]
+        ids = number_vehicles(vehicles, vehicle_ids)
+        vehicle_sizes = array('b', bytes(max(ids, default=-1) + 1))
+        for i, vehicle, vehicle_id in zip(parked, vehicles, ids):
+            occupants[i] = vehicle_id
+            vehicle_sizes[vehicle_id] = vehicle.getSize()
+        write_snapshot(path, spot_sizes, occupants, vehicle_sizes)
+
+    # the lot saved in the snapshot at path - same layout and occupancy, the
+    # parked vehicles are new vehicles of the saved size classes. vehicles, if
+    # given, is a dict filled with snapshot vehicle id -> restored vehicle.
+    # ParkingLot reads the whole snapshot and builds every Spot up front (it is
+    # not memory-mapped, see ArrayParkingLot for that)
+    @classmethod
+    def load(cls, path, vehicles=None):
+        lot = cls.__new__(cls)
+        lot._restore(path, vehicles)
+        return lot
+
+    def _restore(self, path, vehicles=None):
+        spot_sizes, occupants, vehicle_sizes = read_snapshot(path)
+        restored = {vehicle_id: VEHICLE_BY_SIZE[vehicle_size]()
+                    for vehicle_id, vehicle_size in enumerate(vehicle_sizes) if vehicle_size}
+        self._total_spots = [SPOT_BY_SIZE[spot_size]() for spot_size in spot_sizes]
+        self._vehicle_spots = {}
+        for i, vehicle_id in enumerate(occupants):
+            if vehicle_id >= 0:
+                self._occupy(i, restored[vehicle_id])
+                self._vehicle_spots[restored[vehicle_id]] = i
+        self._build_free_index()
+        if vehicles is not None:
+            vehicles.update(restored)
+
+    # put a new vehicle of size class vehicle_sizes[k] (0: none) in spot
+    # spots[k] for every k, replacing whatever was parked there - replay of
+    # a journal (see parking_journal.py)
+    def _apply_spot_states(self, spots, vehicle_sizes):
+        for i, vehicle_size in zip(spots, vehicle_sizes):
+            i = int(i)
+            vehicle = self._vacate(i)
+            if vehicle is not None:
+                del self._vehicle_spots[vehicle]
+            if vehicle_size:
+                vehicle = VEHICLE_BY_SIZE[int(vehicle_size)]()
+                self._occupy(i, vehicle)
+                self._vehicle_spots[vehicle] = i
+        self._build_free_index()
+
+    # the display cell of every spot in spots[start:stop], e.g. " [C]"
+    def getSpotCells(self, start=0, stop=None):
+        return [SPOT_CELLS.get((spot._spot_size, None if spot._spot_car is None else spot._spot_car._car_type))
+                or spot_cell(spot._spot_size, spot._spot_car)
+                for spot in self._total_spots[start:stop]]
+
+    def render_parking_lot(self, start=0, count=None, spots_per_row=SPOTS_PER_ROW):
+        """The display of spots[start:start+count] (default: all) as one string"""
+        total_spots = self.getTotalSpotsSz()
+        stop = total_spots if count is None else min(start + count, total_spots)
+        cells = self.getSpotCells(start, stop)
+
+        title = "🅿️  Current Parking Lot Status:"
+        if start > 0 or stop < total_spots:
+            title += f" spots {start}-{stop - 1} of {total_spots}"
+        frame = [title]
+        for row_start in range(0, len(cells), spots_per_row):
+            row_cells = cells[row_start:row_start + spots_per_row]
+            frame.append("┌" + "─" * (len(row_cells) * 4 - 1) + "┐")
+            frame.append("│" + "".join(row_cells) + " │")
+            frame.append("└" + "─" * (len(row_cells) * 4 - 1) + "┘")
+        frame.append(LEGEND)
+        return "\n".join(frame) + "\n\n"
+
+    def display_parking_lot(self, start=0, count=None):
+        """Display the current parking lot status visually
         
-        print("Legend: ( )=Small spot, [ ]=Medium spot, { }=Big spot")
-        print("        M=Motorcycle, C=Car, B=Bus")
-        print()
+        start/count show a window of the lot (default: the whole lot)
+        """
+        sys.stdout.write(self.render_parking_lot(start, count))
+
+#%% free spot index
+
+class FreeSpots:
+    # the open spots of one size class, as a min-heap of spot indexes
+
+    def __init__(self, indexes=()):
+        self._heap = list(indexes)
+        heapify(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    # smallest open spot index, or -1 if there is none
+    def first(self):
+        return self._heap[0] if self._heap else -1
+
+    def pop(self):
+        return heappop(self._heap)
+
+    def push(self, i):
+        heappush(self._heap, i)
+
+    # remove and return the k smallest open spot indexes, in ascending order
+    def take(self, k):
+        if k * 16 < len(self._heap):
+            return [heappop(self._heap) for n in range(k)]
+        # a sorted list is still a valid heap
+        self._heap.sort()
+        taken = self._heap[:k]
+        del self._heap[:k]
+        return taken
+
+class NearestFreeSpots(FreeSpots):
+    # the open spots of one size class, as a min-heap of spot indexes plus a
+    # min-heap of (distance, spot index) per entrance of the lot layout.
+    # A spot taken through one heap stays in the others until it reaches their
+    # top (lazy deletion) - _open says which entries are still valid
+    #
+    # distances - distances[e][i] is the distance from entrance e to spot i
+
+    def __init__(self, indexes, distances):
+        indexes = [int(i) for i in indexes]
+        FreeSpots.__init__(self, indexes)
+        self._distances = distances
+        self._open = set(indexes)
+        self._near = []
+        for entrance_distances in distances:
+            heap = [(entrance_distances[i], i) for i in indexes]
+            heapify(heap)
+            self._near.append(heap)
+
+    def __len__(self):
+        return len(self._open)
+
+    def _prune(self, heap, key=lambda entry: entry):
+        while heap and key(heap[0]) not in self._open:
+            heappop(heap)
+
+    def first(self):
+        self._prune(self._heap)
+        return FreeSpots.first(self)
+
+    def pop(self):
+        self._prune(self._heap)
+        i = heappop(self._heap)
+        self._open.discard(i)
+        return i
+
+    def push(self, i):
+        self._open.add(i)
+        heappush(self._heap, i)
+        for entrance_distances, heap in zip(self._distances, self._near):
+            heappush(heap, (entrance_distances[i], i))
+        # drop the stale entries once they outnumber the open spots
+        if max(len(self._heap), *map(len, self._near)) > 2 * len(self._open) + 64:
+            self._compact()
+
+    def take(self, k):
+        return [self.pop() for n in range(min(k, len(self)))]
+
+    # (distance, spot index) of the open spot nearest to the entrance, or None
+    def nearest(self, entrance):
+        heap = self._near[entrance]
+        self._prune(heap, key=lambda entry: entry[1])
+        return heap[0] if heap else None
+
+    def pop_nearest(self, entrance):
+        heap = self._near[entrance]
+        self._prune(heap, key=lambda entry: entry[1])
+        i = heappop(heap)[1]
+        self._open.discard(i)
+        return i
+
+    def _compact(self):
+        self._heap = sorted(self._open)
+        self._near = [sorted((entrance_distances[i], i) for i in self._open)
+                      for entrance_distances in self._distances]
 
 #%%  spot
             
 class Spot:
+    __slots__ = ('_spot_size', '_spot_car')
     
     def __init__(self,spot_sz):
         self._spot_size = spot_sz
         self._spot_car = None
         
     def is_open(self):
-        return self._spot_car == None
+        return self._spot_car is None
     
     def park_vehicle(self,new_vec):
-        can_park = new_vec.getWheelNum()/2 <= self.getSpotSize()
+        can_park = new_vec._size <= self._spot_size
         if can_park:
             self._spot_car = new_vec
         return can_park              
 
+    # empty the spot and return the vehicle that was parked in it
+    def unpark_vehicle(self):
+        vehicle = self._spot_car
+        self._spot_car = None
+        return vehicle
+
     # getters        
     def getParkedVec(self):
         return self._spot_car
@@ -257,16 +695,26 @@ class Spot:
         return self._spot_size    
     
 class SmallSpot(Spot):
+    __slots__ = ()
+
     def __init__(self):
         Spot.__init__(self,1)
     
 class MedSpot(Spot):
+    __slots__ = ()
+
     def __init__(self):
         Spot.__init__(self,2)
         
 class BigSpot(Spot):
+    __slots__ = ()
+
     def __init__(self):
         Spot.__init__(self,3)
+
+SPOT_BY_SIZE = {1: SmallSpot, 2: MedSpot, 3: BigSpot}
+# store a vehicle in a spot's slot: SET_SPOT_CAR(spot, vehicle)
+SET_SPOT_CAR = Spot._spot_car.__set__
 #%%
                               
 ''' running example:
@@ -277,26 +725,23 @@ class BigSpot(Spot):
     first randomly and at the next code iteration try to consider other vehicles
 '''
 if __name__ == "__main__":
+    from parking_events import PrintSink
+    from lot_generation import generate_fleet
+
     # creat the parking lot
     small_spot_sz= 2
     med_spot_sz = 10
     big_spot_sz = 2
 
     PL = ParkingLot(small_spot_sz, med_spot_sz,big_spot_sz)
+    PL.setEventSink(PrintSink())
 
     # creat a rand set of vihacles   
     cycle_sz = 2
     cars_sz = 5
     buses_sz = 1
 
-    vec_set = []
-    for i in range(cycle_sz):
-        vec_set.append(Motorcycle())
-    for i in range(cars_sz):
-        vec_set.append(Car())            
-    for i in range(buses_sz):
-        vec_set.append(Bus())
-    shuffle(vec_set)
+    vec_set = generate_fleet(cycle_sz, cars_sz, buses_sz)
 
     # Display parking lot setup
     print("=" * 50)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Allocation policies for the Parking Lot Simulation
+
+A policy decides which size class an arriving vehicle parks in; the lot
+then gives it the lowest open spot of that class. Policies only look at
+the lot's free-spot index ({spot size: FreeSpots}, one min-heap of open
+spot indexes per size class), so a decision costs a few heap lookups and
+never a rescan of the lot. Set one with ParkingLot.setPolicy(policy), or
+by its name in POLICIES (setPolicy('worst_fit'), park_many(policy='worst_fit')).
+
+NearestSpot also takes the spot itself: on a lot with a LotLayout it gives
+each vehicle the open spot nearest to its entrance.
+
+@author: Maya Galili
+"""
+
+
+class AllocationPolicy:
+    # base class of the policies
+
+    # free_spots - {spot size: FreeSpots} of the lot, in ascending size order
+    # need       - size class of the arriving vehicle
+    # returns the spot size class to park in, or None if the vehicle is rejected
+    def pick(self, free_spots, need):
+        raise NotImplementedError
+
+    # the spot to park in, taken out of the picked class's FreeSpots
+    # (default: the lowest open spot index)
+    def take(self, free):
+        return free.pop()
+
+
+class FirstFit(AllocationPolicy):
+    # the first open spot in lot order that fits - the lowest spot index among
+    # the heads of the size classes the vehicle fits in (the lot's default)
+
+    def pick(self, free_spots, need):
+        best_size = None
+        first = -1
+        for spot_size, free in free_spots.items():
+            if spot_size >= need:
+                i = free.first()
+                if i >= 0 and (first < 0 or i < first):
+                    best_size, first = spot_size, i
+        return best_size
+
+
+class BestFit(AllocationPolicy):
+    # the smallest size class that fits and has an open spot - big spots stay
+    # free for the vehicles that need them
+
+    def pick(self, free_spots, need):
+        for spot_size, free in free_spots.items():
+            if spot_size >= need and len(free):
+                return spot_size
+        return None
+
+
+class WorstFit(AllocationPolicy):
+    # the largest size class that has an open spot
+
+    def pick(self, free_spots, need):
+        best_size = None
+        for spot_size, free in free_spots.items():
+            if spot_size >= need and len(free):
+                best_size = spot_size
+        return best_size
+
+
+class ReservedQuota(AllocationPolicy):
+    # keep spots for the vehicles that need them, e.g. ReservedQuota({3: 10})
+    # keeps the last 10 big spots for buses: a smaller vehicle may only take a
+    # spot of a reserved class while more than its quota of them is open
+    #
+    # reserved - {spot size: spots kept for vehicles of that size class}
+    # policy   - how the vehicle picks among the classes it may use (default BestFit)
+
+    def __init__(self, reserved, policy=None):
+        self._reserved = dict(reserved)
+        self._policy = policy or BestFit()
+
+    def pick(self, free_spots, need):
+        blocked = [spot_size for spot_size, quota in self._reserved.items()
+                   if spot_size > need and spot_size in free_spots and len(free_spots[spot_size]) <= quota]
+        if blocked:
+            free_spots = {spot_size: free for spot_size, free in free_spots.items() if spot_size not in blocked}
+        return self._policy.pick(free_spots, need)
+
+    def take(self, free):
+        return self._policy.take(free)
+
+
+class NearestSpot(AllocationPolicy):
+    # the open spot nearest to the entrance, among all size classes that fit
+    # (ties go to the smaller class) - for lots built with a LotLayout, whose
+    # size classes keep their open spots by distance from every entrance
+    #
+    # entrance - index of the entrance the vehicle comes in by
+
+    def __init__(self, entrance=0):
+        self._entrance = entrance
+
+    def pick(self, free_spots, need):
+        best_size = None
+        best = None
+        for spot_size, free in free_spots.items():
+            if spot_size >= need:
+                nearest = free.nearest(self._entrance)
+                if nearest is not None and (best is None or nearest[0] < best):
+                    best_size, best = spot_size, nearest[0]
+        return best_size
+
+    def take(self, free):
+        return free.pop_nearest(self._entrance)
+
+
+POLICIES = {
+    'first_fit': FirstFit,
+    'best_fit': BestFit,
+    'worst_fit': WorstFit,
+}
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+Array-backed (structure-of-arrays) parking lot for million-spot lots.
+
+Instead of one Spot object per spot, the lot keeps two NumPy arrays:
+the spot sizes (int8) and the id of the vehicle parked in each spot
+(-1 for an open spot). Generation and shuffling are vectorized, and
+getAllSpots() returns a lazy view, so callers written against ParkingLot
+(e.g. parking_lot_ui.run_simulation) work unchanged.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+from collections import Counter
+from collections.abc import Sequence
+from heapq import heappop
+from operator import attrgetter
+
+import numpy as np
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, FreeSpots, SPOT_CELLS, VEHICLE_BY_SIZE, VEHICLE_KINDS, spot_cell
+from parking_snapshot import number_vehicles, read_header, section_offsets, write_snapshot
+from lot_generation import generate_spot_sizes
+
+
+# open display cell by spot size (0 stands in for sizes outside the table)
+OPEN_CELLS = np.array([spot_cell(0, None)] + [SPOT_CELLS[spot_size, None] for spot_size in (1, 2, 3)])
+
+
+#%% parking lot
+class ArrayParkingLot(ParkingLot):
+    # parked vehicles restored from a snapshot that were not looked up yet
+    # (see RestoredVehicles) - they are not in _vehicle_spots
+    _unloaded_sz = 0
+
+    # rng    - a seed, numpy.random.Generator or random.Random to shuffle the spots
+    #          with (default: drawn from the random module) - the same rng gives
+    #          ParkingLot the same layout
+    # layout - a LotLayout with the coordinates of the spots and the entrances
+    def __init__(self, small_spot_sz, med_spot_sz, big_spot_sz, rng=None, layout=None):
+        # parked vehicles, each mapped to the index of its spot
+        self._vehicle_spots = {}
+        self._layout = layout
+        # vehicle id (as stored in the occupants array) -> parked vehicle
+        self._vehicles = {}
+        self._next_vehicle_id = 0
+        self.generateOpenSpots(small_spot_sz, med_spot_sz, big_spot_sz, rng)
+
+    # creat a parking lot with X1 small spots, x2 medium spots and x3 big spots
+    def generateOpenSpots(self, small_spot_sz, med_spot_sz, big_spot_sz, rng=None):
+        spot_sizes = generate_spot_sizes(small_spot_sz, med_spot_sz, big_spot_sz, rng)
+
+        self._spot_sizes = spot_sizes
+        self._occupants = np.full(len(spot_sizes), -1, dtype=np.int64)
+        self._build_free_index()
+        return self.getAllSpots()
+
+    def _build_free_index(self):
+        open_spots = self._occupants < 0
+        self._free_spots = {}
+        # spot sizes are small non-negative ints - counting them beats sorting
+        counts = np.bincount(self._spot_sizes)
+        spot_sizes = np.flatnonzero(counts)
+        self._spot_counts = Counter(dict(zip(spot_sizes.tolist(), counts[spot_sizes].tolist())))
+        for spot_size in spot_sizes.tolist():
+            self._free_spots[spot_size] = ArrayFreeSpots(np.flatnonzero((self._spot_sizes == spot_size) & open_spots))
+        self._apply_layout()
+        self._count_parked()
+
+    # save the lot as a binary snapshot (format in parking_snapshot.py), the
+    # vehicles under their ids in vehicle_ids if given
+    def save(self, path, vehicle_ids=None):
+        occupied = np.flatnonzero(self._occupants >= 0)
+        occupants = np.full(len(self._spot_sizes), -1, dtype='<i8')
+        parked_ids = self._occupants[occupied]
+        if vehicle_ids is not None:
+            vehicles = self._vehicles
+            ids = np.array(number_vehicles([vehicles[vehicle_id] for vehicle_id in parked_ids.tolist()], vehicle_ids),
+                           dtype=np.int64)
+        else:
+            # 0..parked-1 in spot order, however many ids were handed out before
+            ids = np.arange(len(occupied))
+        occupants[occupied] = ids
+        vehicle_sizes = np.zeros(ids.max(initial=-1) + 1, dtype=np.int8)
+        vehicle_sizes[ids] = self._vehicle_sizes(parked_ids)
+        write_snapshot(path, np.ascontiguousarray(self._spot_sizes, dtype=np.int8), occupants, vehicle_sizes)
+
+    # adopt the snapshot's arrays as they are: the spot sizes, occupants and
+    # vehicle sizes are copy-on-write memory maps of the file, so no per-spot
+    # work is done and the lot can change without touching the file. The
+    # parked vehicles are only created when they are looked up (RestoredVehicles),
+    # under their snapshot ids
+    def _restore(self, path, vehicles=None):
+        with open(path, "rb") as f:
+            spots_sz, vehicles_sz = read_header(f)
+        sizes_offset, occupants_offset, vehicles_offset = section_offsets(spots_sz)
+        self._spot_sizes = _map_section(path, np.int8, sizes_offset, spots_sz)
+        self._occupants = _map_section(path, '<i8', occupants_offset, spots_sz)
+
+        occupied = np.flatnonzero(self._occupants >= 0)
+        spots = np.full(vehicles_sz, -1, dtype=np.int64)
+        spots[self._occupants[occupied]] = occupied
+        self._vehicle_spots = {}
+        self._vehicles = RestoredVehicles(self, _map_section(path, np.int8, vehicles_offset, vehicles_sz), spots)
+        self._unloaded_sz = len(occupied)
+        self._next_vehicle_id = vehicles_sz
+        self._build_free_index()
+        if vehicles is not None:
+            self._load_vehicles()
+            vehicles.update(self._vehicles)
+
+    # create every restored vehicle that was not looked up yet
+    def _load_vehicles(self):
+        if self._unloaded_sz:
+            self._vehicles.load_all()
+
+    # size class of the vehicle of every id in ids (an array), without
+    # creating restored vehicles
+    def _vehicle_sizes(self, ids):
+        vehicles = self._vehicles
+        sizes = np.empty(len(ids), dtype=np.int8)
+        unloaded = self._unloaded(ids)
+        sizes[unloaded] = vehicles.sizes_of(ids[unloaded]) if self._unloaded_sz else []
+        loaded = ids[~unloaded]
+        sizes[~unloaded] = np.fromiter(map(attrgetter('_size'), map(vehicles.__getitem__, loaded.tolist())),
+                                       dtype=np.int8, count=len(loaded))
+        return sizes
+
+    # mask of the ids (an array) whose restored vehicle was not created yet
+    def _unloaded(self, ids):
+        if not self._unloaded_sz:
+            return np.zeros(len(ids), dtype=bool)
+        return self._vehicles.unloaded(ids)
+
+    def _apply_spot_states(self, spots, vehicle_sizes):
+        spots = np.asarray(spots, dtype=np.int64)
+        vehicle_sizes = np.asarray(vehicle_sizes)
+        occupants = self._occupants[spots]
+        vehicles = self._vehicles
+        for vehicle_id in occupants[occupants >= 0].tolist():
+            del self._vehicle_spots[vehicles[vehicle_id]]
+            del vehicles[vehicle_id]
+        self._occupants[spots] = -1
+
+        parked = vehicle_sizes > 0
+        vehicles = [VEHICLE_BY_SIZE[vehicle_size]() for vehicle_size in vehicle_sizes[parked].tolist()]
+        first_id = self._next_vehicle_id
+        self._next_vehicle_id += len(vehicles)
+        self._occupants[spots[parked]] = np.arange(first_id, self._next_vehicle_id)
+        self._vehicles.update(zip(range(first_id, self._next_vehicle_id), vehicles))
+        self._vehicle_spots.update(zip(vehicles, spots[parked].tolist()))
+        self._build_free_index()
+
+    def _count_parked(self):
+        occupied = np.flatnonzero(self._occupants >= 0)
+        ids = self._occupants[occupied]
+        vehicles = self._vehicles
+        self._parked_counts = {spot_size: Counter() for spot_size in self._free_spots}
+        # restored vehicles that were not looked up yet are counted by their
+        # (spot size, vehicle size) pairs, without creating them
+        unloaded = self._unloaded(ids)
+        pairs = (np.bincount(self._spot_sizes[occupied[unloaded]].astype(np.int64) * 8 + vehicles.sizes_of(ids[unloaded]))
+                 if unloaded.any() else np.zeros(0, dtype=np.int64))
+        for pair in np.flatnonzero(pairs).tolist():
+            vehicle_type = VEHICLE_KINDS[VEHICLE_BY_SIZE[pair % 8]][1]
+            self._parked_counts[pair // 8][vehicle_type] += int(pairs[pair])
+        vehicle_types = [vehicles[vehicle_id]._car_type for vehicle_id in ids[~unloaded].tolist()]
+        for (spot_size, vehicle_type), count in Counter(zip(self._spot_sizes[occupied[~unloaded]].tolist(),
+                                                            vehicle_types)).items():
+            self._parked_counts[spot_size][vehicle_type] += count
+
+    # storage hooks (see ParkingLot)
+    def _spot_size_at(self, i):
+        return int(self._spot_sizes[i])
+
+    def _occupy(self, i, vehicle):
+        self._occupants[i] = self._next_vehicle_id
+        self._vehicles[self._next_vehicle_id] = vehicle
+        self._next_vehicle_id += 1
+
+    def _occupy_many(self, taken, vehicles):
+        # a layout's free spots take into a list
+        taken = np.asarray(taken, dtype=np.int64)
+        first_id = self._next_vehicle_id
+        self._next_vehicle_id += len(vehicles)
+        self._occupants[taken] = np.arange(first_id, self._next_vehicle_id)
+        self._vehicles.update(zip(range(first_id, self._next_vehicle_id), vehicles))
+        return taken.tolist()
+
+    def _vacate(self, i):
+        vehicle_id = int(self._occupants[i])
+        if vehicle_id < 0:
+            return None
+        self._occupants[i] = -1
+        vehicle = self._vehicles[vehicle_id]
+        del self._vehicles[vehicle_id]
+        return vehicle
+
+    # getters
+    def getVehicleSet(self):
+        self._load_vehicles()
+        return list(self._vehicle_spots)
+
+    def getParkedSz(self):
+        return len(self._vehicle_spots) + self._unloaded_sz
+
+    def getTotalSpotsSz(self):
+        return len(self._spot_sizes)
+
+    def getAllSpots(self):
+        return SpotsView(self)
+
+    # the display cells of spots[start:stop]: open cells by table lookup on the
+    # size array, only the occupied spots look at their vehicle
+    def getSpotCells(self, start=0, stop=None):
+        spot_sizes = self._spot_sizes[start:stop]
+        occupants = self._occupants[start:stop]
+        cells = OPEN_CELLS[np.clip(spot_sizes, 0, len(OPEN_CELLS) - 1)].tolist()
+        for j in np.flatnonzero(occupants >= 0).tolist():
+            vehicle = self._vehicles[int(occupants[j])]
+            cells[j] = SPOT_CELLS.get((int(spot_sizes[j]), vehicle.getType())) or spot_cell(int(spot_sizes[j]), vehicle)
+        return cells
+
+
+# a copy-on-write memory map of one section of a snapshot file
+def _map_section(path, dtype, offset, length):
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=(length,))
+
+
+#%% free spot index
+
+class ArrayFreeSpots(FreeSpots):
+    # the open spots of one size class: a sorted array of spots that were never
+    # taken, consumed from the front, plus a heap of spots that were freed again
+
+    def __init__(self, indexes):
+        self._sorted = np.asarray(indexes, dtype=np.int64)
+        self._pos = 0
+        self._heap = []
+
+    def __len__(self):
+        return len(self._sorted) - self._pos + len(self._heap)
+
+    def first(self):
+        i = int(self._sorted[self._pos]) if self._pos < len(self._sorted) else -1
+        if self._heap and (i < 0 or self._heap[0] < i):
+            return self._heap[0]
+        return i
+
+    def pop(self):
+        if self._heap and (self._pos == len(self._sorted) or self._heap[0] < self._sorted[self._pos]):
+            return heappop(self._heap)
+        self._pos += 1
+        return int(self._sorted[self._pos - 1])
+
+    # returns the taken indexes as an array
+    def take(self, k):
+        if self._heap:
+            self._sorted = np.union1d(self._sorted[self._pos:], self._heap)
+            self._pos = 0
+            self._heap = []
+        taken = self._sorted[self._pos:self._pos + k]
+        self._pos += len(taken)
+        return taken
+
+
+#%% lazy restored vehicles
+
+class RestoredVehicles(dict):
+    # vehicle id -> parked vehicle of an ArrayParkingLot restored from a
+    # snapshot. Like VehicleFleet, a restored vehicle is only created the
+    # first time its id is looked up - it then also enters the lot's
+    # vehicle -> spot map. Vehicles parked after the restore are plain entries
+
+    def __init__(self, lot, sizes, spots):
+        dict.__init__(self)
+        self._lot = lot
+        # size class (memory-mapped) and spot of every snapshot vehicle id; the
+        # spot is -1 for unused ids and once the vehicle was created
+        self._sizes = sizes
+        self._spots = spots
+
+    def __missing__(self, vehicle_id):
+        if not 0 <= vehicle_id < len(self._spots) or self._spots[vehicle_id] < 0:
+            raise KeyError(vehicle_id)
+        vehicle = VEHICLE_BY_SIZE[int(self._sizes[vehicle_id])]()
+        self[vehicle_id] = vehicle
+        self._lot._vehicle_spots[vehicle] = int(self._spots[vehicle_id])
+        self._lot._unloaded_sz -= 1
+        self._spots[vehicle_id] = -1
+        return vehicle
+
+    # mask of the ids (an array) whose restored vehicle was not created yet
+    def unloaded(self, ids):
+        restored = ids < len(self._spots)
+        unloaded = np.zeros(len(ids), dtype=bool)
+        unloaded[restored] = self._spots[ids[restored]] >= 0
+        return unloaded
+
+    def sizes_of(self, ids):
+        return self._sizes[ids]
+
+    def load_all(self):
+        for vehicle_id in np.flatnonzero(self._spots >= 0).tolist():
+            self[vehicle_id]
+
+
+#%% lazy spot view
+
+class SpotsView(Sequence):
+    # read-only view of the lot's spots - SpotView objects are created on access
+
+    def __init__(self, lot):
+        self._lot = lot
+
+    def __len__(self):
+        return self._lot.getTotalSpotsSz()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [SpotView(self._lot, j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("spot index out of range")
+        return SpotView(self._lot, i)
+
+
+class SpotView:
+    # the Spot getters for one spot of an ArrayParkingLot
+
+    def __init__(self, lot, i):
+        self._lot = lot
+        self._i = i
+
+    def is_open(self):
+        return bool(self._lot._occupants[self._i] < 0)
+
+    def getParkedVec(self):
+        vehicle_id = int(self._lot._occupants[self._i])
+        return self._lot._vehicles[vehicle_id] if vehicle_id >= 0 else None
+
+    def getSpotSize(self):
+        return self._lot._spot_size_at(self._i)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Capacity planner: which spot mix to build on a given area
+
+Every candidate (small, med, big) spot mix that fits the area budget is
+scored by its mean parking efficiency over `runs` seeded simulations of the
+expected vehicle mix (monte_carlo.simulate_once). The planner scores a
+coarse grid first, then refines around the current Pareto front with
+smaller and smaller steps. Candidates are scored across a process pool, and
+every score is memoized, so a candidate reached again costs nothing.
+Every candidate uses the same seeds (common random numbers), so the
+differences between candidates come from the mix and not from the luck of
+the draw.
+
+Example:
+    planner = CapacityPlanner(budget=120, vehicles=(10, 30, 5), runs=200)
+    front = planner.plan()          # DataFrame: small, med, big, area, cost, efficiency, std
+    planner.getScores()             # every candidate scored
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from monte_carlo import run_seeds, simulate_once
+
+# area of one spot of each size class, in small-spot units
+SPOT_AREA = {1: 1.0, 2: 2.0, 3: 3.0}
+COLUMNS = ["small", "med", "big", "area", "cost", "efficiency", "std"]
+
+
+def score_mix(config, seeds, policy='first_fit'):
+    """Mean and standard deviation of the efficiency of config over the seeded runs"""
+    efficiency = np.array([simulate_once(config, seed, policy)["efficiency"] for seed in seeds])
+    return float(efficiency.mean()), float(efficiency.std())
+
+
+def pareto_front(scores):
+    """The candidates no other candidate beats on both cost (lower) and efficiency (higher)
+
+    scores - DataFrame with cost and efficiency columns; returns the front by rising cost
+    """
+    ordered = scores.sort_values(["cost", "efficiency"], ascending=[True, False])
+    best = -np.inf
+    keep = []
+    for label, efficiency in ordered["efficiency"].items():
+        if efficiency > best:
+            keep.append(label)
+            best = efficiency
+    return ordered.loc[keep].reset_index(drop=True)
+
+
+class CapacityPlanner:
+    # budget   - total area the spots may take
+    # vehicles - expected (motorcycles, cars, buses) in one simulation
+    # area     - {spot size: area of one spot} (default SPOT_AREA)
+    # cost     - {spot size: cost of one spot} (default: its area)
+    # runs     - simulations per candidate
+    # workers  - process count (default: all cores); 1 scores in this process
+    # policy   - park_many policy of the simulations
+
+    def __init__(self, budget, vehicles, area=None, cost=None, runs=200, seed=0, workers=None, policy='first_fit'):
+        self._budget = budget
+        self._vehicles = tuple(vehicles)
+        self._area = dict(area or SPOT_AREA)
+        self._cost = dict(cost or self._area)
+        self._seeds = run_seeds(runs, seed)
+        self._workers = workers or os.cpu_count() or 1
+        self._policy = policy
+        # (small, med, big) -> (mean efficiency, std) - every candidate scored so far
+        self._scores = {}
+        self.cache_hits = 0
+
+    # getters
+    def getArea(self, mix):
+        return sum(self._area[spot_size] * count for spot_size, count in zip((1, 2, 3), mix))
+
+    def getCost(self, mix):
+        return sum(self._cost[spot_size] * count for spot_size, count in zip((1, 2, 3), mix))
+
+    def fits(self, mix):
+        return min(mix) >= 0 and sum(mix) > 0 and self.getArea(mix) <= self._budget
+
+    # every scored candidate as a DataFrame
+    def getScores(self):
+        rows = [(*mix, self.getArea(mix), self.getCost(mix), efficiency, std)
+                for mix, (efficiency, std) in self._scores.items()]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def grid(self, step):
+        """Every mix on a grid of `step` spots that fits the budget"""
+        most = [int(self._budget // self._area[spot_size]) for spot_size in (1, 2, 3)]
+        return [(small, med, big)
+                for small in range(0, most[0] + 1, step)
+                for med in range(0, most[1] + 1, step)
+                for big in range(0, most[2] + 1, step)
+                if self.fits((small, med, big))]
+
+    def neighbors(self, mix, step):
+        """Mixes `step` spots away: one size class more or fewer, or spots moved between two classes"""
+        moves = [np.eye(3, dtype=int)[k] * sign for k in range(3) for sign in (1, -1)]
+        moves += [np.eye(3, dtype=int)[a] - np.eye(3, dtype=int)[b] for a in range(3) for b in range(3) if a != b]
+        candidates = (tuple(int(count) for count in np.array(mix) + step * move) for move in moves)
+        return [candidate for candidate in candidates if self.fits(candidate)]
+
+    def evaluate(self, candidates, pool=None):
+        """Score the candidates not scored yet - across the pool if there is one"""
+        new = []
+        for mix in dict.fromkeys(candidates):
+            if mix in self._scores:
+                self.cache_hits += 1
+            else:
+                new.append(mix)
+        configs = [mix + self._vehicles for mix in new]
+        if pool is None:
+            scores = [score_mix(config, self._seeds, self._policy) for config in configs]
+        else:
+            # a few tasks per worker keeps all cores busy without per-task overhead
+            chunk_sz = max(1, len(configs) // (self._workers * 4))
+            scores = pool.map(score_mix, configs, [self._seeds] * len(configs), [self._policy] * len(configs),
+                              chunksize=chunk_sz)
+        self._scores.update(zip(new, scores))
+        return len(new)
+
+    def plan(self, grid_step=None, max_rounds=20):
+        """Grid search, then local refinement around the Pareto front - returns the front
+
+        grid_step - spots between grid points (default: about 10 points per size class)
+        """
+        if grid_step is None:
+            grid_step = max(1, int(self._budget // self._area[1]) // 10)
+        pool = ProcessPoolExecutor(max_workers=self._workers) if self._workers > 1 else None
+        try:
+            self.evaluate(self.grid(grid_step), pool)
+            step = grid_step
+            for n in range(max_rounds):
+                front = pareto_front(self.getScores())
+                candidates = [neighbor for mix in front[["small", "med", "big"]].itertuples(index=False)
+                              for neighbor in self.neighbors(tuple(mix), step)]
+                # refine with the same step until the front stops moving, then with half of it
+                if not self.evaluate(candidates, pool):
+                    if step == 1:
+                        break
+                    step = max(1, step // 2)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return pareto_front(self.getScores())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search spot mixes for the best efficiency per cost")
+    parser.add_argument("--budget", type=float, default=120, help="area the spots may take")
+    parser.add_argument("--vehicles", type=int, nargs=3, default=[10, 30, 5], metavar=("MOTORCYCLES", "CARS", "BUSES"))
+    parser.add_argument("--runs", type=int, default=200, help="simulations per candidate")
+    parser.add_argument("--workers", type=int, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    planner = CapacityPlanner(args.budget, args.vehicles, runs=args.runs, seed=args.seed, workers=args.workers)
+    start = time.perf_counter()
+    front = planner.plan()
+    elapsed = time.perf_counter() - start
+    print(f"📐 {len(planner.getScores())} spot mixes scored ({planner.cache_hits} cache hits) "
+          f"with {args.runs} simulations each in {elapsed:.1f} s")
+    print(f"🏆 Pareto front of efficiency vs. cost for {tuple(args.vehicles)} vehicles on area {args.budget:g}:")
+    print(front.round(3).to_string(index=False))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Thread-safe parking lot for several entry gates sharing one lot.
+
+Every size class has its own lock, guarding the free-spot heap and the
+spots of that class. An arrival locks only the size classes the vehicle
+fits in (a bus only the big spots, a car the medium and big ones), always
+in ascending size order so two gates can never deadlock, and still gets
+the same first-fit spot as ParkingLot. A departure locks only the class
+of the spot it frees. The live occupancy counters are kept per size class,
+so they are guarded by the same locks.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import threading
+from contextlib import contextmanager
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot
+
+
+@contextmanager
+def holding(locks):
+    """Acquire the locks in the given order, release them in reverse"""
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+#%% parking lot
+class ConcurrentParkingLot(ParkingLot):
+
+    def __init__(self, small_spot_sz, med_spot_sz, big_spot_sz, rng=None, layout=None):
+        ParkingLot.__init__(self, small_spot_sz, med_spot_sz, big_spot_sz, rng, layout)
+        self._init_locks()
+
+    def _restore(self, path, vehicles=None):
+        ParkingLot._restore(self, path, vehicles)
+        self._init_locks()
+
+    def _init_locks(self):
+        self._locks = {spot_size: threading.Lock() for spot_size in sorted(self._free_spots)}
+        self._all_locks = list(self._locks.values())
+        # vehicle size class -> the locks it parks under, in ascending size order
+        self._park_locks = {}
+
+    def _locks_for(self, new_vehicle):
+        need = new_vehicle.getSize()
+        locks = self._park_locks.get(need)
+        if locks is None:
+            locks = [lock for spot_size, lock in self._locks.items() if spot_size >= need]
+            self._park_locks[need] = locks
+        return locks
+
+    def _park(self, new_vehicle, policy=None):
+        with holding(self._locks_for(new_vehicle)):
+            return ParkingLot._park(self, new_vehicle, policy)
+
+    def park_many(self, vehicles, policy='optimal'):
+        if policy not in ('optimal', 'best_fit'):
+            # vehicle by vehicle, each under its own locks
+            return ParkingLot.park_many(self, vehicles, policy)
+        # a batch may use every size class
+        with holding(self._all_locks):
+            return ParkingLot.park_many(self, vehicles, policy)
+
+    def unpark(self, vehicle):
+        i = self._vehicle_spots.get(vehicle)
+        if i is None:
+            return False
+        with self._locks[self._spot_size_at(i)]:
+            # another gate may have unparked it since we looked it up
+            if self._vehicle_spots.get(vehicle) != i:
+                return False
+            ParkingLot.unpark_spot(self, i)
+        return True
+
+    def unpark_spot(self, i):
+        with self._locks[self._spot_size_at(i)]:
+            return ParkingLot.unpark_spot(self, i)
+
+    # getters
+    # open spots per size class, read under all the locks so the counts are consistent
+    def getOpenSpotsBySize(self):
+        with holding(self._all_locks):
+            return {spot_size: len(free) for spot_size, free in self._free_spots.items()}
+
+    def getOpenSpotsSz(self):
+        return sum(self.getOpenSpotsBySize().values())
+
+    def getOccupiedSpotsBySize(self):
+        with holding(self._all_locks):
+            return ParkingLot.getOccupiedSpotsBySize(self)
+
+    def getParkedByType(self):
+        with holding(self._all_locks):
+            return ParkingLot.getParkedByType(self)
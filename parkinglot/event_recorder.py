@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar event recorder for parking analytics
+
+An EventRecorder is an event sink (see parking_events.py) that keeps
+every event in preallocated NumPy columns - time, vehicle type, spot,
+spot size and outcome - doubling them when they are full. Recording an
+event appends its time and one packed integer to two small staging
+buffers, which are decoded into the columns a block at a time with
+vectorized operations, so an event costs about as much as two list
+appends. The columns export to a pandas DataFrame without copying
+(to_frame) or to a compressed .npz (save / load). Occupancy and rejection
+rates over time are then vectorized one-liners over the columns.
+
+Example:
+    sim = ParkingSimulation(PL, PoissonArrivals(rate=2.0, seed=1), ExponentialDwell(60))
+    recorder = EventRecorder(clock=lambda: sim.now)
+    PL.setEventSink(recorder)
+    sim.run(until=24 * 60)
+    recorder.to_frame()                 # time, vehicle, spot, spot_size, outcome
+    recorder.rolling_rejection_rate(60) # share of the last hour's arrivals rejected
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import time
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import VEHICLE_BY_SIZE
+from parking_events import EventSink
+
+# outcome codes (categories of the outcome column)
+PARKED, REJECTED, UNPARKED, SPOT_TOO_SMALL = 0, 1, 2, 3
+OUTCOMES = ["parked", "rejected", "unparked", "spot_too_small"]
+# vehicle codes are the vehicle size classes minus one
+VEHICLE_TYPES = [VEHICLE_BY_SIZE[size]().getType() for size in sorted(VEHICLE_BY_SIZE)]
+COLUMNS = {"time": np.float64, "vehicle": np.int8, "spot": np.int64, "spot_size": np.int8, "outcome": np.int8}
+# staged events decoded into the columns at once
+BLOCK_SIZE = 4096
+
+
+class EventRecorder(EventSink):
+    # clock       - callable returning the time of an event (default time.perf_counter;
+    #               pass lambda: sim.now to record simulation time)
+    # capacity    - events preallocated, the columns double when they are full
+    # spot_events - also record every open spot that was too small
+
+    def __init__(self, clock=time.perf_counter, capacity=1 << 16, spot_events=False):
+        self.wants_spot_events = spot_events
+        self._clock = clock
+        self._size = 0
+        self._allocate(max(capacity, 1))
+        # staging buffers: the time of every event, and
+        # spot << 8 | spot size << 4 | vehicle size << 2 | outcome
+        self._staged_times = array('d')
+        self._staged_codes = array('q')
+        self._staged = 0
+
+    def _allocate(self, capacity):
+        old = getattr(self, "_columns", None)
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        if old is not None:
+            for name, column in old.items():
+                self._columns[name][:self._size] = column[:self._size]
+        # the columns as attributes, for the recording hot path
+        self._time = self._columns["time"]
+        self._vehicle = self._columns["vehicle"]
+        self._spot = self._columns["spot"]
+        self._spot_size = self._columns["spot_size"]
+        self._outcome = self._columns["outcome"]
+
+    def _record(self, vehicle, spot, spot_size, outcome):
+        self._staged_times.append(self._clock())
+        self._staged_codes.append(spot << 8 | spot_size << 4 | vehicle._size << 2 | outcome)
+        self._staged += 1
+        if self._staged == BLOCK_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Decode the staged events into the columns"""
+        staged = self._staged
+        if not staged:
+            return
+        n = self._size
+        if n + staged > len(self._time):
+            self._allocate(max(2 * len(self._time), n + staged))
+        codes = np.frombuffer(self._staged_codes, dtype=np.int64)
+        self._time[n:n + staged] = np.frombuffer(self._staged_times, dtype=np.float64)
+        self._spot[n:n + staged] = codes >> 8
+        self._spot_size[n:n + staged] = (codes >> 4) & 0xf
+        self._vehicle[n:n + staged] = ((codes >> 2) & 0x3) - 1
+        self._outcome[n:n + staged] = codes & 0x3
+        del codes
+        self._staged_times = array('d')
+        self._staged_codes = array('q')
+        self._staged = 0
+        self._size = n + staged
+
+    def parked(self, vehicle, spot, spot_size):
+        self._record(vehicle, spot, spot_size, PARKED)
+
+    def rejected(self, vehicle):
+        self._record(vehicle, -1, 0, REJECTED)
+
+    def spot_too_small(self, vehicle, spot, spot_size):
+        self._record(vehicle, spot, spot_size, SPOT_TOO_SMALL)
+
+    def unparked(self, vehicle, spot, spot_size):
+        self._record(vehicle, spot, spot_size, UNPARKED)
+
+    def __len__(self):
+        return self._size + self._staged
+
+    # the recorded part of a column - a view, not a copy
+    def column(self, name):
+        self.flush()
+        return self._columns[name][:self._size]
+
+    #%% export
+
+    def to_frame(self):
+        """The events as a DataFrame that shares the recorder's memory (vehicle and outcome are categoricals)"""
+        return pd.DataFrame({
+            "time": self.column("time"),
+            "vehicle": pd.Categorical.from_codes(self.column("vehicle"), VEHICLE_TYPES),
+            "spot": self.column("spot"),
+            "spot_size": self.column("spot_size"),
+            "outcome": pd.Categorical.from_codes(self.column("outcome"), OUTCOMES),
+        }, copy=False)
+
+    def save(self, path):
+        """Write the columns to a compressed .npz"""
+        np.savez_compressed(path, **{name: self.column(name) for name in COLUMNS})
+
+    @classmethod
+    def load(cls, path):
+        """A recorder holding the events saved at path"""
+        with np.load(path) as data:
+            size = len(data["time"])
+            recorder = cls(capacity=size)
+            for name in COLUMNS:
+                recorder._columns[name][:size] = data[name]
+        recorder._size = size
+        return recorder
+
+    #%% aggregates
+
+    def occupancy(self):
+        """Parked vehicles after every event, as a Series indexed by time"""
+        outcome = self.column("outcome")
+        return pd.Series(np.cumsum((outcome == PARKED).astype(np.int64) - (outcome == UNPARKED)),
+                         index=self.column("time"), name="occupancy")
+
+    def rolling_occupancy(self, window):
+        """Time-weighted mean occupancy over the `window` before every event"""
+        occupied = self.occupancy().to_numpy()
+        times = self.column("time")
+        # area under the occupancy step function up to every event, linear in between
+        area = np.concatenate(([0.0], np.cumsum(occupied[:-1] * np.diff(times))))
+        return pd.Series((area - np.interp(times - window, times, area)) / window,
+                         index=times, name="rolling_occupancy")
+
+    def rolling_rejection_rate(self, window):
+        """Share of the arrivals in the `window` up to every arrival that were rejected"""
+        outcome = self.column("outcome")
+        arrived = (outcome == PARKED) | (outcome == REJECTED)
+        times = self.column("time")[arrived]
+        rejected = np.cumsum(outcome[arrived] == REJECTED)
+        # arrivals and rejections strictly before the window, from the running counts
+        before = np.searchsorted(times, times - window, side="right")
+        rejected_before = np.concatenate(([0], rejected))[before]
+        rate = (rejected - rejected_before) / (np.arange(1, len(times) + 1) - before)
+        return pd.Series(rate, index=times, name="rejection_rate")
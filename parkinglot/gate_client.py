@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Load generator for the parking lot gate service (gate_server.py)
+
+Opens several gate connections, each pipelining PARK requests and then
+UNPARK-ing the vehicles it parked, and reports throughput and p50/p99
+request latency.
+
+Run with `python parkinglot/gate_client.py --port 8765`, or with
+`--local` to start a server in the same process.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+
+# Add the current directory to the path to import the gate server
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from gate_server import GateServer, VEHICLE_TYPES
+from ParkingLot import ParkingLot
+
+
+def percentile(sorted_values, q):
+    """q-th percentile (0-100) of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+async def run_gate(host, port, requests, pipeline, latencies, seed):
+    """One gate: rounds of `pipeline` PARKs followed by UNPARKs of the parked vehicles"""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    vehicle_types = list(VEHICLE_TYPES)
+    counts = {"parked": 0, "full": 0, "unparked": 0}
+    sent = 0
+
+    async def exchange(lines):
+        send_times = deque()
+        for line in lines:
+            send_times.append(time.perf_counter())
+            writer.write(line.encode())
+        await writer.drain()
+        answers = []
+        for n in range(len(lines)):
+            answers.append((await reader.readline()).decode().split())
+            latencies.append(time.perf_counter() - send_times.popleft())
+        return answers
+
+    while sent < requests:
+        batch = min(pipeline, (requests - sent + 1) // 2) or 1
+        answers = await exchange([f"PARK {rng.choice(vehicle_types)}\n" for n in range(batch)])
+        parked = [answer[1] for answer in answers if answer[0] == "OK"]
+        counts["parked"] += len(parked)
+        counts["full"] += batch - len(parked)
+        sent += batch
+        if parked:
+            answers = await exchange([f"UNPARK {vehicle_id}\n" for vehicle_id in parked])
+            counts["unparked"] += sum(1 for answer in answers if answer[0] == "OK")
+            sent += len(parked)
+
+    writer.close()
+    await writer.wait_closed()
+    return counts
+
+
+async def run_load(host, port, connections=16, requests=20_000, pipeline=32, seed=0):
+    """Run `connections` gates concurrently, `requests` requests in total
+
+    returns a dict with the request count, throughput and p50/p99 latency (ms)
+    """
+    latencies = []
+    start = time.perf_counter()
+    per_gate = await asyncio.gather(*(
+        run_gate(host, port, requests // connections, pipeline, latencies, seed + n)
+        for n in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {name: sum(counts[name] for counts in per_gate) for name in per_gate[0]}
+    result.update({
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+    })
+    return result
+
+
+async def run_local(args):
+    """Start a gate server in this process and load it"""
+    server = GateServer(ParkingLot(*args.spots), batch_window=args.batch_window)
+    tcp_server = await server.start(args.host, 0)
+    port = tcp_server.sockets[0].getsockname()[1]
+    async with tcp_server:
+        result = await run_load(args.host, port, args.connections, args.requests, args.pipeline)
+    result["batches"] = server.batches
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the parking lot gate service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--pipeline", type=int, default=32)
+    parser.add_argument("--local", action="store_true", help="start a server in this process")
+    parser.add_argument("--spots", type=int, nargs=3, default=[20_000, 60_000, 20_000],
+                        metavar=("SMALL", "MEDIUM", "BIG"))
+    parser.add_argument("--batch-window", type=float, default=0.002, help="seconds (with --local)")
+    args = parser.parse_args()
+
+    if args.local:
+        result = asyncio.run(run_local(args))
+    else:
+        result = asyncio.run(run_load(args.host, args.port, args.connections, args.requests, args.pipeline))
+
+    print("📊 GATE LOAD RESULTS")
+    print("-" * 30)
+    for name, value in result.items():
+        print(f"{name:>16}: {value:,.2f}" if isinstance(value, float) else f"{name:>16}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
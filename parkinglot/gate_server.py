@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio gate service for the Parking Lot Simulation
+
+Gate controllers talk to one ParkingLot over TCP with a line protocol:
+
+    PARK <MOTORCYCLE|CAR|BUS>  ->  OK <vehicle id> <spot>   or   FULL
+    UNPARK <vehicle id>        ->  OK <spot>                or   UNKNOWN
+    STATUS                     ->  OK <open spots> <total spots> <parked vehicles>
+
+Requests may be pipelined; every connection gets its answers in request
+order. PARK requests arriving within `batch_window` seconds of each other
+(from any connection) are coalesced into a single park_many() call; any
+other request first flushes the pending PARKs, so it sees their result.
+
+Run with `python parkinglot/gate_server.py --port 8765` and load it with
+gate_client.py. With `--snapshot lot.snapshot` the lot's layout, occupancy
+and the vehicle ids handed out survive a restart - vehicles parked before it
+can still be UNPARKed. A PARK gets the lowest vehicle id not in use, so ids
+(and the snapshot's table of them) stay below the most vehicles ever parked
+at once, however long the server runs.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import heapq
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+
+VEHICLE_TYPES = {"MOTORCYCLE": Motorcycle, "CAR": Car, "BUS": Bus}
+
+
+class GateServer:
+    # lot          - the ParkingLot all gates share
+    # batch_window - how long (seconds) a PARK waits for others to batch with
+    # max_batch    - a batch is allocated at once when it reaches this size
+    # policy       - park_many policy used for each batch
+    # vehicles     - vehicle id -> vehicle already parked in the lot, e.g. the
+    #                ones restored from a snapshot by ParkingLot.load
+
+    def __init__(self, lot, batch_window=0.002, max_batch=4096, policy='optimal', vehicles=None):
+        self._lot = lot
+        self._batch_window = batch_window
+        self._max_batch = max_batch
+        self._policy = policy
+        # vehicle id -> parked vehicle
+        self._vehicles = dict(vehicles or {})
+        self._next_vehicle_id = max(self._vehicles, default=-1) + 1
+        # ids below _next_vehicle_id that are free again, a heap
+        self._free_ids = [vehicle_id for vehicle_id in range(self._next_vehicle_id) if vehicle_id not in self._vehicles]
+        # pending PARK requests: (vehicle, future)
+        self._pending = []
+        self._flush_handle = None
+        self.batches = 0
+
+    # restore the lot saved by save() at path, with the vehicle ids it handed out
+    @classmethod
+    def load(cls, path, **kwargs):
+        vehicles = {}
+        lot = ParkingLot.load(path, vehicles)
+        return cls(lot, vehicles=vehicles, **kwargs)
+
+    def save(self, path):
+        """Snapshot the lot, the parked vehicles under their ids (pending PARKs are not parked yet)"""
+        self._lot.save(path, {vehicle: vehicle_id for vehicle_id, vehicle in self._vehicles.items()})
+
+    def getLot(self):
+        return self._lot
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Start listening, returns the asyncio server"""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader, writer):
+        # answers are queued as futures in request order and written by a second task
+        answers = asyncio.Queue()
+        write_task = asyncio.create_task(self._write_answers(answers, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                answers.put_nowait(self._handle_request(line.decode(errors="replace").split()))
+        finally:
+            answers.put_nowait(None)
+            await write_task
+            writer.close()
+
+    async def _write_answers(self, answers, writer):
+        while True:
+            answer = await answers.get()
+            if answer is None:
+                break
+            if isinstance(answer, asyncio.Future):
+                answer = await answer
+            writer.write(answer.encode())
+            # let the buffer fill while more answers are ready
+            if answers.empty():
+                await writer.drain()
+
+    # returns the answer line, or a future of it for a batched PARK
+    def _handle_request(self, words):
+        if not words:
+            return "ERROR empty request\n"
+        command = words[0].upper()
+
+        if command == "PARK" and len(words) == 2 and words[1].upper() in VEHICLE_TYPES:
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((VEHICLE_TYPES[words[1].upper()](), future))
+            if len(self._pending) >= self._max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self._batch_window, self._flush)
+            return future
+
+        # anything else sees the lot after the PARKs that came before it
+        self._flush()
+
+        # isdigit() alone also takes digits int() cannot read, such as "²"
+        if command == "UNPARK" and len(words) == 2 and words[1].isascii() and words[1].isdigit():
+            vehicle = self._vehicles.pop(int(words[1]), None)
+            if vehicle is None:
+                return "UNKNOWN\n"
+            heapq.heappush(self._free_ids, int(words[1]))
+            spot = self._lot.getVehicleSpot(vehicle)
+            self._lot.unpark(vehicle)
+            return f"OK {spot}\n"
+
+        if command == "STATUS":
+            return f"OK {self._lot.getOpenSpotsSz()} {self._lot.getTotalSpotsSz()} {len(self._vehicles)}\n"
+
+        return f"ERROR bad request: {' '.join(words)}\n"
+
+    # allocate every pending PARK in one park_many call
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        self.batches += 1
+        spots = self._lot.park_many([vehicle for vehicle, future in pending], policy=self._policy)
+        for (vehicle, future), spot in zip(pending, spots):
+            if spot < 0:
+                future.set_result("FULL\n")
+            else:
+                if self._free_ids:
+                    vehicle_id = heapq.heappop(self._free_ids)
+                else:
+                    vehicle_id = self._next_vehicle_id
+                    self._next_vehicle_id += 1
+                self._vehicles[vehicle_id] = vehicle
+                future.set_result(f"OK {vehicle_id} {spot}\n")
+
+
+async def serve(server, host, port):
+    lot = server.getLot()
+    tcp_server = await server.start(host, port)
+    print(f"🅿️  Gate server for {lot.getTotalSpotsSz()} spots listening on {host}:{port}")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio gate service for a parking lot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spots", type=int, nargs=3, default=[20_000, 60_000, 20_000],
+                        metavar=("SMALL", "MEDIUM", "BIG"))
+    parser.add_argument("--batch-window", type=float, default=0.002, help="seconds")
+    parser.add_argument("--snapshot", help="restore the lot from this file if it exists, save it there on exit")
+    args = parser.parse_args()
+
+    if args.snapshot and os.path.exists(args.snapshot):
+        server = GateServer.load(args.snapshot, batch_window=args.batch_window)
+        lot = server.getLot()
+        print(f"📂 Restored {lot.getTotalSpotsSz()} spots ({lot.getParkedSz()} parked) from {args.snapshot}")
+    else:
+        server = GateServer(ParkingLot(*args.spots), batch_window=args.batch_window)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Gate server stopped. Goodbye!")
+    finally:
+        if args.snapshot:
+            server.save(args.snapshot)
+
+
+if __name__ == "__main__":
+    main()
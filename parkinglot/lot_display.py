@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Live terminal display of a parking lot
+
+Instead of printing the whole lot again after every vehicle, LotDisplay
+draws the frame once at a fixed place on the screen and then repaints only
+the cells that changed since the last refresh, with ANSI cursor
+positioning - every refresh is one write. Lots that do not fit on the
+screen are shown a window (page) of rows at a time.
+
+Example:
+    display = LotDisplay(PL)
+    display.begin()        # clear the screen and draw the frame at the top
+    PL.park_new_vec(vehicle)
+    display.refresh()      # repaint the changed spots only
+    display.end()
+
+Between begin() and end() the lines below the frame are a scroll region,
+so messages printed while the lot changes (e.g. a PrintSink) scroll there
+and never move the frame.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import shutil
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import SPOTS_PER_ROW
+
+# ANSI escape sequences
+CLEAR_SCREEN = "\x1b[2J"
+RESET_SCROLL_REGION = "\x1b[r"
+
+
+def move_to(row, col):
+    return f"\x1b[{row};{col}H"
+
+
+class LotDisplay:
+    # lot           - the ParkingLot to show
+    # stream        - the terminal to write to
+    # rows          - rows of spots in the window (default: as many as fit on
+    #                 the screen next to `message_lines` lines of messages)
+    # spots_per_row - spots in every row of the frame
+
+    def __init__(self, lot, stream=None, rows=None, spots_per_row=SPOTS_PER_ROW, message_lines=8):
+        self._lot = lot
+        self._stream = stream or sys.stdout
+        self._spots_per_row = spots_per_row
+        self._screen_lines = shutil.get_terminal_size().lines
+        if rows is None:
+            # the frame takes 3 lines per row, plus its title, the legend and an empty line
+            rows = max(1, (self._screen_lines - message_lines - 4) // 3)
+        self._rows = rows
+        self._first_spot = 0
+        # the cells on screen, None until the frame is drawn
+        self._cells = None
+
+    # spots shown in one window
+    def getWindowSz(self):
+        return self._rows * self._spots_per_row
+
+    def getFirstSpot(self):
+        return self._first_spot
+
+    # lines the frame takes on screen: the title, 3 lines per row of spots,
+    # the legend and an empty line
+    def getFrameHeight(self):
+        lot_rows = -(-self._lot.getTotalSpotsSz() // self._spots_per_row)
+        return 1 + 3 * min(self._rows, lot_rows) + 3
+
+    def begin(self):
+        """Clear the screen, draw the frame at the top and let messages scroll below it"""
+        self._stream.write(CLEAR_SCREEN + move_to(1, 1))
+        self.draw()
+        height = self.getFrameHeight()
+        if height < self._screen_lines:
+            self._stream.write(f"\x1b[{height + 1};{self._screen_lines}r" + move_to(height + 1, 1))
+        self._stream.flush()
+
+    def end(self):
+        """Give the whole screen back, with the cursor below everything"""
+        self._stream.write(RESET_SCROLL_REGION + move_to(self._screen_lines, 1) + "\n")
+        self._stream.flush()
+
+    def draw(self):
+        """Draw the whole frame of the current window at the top of the screen"""
+        frame = self._lot.render_parking_lot(self._first_spot, self.getWindowSz(), self._spots_per_row)
+        # the last window may be shorter - blank the lines left over from a longer one
+        frame += "\n" * (self.getFrameHeight() - frame.count("\n"))
+        self._stream.write("\x1b7" + move_to(1, 1) + frame.replace("\n", "\x1b[K\n") + "\x1b8")
+        self._stream.flush()
+        self._cells = self._lot.getSpotCells(self._first_spot, self._first_spot + self.getWindowSz())
+
+    def refresh(self):
+        """Repaint the spots that changed since the last refresh, returns how many"""
+        if self._cells is None:
+            self.draw()
+            return len(self._cells)
+
+        cells = self._lot.getSpotCells(self._first_spot, self._first_spot + self.getWindowSz())
+        if len(cells) != len(self._cells):
+            self.draw()
+            return len(cells)
+
+        out = []
+        for j, (old, new) in enumerate(zip(self._cells, cells)):
+            if old != new:
+                row, col = divmod(j, self._spots_per_row)
+                # title line, then 3 lines per row - the cells are on the middle one
+                out.append(move_to(3 + 3 * row, 2 + 4 * col) + new)
+        if out:
+            # save and restore the cursor so the messages below are not disturbed
+            self._stream.write("\x1b7" + "".join(out) + "\x1b8")
+            self._stream.flush()
+        self._cells = cells
+        return len(out)
+
+    # windowed view - show the window starting at spot `first_spot`
+    def show(self, first_spot):
+        last_window = max(0, self._lot.getTotalSpotsSz() - 1) // self.getWindowSz() * self.getWindowSz()
+        self._first_spot = min(max(0, first_spot), last_window)
+        self.draw()
+
+    # show the window containing spot i, if it is not shown already
+    def reveal(self, i):
+        if not self._first_spot <= i < self._first_spot + self.getWindowSz():
+            self.show(i - i % self.getWindowSz())
+
+    def page_down(self):
+        self.show(self._first_spot + self.getWindowSz())
+
+    def page_up(self):
+        self.show(self._first_spot - self.getWindowSz())
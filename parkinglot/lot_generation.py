@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized, seeded generation of parking lots and vehicle fleets
+
+Spot layouts and fleets are generated as int8 arrays of size classes with
+one vectorized permutation from a numpy.random.Generator (or a seed), so a
+run is reproducible and a 10M-spot lot with a 10M-vehicle fleet takes a
+fraction of a second. ParkingLot and ArrayParkingLot both shuffle their
+spots here, so the same rng gives them the same layout. Vehicle objects are
+only created when they are asked for:
+
+    sizes = generate_spot_sizes(2_000_000, 6_000_000, 2_000_000, rng=42)
+    PL = ArrayParkingLot(2_000_000, 6_000_000, 2_000_000, rng=42)     # same layout
+    fleet = generate_fleet(2_000_000, 7_000_000, 1_000_000, rng=43)
+    fleet.getSizes()        # the int8 size classes - no objects yet
+    PL.park_many(fleet[:1000])                                         # 1000 Vehicles
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import random
+from collections.abc import Sequence
+
+import numpy as np
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import VEHICLE_BY_SIZE
+
+SIZE_CLASSES = np.array([1, 2, 3], dtype=np.int8)
+
+
+def as_generator(rng=None):
+    """A numpy.random.Generator from a Generator, a seed, a random.Random or None
+
+    A random.Random (or None: the random module's global one) gives the seed,
+    so random.seed() makes runs reproducible as well.
+    """
+    if rng is None:
+        rng = random.getrandbits(64)
+    elif isinstance(rng, random.Random):
+        rng = rng.getrandbits(64)
+    return np.random.default_rng(rng)
+
+
+def shuffled_sizes(counts, rng=None):
+    """counts[k] times size class k+1, in a uniformly random order, as an int8 array
+
+    Every element draws its class on its own, with probability about
+    counts[k] / total, and then randomly chosen elements of the classes that
+    came out too big move to the classes that came out too small. Neither
+    step tells positions apart, so every order is equally likely - the same
+    result as a shuffle, without a sequential pass over the whole array.
+    """
+    rng = as_generator(rng)
+    counts = np.asarray(counts, dtype=np.int64)
+    classes = SIZE_CLASSES[:len(counts)]
+    total = int(counts.sum())
+    sizes = draw_classes(rng, total, counts)
+
+    surplus = np.bincount(sizes, minlength=len(classes) + 1)[1:] - counts
+    if surplus.any():
+        moved = np.concatenate([rng.choice(np.flatnonzero(sizes == classes[k]), surplus[k], replace=False)
+                                for k in np.flatnonzero(surplus > 0)])
+        rng.shuffle(moved)
+        short = np.flatnonzero(surplus < 0)
+        sizes[moved] = np.repeat(classes[short], -surplus[short])
+    return sizes
+
+
+def generate_spot_sizes(small_spot_sz, med_spot_sz, big_spot_sz, rng=None):
+    """The spot size of every spot of a shuffled lot, as an int8 array"""
+    return shuffled_sizes([small_spot_sz, med_spot_sz, big_spot_sz], rng)
+
+
+def generate_fleet(motorcycles, cars, buses, rng=None):
+    """A shuffled fleet with exactly the given number of vehicles of each type"""
+    return VehicleFleet(shuffled_sizes([motorcycles, cars, buses], rng))
+
+
+def random_fleet(vehicles_sz, mix=(0.2, 0.7, 0.1), rng=None):
+    """A fleet of vehicles_sz vehicles, each a motorcycle / car / bus with the mix probabilities"""
+    return VehicleFleet(draw_classes(as_generator(rng), vehicles_sz, mix))
+
+
+def draw_classes(rng, length, weights):
+    """length independent size classes, class k+1 with probability weights[k] / sum(weights)"""
+    weights = np.asarray(weights, dtype=np.float64)
+    draws = rng.random(length, dtype=np.float32)
+    sizes = np.full(length, SIZE_CLASSES[0], dtype=np.int8)
+    for bound in np.cumsum(weights[:-1]) / max(weights.sum(), 1e-300):
+        sizes += draws >= bound
+    return sizes
+
+
+class VehicleFleet(Sequence):
+    # a fleet stored as an int8 array of vehicle size classes. A Vehicle is
+    # created the first time its index is read and kept, so fleet[i] is
+    # always the same vehicle (the lot tells parked vehicles apart by identity)
+
+    def __init__(self, sizes):
+        self._sizes = np.asarray(sizes, dtype=np.int8)
+        # index -> the Vehicle created for it
+        self._vehicles = {}
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self._sizes)
+        if not 0 <= i < len(self._sizes):
+            raise IndexError("fleet index out of range")
+        vehicle = self._vehicles.get(i)
+        if vehicle is None:
+            vehicle = VEHICLE_BY_SIZE[int(self._sizes[i])]()
+            self._vehicles[i] = vehicle
+        return vehicle
+
+    def __iter__(self):
+        for i in range(len(self._sizes)):
+            yield self[i]
+
+    # getters
+    def getSizes(self):
+        return self._sizes
+
+    # vehicles of every type, {vehicle type: count}, without creating them
+    def getTypeCounts(self):
+        counts = np.bincount(self._sizes, minlength=len(SIZE_CLASSES) + 1)
+        return {VEHICLE_BY_SIZE[int(size)]().getType(): int(counts[size]) for size in SIZE_CLASSES}
+
+    # vehicles created so far
+    def getMaterializedSz(self):
+        return len(self._vehicles)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Geography of a parking lot: where every spot is and where the entrances are
+
+A lot built with a LotLayout keeps, for every size class, one more heap of
+its open spots per entrance, ordered by walking distance from it (see
+NearestFreeSpots in ParkingLot.py). The NearestSpot allocation policy then
+gives each vehicle the nearest open spot that fits in O(log n):
+
+    layout = LotLayout.grid(5 + 10 + 3, entrances=[(0, 0), (19, 0)])
+    PL = ParkingLot(5, 10, 3, layout=layout)
+    PL.setPolicy(NearestSpot())                            # entrance 0
+    PL.park_many([Bus()], policy=NearestSpot(entrance=1))  # entrance 1
+
+Coordinates belong to spot indexes (physical places in the lot); which
+size class ends up where is still decided by the lot's shuffle.
+
+@author: Maya Galili
+"""
+
+import math
+
+from ParkingLot import SPOTS_PER_ROW
+
+
+class LotLayout:
+    # coordinates - (x, y) of every spot, in spot index order
+    # entrances   - (x, y) of every entrance
+    # metric      - distance between two points (default: straight line)
+
+    def __init__(self, coordinates, entrances, metric=math.dist):
+        if not entrances:
+            raise ValueError("a lot layout needs at least one entrance")
+        self._coordinates = [tuple(xy) for xy in coordinates]
+        self._entrances = [tuple(xy) for xy in entrances]
+        # distances[e][i] - distance from entrance e to spot i
+        self.distances = [[metric(entrance, xy) for xy in self._coordinates] for entrance in self._entrances]
+
+    # spots laid out in rows like the display, spots_per_row per row, one unit apart
+    @classmethod
+    def grid(cls, spots_sz, entrances=((0, 0),), spots_per_row=SPOTS_PER_ROW, metric=math.dist):
+        coordinates = [(i % spots_per_row, i // spots_per_row) for i in range(spots_sz)]
+        return cls(coordinates, entrances, metric)
+
+    # getters
+    def getSpotsSz(self):
+        return len(self._coordinates)
+
+    def getEntrancesSz(self):
+        return len(self._entrances)
+
+    def getCoordinates(self, i):
+        return self._coordinates[i]
+
+    def getEntrance(self, entrance):
+        return self._entrances[entrance]
+
+
+# walking distance along the aisles of a grid
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
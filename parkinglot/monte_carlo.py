@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo runner for parking lot simulations.
+
+A single run_simulation gives the parking efficiency of one random spot
+layout and one random arrival order. This module repeats that simulation
+thousands of times - display off, each run seeded - across a process pool,
+and returns the per-run results and their distribution as pandas DataFrames.
+
+Example:
+    runs = run_monte_carlo((5, 10, 3, 3, 8, 2), runs=10_000, seed=42)
+    summarize(runs)
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+
+METRICS = ["efficiency", "small_utilization", "med_utilization", "big_utilization"]
+
+
+def simulate_once(config, seed, policy='first_fit'):
+    """One quiet, seeded run of the parking simulation
+
+    config is (small, med, big, motorcycles, cars, buses), like run_simulation's
+    arguments; returns a dict with the run's results
+    """
+    small_spots, med_spots, big_spots, motorcycles, cars, buses = config
+    rng = Random(seed)
+    PL = ParkingLot(small_spots, med_spots, big_spots, rng=rng)
+
+    vec_set = ([Motorcycle() for i in range(motorcycles)]
+               + [Car() for i in range(cars)]
+               + [Bus() for i in range(buses)])
+    rng.shuffle(vec_set)
+
+    parked = sum(1 for i in PL.park_many(vec_set, policy=policy) if i >= 0)
+
+    return {
+        "seed": seed,
+        "parked": parked,
+        "failed": len(vec_set) - parked,
+        "efficiency": parked / len(vec_set) if vec_set else 1.0,
+        "small_utilization": PL.getUtilization(1),
+        "med_utilization": PL.getUtilization(2),
+        "big_utilization": PL.getUtilization(3),
+    }
+
+
+def _simulate_chunk(config, seeds, policy):
+    return [simulate_once(config, seed, policy) for seed in seeds]
+
+
+def run_seeds(runs, seed=0):
+    """The seed of every run - independent streams derived from one seed"""
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(runs)]
+
+
+def run_monte_carlo(config, runs=1000, seed=0, workers=None, policy='first_fit'):
+    """Run `runs` seeded simulations of config across a process pool
+
+    config  - (small, med, big, motorcycles, cars, buses)
+    seed    - the whole batch is reproducible from this seed
+    workers - process count (default: all cores); 1 runs in this process
+    policy  - park_many policy ('first_fit' is what run_simulation does)
+
+    returns a DataFrame with one row per run, in run order
+    """
+    seeds = run_seeds(runs, seed)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = _simulate_chunk(config, seeds, policy)
+    else:
+        # a few chunks per worker keeps all cores busy without per-run overhead
+        chunk_sz = max(1, -(-runs // (workers * 4)))
+        chunks = [seeds[i:i + chunk_sz] for i in range(0, runs, chunk_sz)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_simulate_chunk, [config] * len(chunks), chunks, [policy] * len(chunks))
+            rows = [row for chunk in results for row in chunk]
+
+    runs_df = pd.DataFrame(rows)
+    runs_df.index.name = "run"
+    return runs_df
+
+
+def summarize(runs_df, percentiles=(5, 25, 50, 75, 95)):
+    """Distribution of every metric: mean, std and percentiles, one row per metric"""
+    metrics = runs_df[METRICS]
+    summary = pd.DataFrame({"mean": metrics.mean(), "std": metrics.std()})
+    for p in percentiles:
+        summary[f"p{p}"] = metrics.quantile(p / 100)
+    return summary
+
+
+if __name__ == "__main__":
+    config = (5, 10, 3, 3, 8, 2)
+    runs_df = run_monte_carlo(config, runs=10_000, seed=42)
+    print(f"📊 {len(runs_df)} simulations of (small, med, big, motorcycles, cars, buses) = {config}")
+    print(summarize(runs_df).round(3))
@@ -0,0 +1,633 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the Parking Lot Simulation
+
+Run all benchmarks with `python parkinglot/parking_bench.py`, or a single one
+by name, e.g. `python parkinglot/parking_bench.py arrivals`.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from random import Random, shuffle
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus, MedSpot
+from array_parking_lot import ArrayParkingLot
+from concurrent_parking_lot import ConcurrentParkingLot
+from parking_events import NullSink, CounterSink, LogSink, PrintSink
+from lot_display import LotDisplay
+from parking_journal import ParkingJournal, replay
+from parking_sim import ParkingSimulation, PoissonArrivals, ExponentialDwell
+from allocation_policies import FirstFit, BestFit, WorstFit, ReservedQuota, NearestSpot
+from lot_layout import LotLayout
+from lot_generation import random_fleet
+from parking_trace import generate_trace, write_trace, replay_trace
+from parking_reservations import ReservationBook, ReservationPolicy
+from event_recorder import EventRecorder
+from parking_fleet import ParkingLotFleet
+
+
+def make_lot(total_spots, lot_class=ParkingLot, rng=None):
+    """Create a lot with a 20% small / 60% medium / 20% big spot mix"""
+    small = total_spots // 5
+    big = total_spots // 5
+    return lot_class(small, total_spots - small - big, big, rng=rng)
+
+
+def make_vehicles(vehicles_sz):
+    """Create a shuffled mix of 20% motorcycles, 70% cars and 10% buses"""
+    cycles = vehicles_sz // 5
+    buses = vehicles_sz // 10
+    vec_set = ([Motorcycle() for i in range(cycles)]
+               + [Car() for i in range(vehicles_sz - cycles - buses)]
+               + [Bus() for i in range(buses)])
+    shuffle(vec_set)
+    return vec_set
+
+
+#%% arrivals
+
+def bench_arrivals(lot_sizes=(10, 100, 1_000, 10_000, 100_000, 1_000_000), fill=0.9, arrivals=1_000):
+    """Per-arrival latency of a lot that is already `fill` full, for growing lot sizes"""
+    print("⏱️  ARRIVAL LATENCY (lot pre-filled to {:.0%})".format(fill))
+    print(f"{'spots':>10} {'arrivals':>10} {'µs/arrival':>12}")
+    results = []
+    for total_spots in lot_sizes:
+        PL = make_lot(total_spots)
+        for vehicle in make_vehicles(int(total_spots * fill)):
+            PL._park(vehicle)
+
+        vec_set = make_vehicles(max(1, min(arrivals, total_spots - int(total_spots * fill))))
+        start = time.perf_counter()
+        for vehicle in vec_set:
+            PL._park(vehicle)
+        per_arrival = (time.perf_counter() - start) / len(vec_set)
+
+        print(f"{total_spots:>10} {len(vec_set):>10} {per_arrival * 1e6:>12.2f}")
+        results.append((total_spots, per_arrival))
+    print()
+    return results
+
+
+#%% batch arrivals
+
+def bench_park_many(wave_sizes=(1_000, 100_000, 1_000_000), policies=('optimal', 'best_fit', 'first_fit')):
+    """Time to park a whole wave of arrivals with park_many, and how many got a spot"""
+    print("⏱️  BATCH ARRIVALS (park_many, lot size = wave size)")
+    print(f"{'vehicles':>10} {'policy':>10} {'seconds':>10} {'parked':>10}")
+    results = []
+    for wave_sz in wave_sizes:
+        vec_set = make_vehicles(wave_sz)
+        for policy in policies:
+            PL = make_lot(wave_sz)
+            start = time.perf_counter()
+            spots = PL.park_many(vec_set, policy=policy)
+            elapsed = time.perf_counter() - start
+            parked = sum(1 for i in spots if i >= 0)
+
+            print(f"{wave_sz:>10} {policy:>10} {elapsed:>10.3f} {parked:>10}")
+            results.append((wave_sz, policy, elapsed, parked))
+    print()
+    return results
+
+
+def bench_fleet(vehicles_sz=400_000, shard_counts=(1, 2, 4)):
+    """park_many of one wave on a single lot against a ParkingLotFleet of the same spots in N shards"""
+    print(f"⏱️  SHARDED FLEET ({vehicles_sz} vehicles into {vehicles_sz} spots)")
+    print(f"{'lot':>12} {'seconds':>10} {'vehicles/s':>12} {'parked':>10}")
+    vec_set = make_vehicles(vehicles_sz)
+    small = big = vehicles_sz // 5
+    PL = make_lot(vehicles_sz, rng=1)
+    start = time.perf_counter()
+    parked = sum(1 for i in PL.park_many(vec_set) if i >= 0)
+    elapsed = time.perf_counter() - start
+    print(f"{'ParkingLot':>12} {elapsed:>10.3f} {vehicles_sz / elapsed:>12,.0f} {parked:>10}")
+    results = [(0, elapsed, parked)]
+    for shards in shard_counts:
+        spots = (small // shards, (vehicles_sz - small - big) // shards, big // shards)
+        with ParkingLotFleet([spots] * shards) as fleet:
+            start = time.perf_counter()
+            parked = sum(1 for handle in fleet.park_many(vec_set) if handle is not None)
+            elapsed = time.perf_counter() - start
+        print(f"{f'{shards} shards':>12} {elapsed:>10.3f} {vehicles_sz / elapsed:>12,.0f} {parked:>10}")
+        results.append((shards, elapsed, parked))
+    print(f"({os.cpu_count()} CPUs - the shards only run in parallel on separate cores)")
+    print()
+    return results
+
+
+#%% lot construction
+
+def bench_construction(lot_sizes=(10_000, 1_000_000, 3_000_000), lot_classes=(ParkingLot, ArrayParkingLot)):
+    """Construction time and memory per spot of each parking lot backend"""
+    print("⏱️  LOT CONSTRUCTION")
+    print(f"{'spots':>10} {'backend':>16} {'seconds':>10} {'bytes/spot':>12}")
+    results = []
+    for total_spots in lot_sizes:
+        for lot_class in lot_classes:
+            tracemalloc.start()
+            start = time.perf_counter()
+            PL = make_lot(total_spots, lot_class)
+            elapsed = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del PL
+
+            print(f"{total_spots:>10} {lot_class.__name__:>16} {elapsed:>10.3f} {allocated / total_spots:>12.1f}")
+            results.append((total_spots, lot_class.__name__, elapsed, allocated / total_spots))
+    print()
+    return results
+
+
+def bench_generation(total_spots=10_000_000, vehicles_sz=10_000_000):
+    """Seeded generation of a huge array lot plus a fleet of the same size, against the object-by-object way"""
+    print(f"⏱️  LOT AND FLEET GENERATION ({total_spots:,} spots, {vehicles_sz:,} vehicles)")
+    start = time.perf_counter()
+    PL = ArrayParkingLot(total_spots // 5, total_spots - 2 * (total_spots // 5), total_spots // 5, rng=1)
+    fleet = random_fleet(vehicles_sz, rng=2)
+    vectorized = time.perf_counter() - start
+    print(f"vectorized:       {vectorized:8.3f} s ({fleet.getMaterializedSz()} vehicle objects created)")
+    del PL, fleet
+
+    # objects one by one and a Python shuffle, on a 1% sample
+    sample = vehicles_sz // 100
+    start = time.perf_counter()
+    make_vehicles(sample)
+    per_vehicle = (time.perf_counter() - start) / sample
+    print(f"object by object: {per_vehicle * vehicles_sz:8.3f} s for the fleet alone (extrapolated)")
+    print()
+    return vectorized, per_vehicle * vehicles_sz
+
+
+#%% vehicle / spot model
+
+class DictVehicle:
+    """The original dict-based Vehicle, kept here as the benchmark baseline"""
+
+    def __init__(self, wheel_num, car_type):
+        self._car_type = car_type
+        self._wheel_num = wheel_num
+
+    def getWheelNum(self):
+        return self._wheel_num
+
+
+class DictSpot:
+    """The original dict-based Spot with its float fit check"""
+
+    def __init__(self, spot_sz):
+        self._spot_size = spot_sz
+        self._spot_car = None
+
+    def park_vehicle(self, new_vec):
+        can_park = new_vec.getWheelNum()/2 <= self.getSpotSize()
+        if can_park:
+            self._spot_car = new_vec
+        return can_park
+
+    def getSpotSize(self):
+        return self._spot_size
+
+
+def bench_model(instances=1_000_000):
+    """Memory and throughput of the dict-based vs the __slots__ Vehicle/Spot classes"""
+    models = {
+        "dict": (lambda: DictVehicle(4, 'CAR'), lambda: DictSpot(2)),
+        "slots": (Car, MedSpot),
+    }
+    print(f"⏱️  VEHICLE / SPOT MODEL ({instances} instances each)")
+    print(f"{'model':>8} {'veh bytes':>10} {'spot bytes':>11} {'create s':>10} {'fit checks/s':>14}")
+    results = []
+    for name, (make_vehicle, make_spot) in models.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        vec_set = [make_vehicle() for i in range(instances)]
+        vehicle_bytes = tracemalloc.get_traced_memory()[0] / instances
+        spots = [make_spot() for i in range(instances)]
+        created = time.perf_counter() - start
+        spot_bytes = tracemalloc.get_traced_memory()[0] / instances - vehicle_bytes
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for spot, vehicle in zip(spots, vec_set):
+            spot.park_vehicle(vehicle)
+        checks = instances / (time.perf_counter() - start)
+
+        print(f"{name:>8} {vehicle_bytes:>10.1f} {spot_bytes:>11.1f} {created:>10.3f} {checks:>14,.0f}")
+        results.append((name, vehicle_bytes, spot_bytes, created, checks))
+        del vec_set, spots
+    print()
+    return results
+
+
+#%% multi-gate throughput
+
+def bench_gates(gate_counts=(1, 2, 4, 8, 16, 32), total_spots=100_000, operations=200_000):
+    """Park/unpark throughput of a ConcurrentParkingLot shared by 1-32 gate threads"""
+    print(f"⏱️  MULTI-GATE THROUGHPUT ({total_spots} spots, {operations} operations)")
+    print(f"{'gates':>6} {'ops/s':>12}")
+    results = []
+    for gates in gate_counts:
+        PL = make_lot(total_spots, ConcurrentParkingLot)
+        # each gate parks a car and lets it leave again, with the lot half full
+        PL.park_many(make_vehicles(total_spots // 2))
+        per_gate = operations // gates
+
+        def gate():
+            for n in range(per_gate // 2):
+                vehicle = Car()
+                PL._park(vehicle)
+                PL.unpark(vehicle)
+
+        threads = [threading.Thread(target=gate) for n in range(gates)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        throughput = per_gate * gates / (time.perf_counter() - start)
+
+        print(f"{gates:>6} {throughput:>12,.0f}")
+        results.append((gates, throughput))
+    print()
+    return results
+
+
+#%% event sinks
+
+def bench_sinks(total_spots=100_000, arrivals=100_000):
+    """Cost of reporting park_new_vec events to each sink (PrintSink writes to /dev/null)"""
+    print(f"⏱️  EVENT SINKS ({arrivals} arrivals, {total_spots} spots)")
+    print(f"{'sink':>10} {'µs/arrival':>12}")
+    results = []
+    with open(os.devnull, "w") as devnull:
+        sinks = {"none": NullSink(), "counter": CounterSink(), "recorder": EventRecorder(), "log": LogSink(devnull)}
+        for name, sink in sinks.items():
+            PL = make_lot(total_spots)
+            PL.setEventSink(sink)
+            vec_set = make_vehicles(arrivals)
+            start = time.perf_counter()
+            for vehicle in vec_set:
+                PL.park_new_vec(vehicle)
+            per_arrival = (time.perf_counter() - start) / arrivals
+            print(f"{name:>10} {per_arrival * 1e6:>12.2f}")
+            results.append((name, per_arrival))
+
+        # the console messages scan the lot for too-small spots - a small lot only
+        PL = make_lot(1_000)
+        PL.setEventSink(PrintSink())
+        vec_set = make_vehicles(1_000)
+        stdout, sys.stdout = sys.stdout, devnull
+        start = time.perf_counter()
+        try:
+            for vehicle in vec_set:
+                PL.park_new_vec(vehicle)
+        finally:
+            sys.stdout = stdout
+        per_arrival = (time.perf_counter() - start) / len(vec_set)
+        print(f"{'print':>10} {per_arrival * 1e6:>12.2f}   (1000 spots)")
+        results.append(("print", per_arrival))
+    print()
+    return results
+
+
+#%% event recorder
+
+def bench_recorder(events=1_000_000):
+    """Recording cost per event, and the exports and rolling aggregates over the recorded columns"""
+    print(f"⏱️  EVENT RECORDER ({events:,} events)")
+    vehicles = make_vehicles(1_000)
+    tick = iter(range(events)).__next__
+    recorder = EventRecorder(clock=tick)
+    start = time.perf_counter()
+    for n in range(events // 2):
+        vehicle = vehicles[n % 1_000]
+        recorder.parked(vehicle, n, vehicle.getSize())
+        recorder.unparked(vehicle, n, vehicle.getSize())
+    per_event = (time.perf_counter() - start) / events
+    print(f"{'record':>18}: {per_event * 1e6:>8.2f} µs/event")
+    results = [("record", per_event)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        steps = {
+            "to_frame": recorder.to_frame,
+            "save (.npz)": lambda: recorder.save(os.path.join(tmp, "events.npz")),
+            "occupancy": recorder.occupancy,
+            "rolling_occupancy": lambda: recorder.rolling_occupancy(1_000),
+            "rolling_rejection": lambda: recorder.rolling_rejection_rate(1_000),
+        }
+        for name, step in steps.items():
+            start = time.perf_counter()
+            step()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>18}: {elapsed * 1e3:>8.1f} ms")
+            results.append((name, elapsed))
+    print()
+    return results
+
+
+#%% display
+
+def bench_display(lot_sizes=(1_000, 10_000, 100_000), repeats=20):
+    """Time to draw the whole lot, and to repaint it after one arrival (output to /dev/null)"""
+    print("⏱️  DISPLAY (lot half full)")
+    print(f"{'spots':>10} {'full ms':>10} {'refresh ms':>11}")
+    results = []
+    with open(os.devnull, "w") as devnull:
+        for total_spots in lot_sizes:
+            PL = make_lot(total_spots)
+            PL.park_many(make_vehicles(total_spots // 2))
+
+            start = time.perf_counter()
+            for n in range(repeats):
+                devnull.write(PL.render_parking_lot())
+            full = (time.perf_counter() - start) / repeats
+
+            display = LotDisplay(PL, devnull, rows=-(-total_spots // 20))
+            display.draw()
+            start = time.perf_counter()
+            for vehicle in make_vehicles(repeats):
+                PL._park(vehicle)
+                display.refresh()
+            refresh = (time.perf_counter() - start) / repeats
+
+            print(f"{total_spots:>10} {full * 1e3:>10.2f} {refresh * 1e3:>11.2f}")
+            results.append((total_spots, full, refresh))
+    print()
+    return results
+
+
+#%% snapshots
+
+def bench_snapshot(lot_sizes=(100_000, 1_000_000, 5_000_000), fill=0.5, lot_classes=(ParkingLot, ArrayParkingLot)):
+    """Save and load time of a half-full lot, against building a fresh one with generateOpenSpots"""
+    print(f"⏱️  SNAPSHOTS (lot {fill:.0%} full)")
+    print(f"{'backend':>16} {'spots':>10} {'MB':>8} {'save ms':>10} {'load ms':>10} {'fresh ms':>10}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lot.snapshot")
+        for lot_class in lot_classes:
+            for total_spots in lot_sizes:
+                if lot_class is ParkingLot and total_spots > 1_000_000:
+                    continue
+                PL = make_lot(total_spots, lot_class)
+                PL.park_many(make_vehicles(int(total_spots * fill)))
+
+                start = time.perf_counter()
+                PL.save(path)
+                save = time.perf_counter() - start
+                start = time.perf_counter()
+                restored = lot_class.load(path)
+                load = time.perf_counter() - start
+                start = time.perf_counter()
+                make_lot(total_spots, lot_class)
+                fresh = time.perf_counter() - start
+                del restored
+
+                size_mb = os.path.getsize(path) / 1e6
+                print(f"{lot_class.__name__:>16} {total_spots:>10} {size_mb:>8.1f} "
+                      f"{save * 1e3:>10.1f} {load * 1e3:>10.1f} {fresh * 1e3:>10.1f}")
+                results.append((lot_class.__name__, total_spots, save, load, fresh))
+    print()
+    return results
+
+
+#%% journal
+
+def bench_journal(total_spots=200_000, arrivals=100_000, settings=((1, 1), (64, 1), (1024, 1), (1024, 0)),
+                  replay_records=2_000_000):
+    """Journaling overhead per arrival for some (group_size, fsync_every) settings, and replay speed"""
+    print(f"⏱️  JOURNAL ({arrivals} arrivals, {total_spots} spots)")
+    print(f"{'group':>8} {'fsync every':>12} {'µs/arrival':>12}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lot.journal")
+        for group_size, fsync_every in [(None, None)] + list(settings):
+            PL = make_lot(total_spots)
+            vec_set = make_vehicles(arrivals)
+            journal = None
+            if group_size is not None:
+                journal = ParkingJournal(path, group_size=group_size, fsync_every=fsync_every)
+                PL.setJournal(journal)
+            start = time.perf_counter()
+            for vehicle in vec_set:
+                PL._park(vehicle)
+            if journal is not None:
+                journal.close()
+                os.remove(path)
+            per_arrival = (time.perf_counter() - start) / arrivals
+            label = ("none", "-") if group_size is None else (group_size, fsync_every)
+            print(f"{label[0]:>8} {label[1]:>12} {per_arrival * 1e6:>12.2f}")
+            results.append((group_size, fsync_every, per_arrival))
+
+        # replay: a journal of park / unpark churn over an ArrayParkingLot
+        snapshot = os.path.join(tmp, "lot.snapshot")
+        PL = make_lot(total_spots, ArrayParkingLot)
+        PL.save(snapshot)
+        with ParkingJournal(path, group_size=65536, fsync_every=0) as journal:
+            PL.setJournal(journal)
+            while journal.records < replay_records:
+                vec_set = make_vehicles(total_spots // 2)
+                PL.park_many(vec_set)
+                for vehicle in vec_set:
+                    PL.unpark(vehicle)
+            records = journal.records
+        start = time.perf_counter()
+        replay(snapshot, path, ArrayParkingLot)
+        elapsed = time.perf_counter() - start
+        print(f"replay: {records:,} records in {elapsed * 1e3:.0f} ms ({records / elapsed:,.0f} records/s)")
+        results.append(("replay", records, elapsed))
+    print()
+    return results
+
+
+#%% allocation policies
+
+def bench_policies(total_spots=2_000, load=1.2, mean_stay=60.0, until=2_000.0):
+    """The same arrival stream replayed through every allocation policy: throughput and parking efficiency
+
+    Arrivals are Poisson at `load` times the rate the lot can serve on average,
+    each vehicle stays an exponential `mean_stay` and is rejected if it does not fit.
+    """
+    policies = {
+        "first_fit": FirstFit(),
+        "best_fit": BestFit(),
+        "worst_fit": WorstFit(),
+        "reserve_5%": ReservedQuota({3: total_spots // 20}),
+    }
+    rate = load * total_spots / mean_stay
+    print(f"⏱️  ALLOCATION POLICIES ({total_spots} spots, offered load {load:.0%})")
+    print(f"{'policy':>12} {'arrivals/s':>12} {'parked':>8} {'MOTORCYCLE':>11} {'CAR':>7} {'BUS':>7}")
+    results = []
+    for name, policy in policies.items():
+        small = total_spots // 5
+        big = total_spots // 5
+        PL = ParkingLot(small, total_spots - small - big, big, rng=Random(7))
+        PL.setPolicy(policy)
+        sink = CounterSink()
+        PL.setEventSink(sink)
+        sim = ParkingSimulation(PL, PoissonArrivals(rate, seed=1), ExponentialDwell(mean_stay), seed=2)
+
+        start = time.perf_counter()
+        report = sim.run(until=until)
+        elapsed = time.perf_counter() - start
+
+        def efficiency(vehicle_type):
+            parked = sink.counts['parked', vehicle_type]
+            tried = parked + sink.counts['rejected', vehicle_type]
+            return parked / tried if tried else 1.0
+
+        parked = sink.total('parked') / report.arrived
+        print(f"{name:>12} {report.arrived / elapsed:>12,.0f} {parked:>8.1%} {efficiency('MOTORCYCLE'):>11.1%} "
+              f"{efficiency('CAR'):>7.1%} {efficiency('BUS'):>7.1%}")
+        results.append((name, report.arrived / elapsed, parked))
+    print()
+    return results
+
+
+#%% nearest spot
+
+def bench_nearest(sizes=(1_000, 10_000, 100_000), entrances=4, arrivals=2_000):
+    """Nearest-to-entrance allocation on a grid lot, against a distance scan of the whole lot
+
+    The lot is half full; every arrival comes in by a random entrance and
+    leaves again, so the lot stays at the same fill.
+    """
+    rng = Random(5)
+    print(f"⏱️  NEAREST SPOT ({entrances} entrances, half-full lot)")
+    print(f"{'spots':>10} {'heaps µs':>10} {'scan µs':>10}")
+    results = []
+    for total_spots in sizes:
+        rows = -(-total_spots // 20)
+        gates = [(rng.randrange(20), rng.randrange(rows)) for e in range(entrances)]
+        PL = make_lot(total_spots)
+        PL.park_many(make_vehicles(total_spots // 2), policy='first_fit')
+        PL.setLayout(LotLayout.grid(total_spots, entrances=gates))
+        policies = [NearestSpot(e) for e in range(entrances)]
+        vec_set = make_vehicles(arrivals)
+        chosen = [rng.choice(policies) for vehicle in vec_set]
+
+        start = time.perf_counter()
+        for vehicle, policy in zip(vec_set, chosen):
+            PL._park(vehicle, policy)
+            PL.unpark(vehicle)
+        heaps = (time.perf_counter() - start) / arrivals
+
+        # what every arrival would cost without the heaps: a pass over all spots
+        spots = PL.getAllSpots()
+        distances = PL.getLayout().distances[0]
+        scans = min(arrivals, 20)
+        start = time.perf_counter()
+        for vehicle in vec_set[:scans]:
+            min((distances[i], i) for i, spot in enumerate(spots)
+                if spot.is_open() and spot.getSpotSize() >= vehicle.getSize())
+        scan = (time.perf_counter() - start) / scans
+        print(f"{total_spots:>10,} {heaps * 1e6:>10.2f} {scan * 1e6:>10.1f}")
+        results.append((total_spots, heaps, scan))
+    print()
+    return results
+
+
+#%% trace replay
+
+def bench_trace(vehicles_sz=1_000_000, chunk_size=1_000_000):
+    """Streaming replay of a synthetic gate trace (2 events per vehicle) from .npy and CSV"""
+    print(f"⏱️  TRACE REPLAY ({2 * vehicles_sz:,} events, chunks of {chunk_size:,} rows)")
+    trace = generate_trace(vehicles_sz, rate=20.0, mean_stay=60.0, seed=1)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("trace.npy", "trace.csv"):
+            path = os.path.join(tmp, name)
+            write_trace(path, trace)
+            start = time.perf_counter()
+            replay = replay_trace(make_lot(1_000), path, chunk_size=chunk_size, interval=600.0)
+            elapsed = time.perf_counter() - start
+            rate = replay.events / elapsed
+            print(f"{name:>10}: {rate:>10,.0f} events/s - 100M events in {1e8 / rate / 60:.1f} min")
+            results.append((name, rate))
+    print()
+    return results
+
+
+#%% reservations
+
+def bench_reservations(reservations=100_000, queries=20_000, total_spots=5_000):
+    """Reserve, check and cancel against a book holding `reservations` bookings
+
+    Times are minutes over a year; every booking is 30 minutes to 8 hours.
+    The interval index keeps every operation O(log span), so the per-call
+    cost should barely move with the number of bookings.
+    """
+    rng = Random(11)
+    year = 365 * 24 * 60
+    PL = make_lot(total_spots, ArrayParkingLot)
+    book = ReservationBook(PL, clock=lambda: 0)
+    print(f"⏱️  RESERVATIONS ({total_spots} spots, {reservations:,} bookings over a year)")
+
+    def windows(n):
+        starts = [rng.randrange(1, year) for i in range(n)]
+        return [(rng.randint(1, 3), start, start + rng.randint(30, 480)) for start in starts]
+
+    start = time.perf_counter()
+    bookings = [book.reserve(*window) for window in windows(reservations)]
+    reserve_time = (time.perf_counter() - start) / reservations
+    print(f"reserve:      {reserve_time * 1e6:8.2f} µs per booking ({bookings.count(-1)} refused)")
+
+    checks = windows(queries)
+    start = time.perf_counter()
+    for window in checks:
+        book.getAvailable(*window)
+    query_time = (time.perf_counter() - start) / queries
+    print(f"availability: {query_time * 1e6:8.2f} µs per window")
+
+    start = time.perf_counter()
+    for booking in bookings[:queries]:
+        book.cancel(booking)
+    cancel_time = (time.perf_counter() - start) / queries
+    print(f"cancel:       {cancel_time * 1e6:8.2f} µs per booking")
+
+    # walk-ins through the reservation-aware policy, against the plain default
+    vec_set = make_vehicles(total_spots // 2)
+    for policy in (FirstFit(), ReservationPolicy(book)):
+        PL.setPolicy(policy)
+        start = time.perf_counter()
+        for vehicle in vec_set:
+            PL._park(vehicle)
+        per_arrival = (time.perf_counter() - start) / len(vec_set)
+        for vehicle in vec_set:
+            PL.unpark(vehicle)
+        print(f"arrival ({type(policy).__name__}): {per_arrival * 1e6:8.2f} µs")
+    print()
+    return reserve_time, query_time, cancel_time
+
+
+BENCHMARKS = {
+    "arrivals": bench_arrivals,
+    "park_many": bench_park_many,
+    "fleet": bench_fleet,
+    "construction": bench_construction,
+    "generation": bench_generation,
+    "model": bench_model,
+    "gates": bench_gates,
+    "sinks": bench_sinks,
+    "recorder": bench_recorder,
+    "display": bench_display,
+    "snapshot": bench_snapshot,
+    "journal": bench_journal,
+    "policies": bench_policies,
+    "reservations": bench_reservations,
+    "trace": bench_trace,
+    "nearest": bench_nearest,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Regression benchmark suite for the Parking Lot Simulation
+
+A fixed set of small, seeded measurements - lot construction, arrival
+latency at several fill levels and lot sizes, rendering and memory per
+spot - written as JSON and compared against a stored baseline:
+
+    python parking_bench_suite.py --save-baseline          # on the main branch
+    python parking_bench_suite.py --baseline               # on your change
+    python parking_bench_suite.py --quick --json out.json --tolerance 0.5
+
+The run fails (exit code 1) when a case got slower (or bigger) than the
+baseline by more than the tolerance. If the baseline file does not exist
+yet, the run is saved there and becomes the baseline. Every lot and fleet
+is built from the seed, on both backends. Timings are the best of several
+repeats, so a busy machine makes them noisier but rarely faster. Under
+pytest, test_parking_bench_suite.py runs the quick suite and compares it
+with the baseline named by $PARKING_BENCH_BASELINE, if set.
+
+Only the standard library is used for measuring (time.perf_counter,
+tracemalloc, json).
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import argparse
+import gc
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, Car
+from array_parking_lot import ArrayParkingLot
+from lot_display import LotDisplay
+from parking_bench import make_lot, make_vehicles
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+
+#%% measuring
+
+def measure(setup, run, ops=1, repeats=5):
+    """Best time per operation of run(state) over `repeats` fresh states from setup()
+
+    The garbage collector is off while timing, like in timeit - a collection
+    that happens to fall into one run says little about the code measured.
+    """
+    best = float("inf")
+    for n in range(repeats):
+        state = setup()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            elapsed = time.perf_counter() - start
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        best = min(best, elapsed / ops)
+    return best
+
+
+def measure_memory(create):
+    """Bytes allocated by create() and still alive afterwards"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        keep = create()
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del keep
+    return used
+
+
+#%% cases - each returns {case name: (value, unit)}, lower is better
+
+def case_construction(sizes, seed):
+    results = {}
+    for lot_class in (ParkingLot, ArrayParkingLot):
+        for total_spots in sizes:
+            seconds = measure(lambda: None, lambda state: make_lot(total_spots, lot_class, seed), repeats=3)
+            results[f"construction/{lot_class.__name__}/{total_spots}"] = (seconds, "s")
+    return results
+
+
+def case_memory(total_spots, seed):
+    results = {}
+    for lot_class in (ParkingLot, ArrayParkingLot):
+        used = measure_memory(lambda: make_lot(total_spots, lot_class, seed))
+        results[f"memory/{lot_class.__name__}/bytes_per_spot"] = (used / total_spots, "bytes")
+    return results
+
+
+def case_arrivals(sizes, fills, arrivals, seed):
+    results = {}
+    for total_spots in sizes:
+        for fill in fills:
+            def setup():
+                PL = make_lot(total_spots, rng=seed)
+                PL.park_many(make_vehicles(int(total_spots * fill)), policy='first_fit')
+                return PL, [Car() for n in range(arrivals)]
+
+            def run(state):
+                PL, vec_set = state
+                for vehicle in vec_set:
+                    PL.park_new_vec(vehicle)
+
+            seconds = measure(setup, run, ops=arrivals)
+            results[f"arrival/{total_spots}/fill_{fill:.0%}"] = (seconds, "s")
+    return results
+
+
+def case_rendering(sizes, seed):
+    results = {}
+    for total_spots in sizes:
+        PL = make_lot(total_spots, rng=seed)
+        PL.park_many(make_vehicles(total_spots // 2))
+        seconds = measure(lambda: None, lambda state: PL.render_parking_lot(), repeats=5)
+        results[f"render/full/{total_spots}"] = (seconds, "s")
+
+        with open(os.devnull, "w") as devnull:
+            def setup():
+                display = LotDisplay(PL, devnull, rows=-(-total_spots // 20))
+                display.draw()
+                return display
+
+            def run(display):
+                vehicle = Car()
+                PL._park(vehicle)
+                display.refresh()
+                PL.unpark(vehicle)
+
+            seconds = measure(setup, run, repeats=5)
+        results[f"render/refresh/{total_spots}"] = (seconds, "s")
+    return results
+
+
+def run_suite(quick=False, seed=0):
+    """Run every case, returns the JSON-ready results"""
+    random.seed(seed)
+    if quick:
+        cases = [
+            lambda: case_construction((10_000,), seed),
+            lambda: case_memory(10_000, seed),
+            lambda: case_arrivals((1_000, 10_000), (0.0, 0.9), 200, seed),
+            lambda: case_rendering((1_000,), seed),
+        ]
+    else:
+        cases = [
+            lambda: case_construction((10_000, 100_000), seed),
+            lambda: case_memory(100_000, seed),
+            lambda: case_arrivals((1_000, 100_000), (0.0, 0.5, 0.9, 0.99), 1_000, seed),
+            lambda: case_rendering((1_000, 10_000), seed),
+        ]
+    results = {}
+    for case in cases:
+        for name, (value, unit) in case().items():
+            results[name] = {"value": value, "unit": unit}
+    return {
+        "meta": {
+            "quick": quick,
+            "seed": seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+#%% baseline comparison
+
+def load_baseline(path, run):
+    """The baseline stored at path - if there is none yet, run is saved there and None returned"""
+    if not os.path.exists(path):
+        save_run(run, path)
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_run(run, path):
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+
+
+def compare(run, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare two suite runs
+
+    returns [(case name, baseline value, new value, ratio)] for every case in
+    both runs, and the names of the cases that regressed by more than `tolerance`
+    """
+    rows = []
+    regressions = []
+    for name, result in run["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or not old["value"]:
+            continue
+        ratio = result["value"] / old["value"]
+        rows.append((name, old["value"], result["value"], ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_results(run, rows=None):
+    print(f"⏱️  PARKING BENCHMARK SUITE{' (quick)' if run['meta']['quick'] else ''}")
+    if rows is None:
+        for name, result in run["results"].items():
+            print(f"{name:<40} {_format(result['value'], result['unit']):>12}")
+    else:
+        print(f"{'case':<40} {'baseline':>12} {'now':>12} {'change':>8}")
+        units = {name: result["unit"] for name, result in run["results"].items()}
+        for name, old, new, ratio in rows:
+            print(f"{name:<40} {_format(old, units[name]):>12} {_format(new, units[name]):>12} {ratio - 1:>+8.1%}")
+    print()
+
+
+def _format(value, unit):
+    if unit == "s":
+        return f"{value * 1e6:,.2f} µs"
+    return f"{value:,.1f} {unit}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regression benchmark suite for the parking lot")
+    parser.add_argument("--quick", action="store_true", help="smaller cases, for CI and pytest")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH,
+                        help=f"compare with this baseline (default: {os.path.basename(BASELINE_PATH)})")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH,
+                        help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a case fails, e.g. 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    run = run_suite(quick=args.quick)
+    for path in (args.json, args.save_baseline):
+        if path:
+            save_run(run, path)
+
+    baseline = load_baseline(args.baseline, run) if args.baseline else None
+    if baseline is None:
+        print_results(run)
+        if args.baseline:
+            print(f"📝 no baseline at {args.baseline} yet - saved this run as the baseline")
+        return 0
+
+    rows, regressions = compare(run, baseline, args.tolerance)
+    print_results(run, rows)
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) regressed by more than {args.tolerance:.0%}:")
+        for name in regressions:
+            print(f"   {name}")
+        return 1
+    print(f"✅ no case regressed by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Event sinks for the Parking Lot Simulation
+
+A ParkingLot reports what happens to the vehicles (arriving, parked,
+rejected, unparked and - only to sinks that ask for it - every open spot
+that was too small) to an event sink instead of printing. By default
+there is no sink at all, so simulations of millions of vehicles pay
+nothing for reporting; set one with ParkingLot.setEventSink(sink).
+
+@author: Maya Galili
+"""
+
+import json
+from collections import Counter
+
+
+class EventSink:
+    # base class - every event is ignored, override the ones you need
+
+    # spot_too_small events cost a scan of the lot, so they are only
+    # produced for sinks that set this
+    wants_spot_events = False
+
+    def arriving(self, vehicle):
+        pass
+
+    def parked(self, vehicle, spot, spot_size):
+        pass
+
+    def rejected(self, vehicle):
+        pass
+
+    def spot_too_small(self, vehicle, spot, spot_size):
+        pass
+
+    def unparked(self, vehicle, spot, spot_size):
+        pass
+
+
+class NullSink(EventSink):
+    # explicitly no reporting - the lot treats it like having no sink at all
+    pass
+
+
+class CounterSink(EventSink):
+    # in-memory counts of every event per vehicle type, e.g. counts['parked', 'CAR']
+
+    def __init__(self, spot_events=False):
+        self.wants_spot_events = spot_events
+        self.counts = Counter()
+
+    def parked(self, vehicle, spot, spot_size):
+        self.counts['parked', vehicle.getType()] += 1
+
+    def rejected(self, vehicle):
+        self.counts['rejected', vehicle.getType()] += 1
+
+    def spot_too_small(self, vehicle, spot, spot_size):
+        self.counts['spot_too_small', vehicle.getType()] += 1
+
+    def unparked(self, vehicle, spot, spot_size):
+        self.counts['unparked', vehicle.getType()] += 1
+
+    # total count of one event over all vehicle types
+    def total(self, event):
+        return sum(count for (name, vehicle_type), count in self.counts.items() if name == event)
+
+
+class LogSink(EventSink):
+    # structured log - one JSON object per line, written to `stream` in
+    # batches of `buffer_size` events (call flush() or close() at the end)
+
+    def __init__(self, stream, buffer_size=10_000, spot_events=False):
+        self.wants_spot_events = spot_events
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._buffer = []
+
+    def _log(self, record):
+        self._buffer.append(json.dumps(record))
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def parked(self, vehicle, spot, spot_size):
+        self._log({"event": "parked", "vehicle": vehicle.getType(), "spot": spot, "spot_size": spot_size})
+
+    def rejected(self, vehicle):
+        self._log({"event": "rejected", "vehicle": vehicle.getType()})
+
+    def spot_too_small(self, vehicle, spot, spot_size):
+        self._log({"event": "spot_too_small", "vehicle": vehicle.getType(), "spot": spot, "spot_size": spot_size})
+
+    def unparked(self, vehicle, spot, spot_size):
+        self._log({"event": "unparked", "vehicle": vehicle.getType(), "spot": spot, "spot_size": spot_size})
+
+    def flush(self):
+        if self._buffer:
+            self._stream.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+        self._stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class PrintSink(EventSink):
+    # the interactive messages of the simulation UI
+
+    wants_spot_events = True
+
+    def arriving(self, vehicle):
+        print(f"🚗 {vehicle.getType()} trying to park...")
+
+    def parked(self, vehicle, spot, spot_size):
+        print(f"✅ {vehicle.getType()} parked in spot {spot} (size {spot_size})")
+
+    def rejected(self, vehicle):
+        print(f"❌ {vehicle.getType()} could not find a suitable spot!")
+
+    def spot_too_small(self, vehicle, spot, spot_size):
+        print(f"   Spot {spot} (size {spot_size}) too small for {vehicle.getType()}")
+
+    def unparked(self, vehicle, spot, spot_size):
+        print(f"👋 {vehicle.getType()} left spot {spot} (size {spot_size})")
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+A fleet of parking lots sharded across worker processes.
+
+Each shard (a level or zone) is its own ParkingLot living in a worker
+process, so allocations in different shards run on different cores. The
+workers publish their free-spot counts per size class into one shared
+array; the fleet routes a wave of arrivals in bulk from that summary -
+each size class is split across the shards in proportion to their room for
+it, and every shard gets one array of vehicle sizes - and answers the
+aggregate getOpenSpotsSz()/utilization from it without asking any shard.
+
+Example:
+    with ParkingLotFleet([(100, 300, 100)] * 4) as fleet:
+        handles = fleet.park_many(vehicles)   # [(shard, spot) or None, ...]
+        fleet.getUtilization()
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import gc
+import multiprocessing
+
+import numpy as np
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, VEHICLE_BY_SIZE, wave_arrays
+
+SPOT_SIZES = (1, 2, 3)
+
+
+def _publish(lot, free_counts, shard):
+    open_spots = lot.getOpenSpotsBySize()
+    for k, spot_size in enumerate(SPOT_SIZES):
+        free_counts[shard * len(SPOT_SIZES) + k] = open_spots.get(spot_size, 0)
+
+
+def _shard_worker(conn, shard, spots, lot_class, policy, free_counts):
+    """Worker process: owns one lot and serves park / unpark requests from the fleet"""
+    # a forked worker shares the parent's objects - keep the collector from
+    # walking (and so copying) all of them on every full collection
+    gc.freeze()
+    lot = lot_class(*spots)
+    _publish(lot, free_counts, shard)
+    while True:
+        command, payload = conn.recv()
+        if command == "park_many":
+            vehicles = [VEHICLE_BY_SIZE[need]() for need in np.asarray(payload, dtype=np.int8).tolist()]
+            answer = np.array(lot.park_many(vehicles, policy=policy), dtype=np.int64)
+        elif command == "unpark":
+            answer = sum(1 for i in payload if lot.unpark_spot(i) is not None)
+        elif command == "spot_sizes":
+            answer = [spot.getSpotSize() for spot in lot.getAllSpots()]
+        else:  # stop
+            conn.send(None)
+            break
+        _publish(lot, free_counts, shard)
+        conn.send(answer)
+    conn.close()
+
+
+# count split over the shards in proportion to their room, none above its room
+def split_count(count, room):
+    total = int(room.sum())
+    if count >= total:
+        return room.copy()
+    shares = room * count // total
+    # the rounding rest goes to the shards with the most room left, one each
+    rest = count - int(shares.sum())
+    shares[np.argsort(shares - room, kind='stable')[:rest]] += 1
+    return shares
+
+
+#%% fleet
+class ParkingLotFleet:
+    # shards    - one (small, medium, big) spot count per shard
+    # lot_class - ParkingLot backend of every shard
+    # policy    - park_many policy the shards use for their batches
+
+    def __init__(self, shards, lot_class=ParkingLot, policy='optimal'):
+        context = multiprocessing.get_context()
+        self._total_spots = sum(sum(spots) for spots in shards)
+        # free spots per (shard, size class) - written by each shard's worker only
+        self._free_counts = context.Array('q', len(shards) * len(SPOT_SIZES), lock=False)
+        # parked vehicle -> (shard, spot index)
+        self._vehicle_spots = {}
+        self._conns = []
+        self._workers = []
+        for shard, spots in enumerate(shards):
+            conn, worker_conn = context.Pipe()
+            worker = context.Process(target=_shard_worker, daemon=True,
+                                     args=(worker_conn, shard, spots, lot_class, policy, self._free_counts))
+            worker.start()
+            self._conns.append(conn)
+            self._workers.append(worker)
+        # wait until every shard has published its counts
+        for conn in self._conns:
+            conn.send(("park_many", np.zeros(0, dtype=np.int8)))
+        for conn in self._conns:
+            conn.recv()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes"""
+        for conn in self._conns:
+            conn.send(("stop", None))
+        for conn, worker in zip(self._conns, self._workers):
+            conn.recv()
+            worker.join()
+        self._conns = []
+        self._workers = []
+
+    # free spots per size class of every shard, from the shared summary
+    def _shard_free(self):
+        counts = self._free_counts[:]
+        width = len(SPOT_SIZES)
+        return [dict(zip(SPOT_SIZES, counts[shard * width:(shard + 1) * width]))
+                for shard in range(len(self._conns))]
+
+    # send each shard its share of the work at once, then collect the answers -
+    # the shards work in parallel
+    def _scatter(self, command, per_shard):
+        busy = [shard for shard, payload in enumerate(per_shard) if len(payload)]
+        for shard in busy:
+            self._conns[shard].send((command, per_shard[shard]))
+        return {shard: self._conns[shard].recv() for shard in busy}
+
+    # free spots per (shard, size class) as an array, a copy of the shared summary
+    def _free_matrix(self):
+        return np.array(self._free_counts[:], dtype=np.int64).reshape(-1, len(SPOT_SIZES))
+
+    # park the vehicles across the shards
+    # returns the (shard, spot index) of each vehicle, or None if it was not parked
+    def park_many(self, vehicles):
+        vehicles, sizes = wave_arrays(vehicles)[:2]
+        shards = np.full(len(vehicles), -1, dtype=np.int64)
+        spots = np.full(len(vehicles), -1, dtype=np.int64)
+        waiting = np.arange(len(vehicles))
+        # a second round retries vehicles a shard turned down in other shards
+        for attempt in range(2):
+            routed = self._route(sizes[waiting], self._free_matrix())
+            groups = [waiting[routed == shard] for shard in range(len(self._conns))]
+            answers = self._scatter("park_many", [sizes[group].astype(np.int8) for group in groups])
+            turned_down = [waiting[routed < 0]]
+            for shard, answer in answers.items():
+                parked = answer >= 0
+                shards[groups[shard][parked]] = shard
+                spots[groups[shard][parked]] = answer[parked]
+                turned_down.append(groups[shard][~parked])
+            waiting = np.sort(np.concatenate(turned_down))
+            if len(waiting) == len(turned_down[0]):
+                break
+
+        parked = np.flatnonzero(shards >= 0)
+        handles = np.full(len(vehicles), None, dtype=object)
+        handles[parked] = np.fromiter(zip(shards[parked].tolist(), spots[parked].tolist()),
+                                      dtype=object, count=len(parked))
+        self._vehicle_spots.update(zip(vehicles[parked].tolist(), handles[parked].tolist()))
+        return handles.tolist()
+
+    # split the vehicles of each size class (sizes, an array) across the shards,
+    # biggest class first: each shard gets a share in proportion to its room for
+    # the class, and the spots the share takes (smallest fitting class first)
+    # are counted as used in free, the (shard, size class) free counts.
+    # returns the shard of each vehicle, -1 where no shard has room
+    @staticmethod
+    def _route(sizes, free):
+        routed = np.full(len(sizes), -1, dtype=np.int64)
+        for k in reversed(range(len(SPOT_SIZES))):
+            group = np.flatnonzero(sizes == SPOT_SIZES[k])
+            if not len(group):
+                continue
+            shares = split_count(len(group), free[:, k:].sum(axis=1))
+            routed[group[:shares.sum()]] = np.repeat(np.arange(len(shares)), shares)
+            for j in range(k, len(SPOT_SIZES)):
+                used = np.minimum(shares, free[:, j])
+                free[:, j] -= used
+                shares = shares - used
+        return routed
+
+    def park(self, vehicle):
+        return self.park_many([vehicle])[0]
+
+    # the given vehicles leave the fleet, returns how many of them were parked here
+    def unpark_many(self, vehicles):
+        per_shard = [[] for conn in self._conns]
+        for vehicle in vehicles:
+            handle = self._vehicle_spots.pop(vehicle, None)
+            if handle is not None:
+                per_shard[handle[0]].append(handle[1])
+        return sum(self._scatter("unpark", per_shard).values())
+
+    def unpark(self, vehicle):
+        return self.unpark_many([vehicle]) == 1
+
+    # getters - answered from the shared summary, no shard is asked
+    def getTotalSpotsSz(self):
+        return self._total_spots
+
+    def getOpenSpotsSz(self):
+        return sum(self._free_counts[:])
+
+    def getOpenSpotsBySize(self):
+        totals = dict.fromkeys(SPOT_SIZES, 0)
+        for free in self._shard_free():
+            for spot_size, count in free.items():
+                totals[spot_size] += count
+        return totals
+
+    def getUtilization(self):
+        if not self._total_spots:
+            return 0.0
+        return 1 - self.getOpenSpotsSz() / self._total_spots
+
+    def getShardCount(self):
+        return len(self._conns)
+
+    # (shard, spot index) of a parked vehicle, or None
+    def getVehicleSpot(self, vehicle):
+        return self._vehicle_spots.get(vehicle)
+
+    # the size of every spot of one shard (asks the shard)
+    def getShardSpotSizes(self, shard):
+        self._conns[shard].send(("spot_sizes", None))
+        return self._conns[shard].recv()
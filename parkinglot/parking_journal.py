@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Write-ahead journal of a parking lot
+
+A ParkingJournal attached with ParkingLot.setJournal() records every park
+and unpark as a fixed-size binary record:
+
+    spot            int64   index of the spot
+    op              uint8   1 = park, 2 = unpark
+    vehicle size    uint8   size class of the vehicle
+    padding         6 bytes
+
+behind a 16-byte header. Records are collected in memory and written with
+one write() per group of `group_size` records (group commit); every
+`fsync_every` groups the file is fsynced. commit() writes and fsyncs what
+is pending at once - call it before telling anyone a vehicle is parked.
+
+replay() rebuilds a lot from its last snapshot plus the journal. Only the
+last record of every spot matters, so replay is a handful of vectorized
+passes over the memory-mapped journal.
+
+Example:
+    PL.save("lot.snapshot")
+    journal = ParkingJournal("lot.journal")
+    PL.setJournal(journal)
+    ...
+    journal.checkpoint(PL, "lot.snapshot")    # new snapshot, empty journal
+    ...
+    PL = replay("lot.snapshot", "lot.journal")
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import struct
+import threading
+
+import numpy as np
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot
+
+MAGIC = b"PKJRNL\x00\x01" + bytes(8)
+PARK = 1
+UNPARK = 2
+RECORD = struct.Struct("<qBB6x")
+RECORD_DTYPE = np.dtype([("spot", "<i8"), ("op", "u1"), ("vehicle_size", "u1"), ("pad", "V6")])
+
+
+class JournalError(ValueError):
+    pass
+
+
+class ParkingJournal:
+    # path        - the journal file, appended to if it exists
+    # group_size  - records written together in one write()
+    # fsync_every - groups per fsync (0: never fsync, leave it to the OS)
+
+    def __init__(self, path, group_size=1024, fsync_every=1):
+        self._path = path
+        self._group_size = group_size
+        self._fsync_every = fsync_every
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, MAGIC)
+        self._buffer = bytearray()
+        self._pending = 0
+        self._unsynced_groups = 0
+        # gates of a ConcurrentParkingLot may record at the same time
+        self._lock = threading.Lock()
+        # records written to the file so far
+        self.records = 0
+
+    # the lot calls these on every park / unpark
+    def parked(self, spot, vehicle_size):
+        self._append(RECORD.pack(spot, PARK, vehicle_size), 1)
+
+    def unparked(self, spot, vehicle_size):
+        self._append(RECORD.pack(spot, UNPARK, vehicle_size), 1)
+
+    def parked_many(self, spots, vehicle_sizes):
+        records = np.zeros(len(spots), dtype=RECORD_DTYPE)
+        records["spot"] = spots
+        records["op"] = PARK
+        records["vehicle_size"] = vehicle_sizes
+        self._append(records.tobytes(), len(records))
+
+    def _append(self, data, records_sz):
+        if self._fd is None:
+            raise JournalError("the journal is closed")
+        with self._lock:
+            self._buffer += data
+            self._pending += records_sz
+            if self._pending >= self._group_size:
+                self._write_group()
+
+    def _write_group(self, sync=False):
+        if self._buffer:
+            os.write(self._fd, self._buffer)
+            self.records += self._pending
+            self._buffer = bytearray()
+            self._pending = 0
+            self._unsynced_groups += 1
+        if self._unsynced_groups and (sync or (self._fsync_every and self._unsynced_groups >= self._fsync_every)):
+            os.fsync(self._fd)
+            self._unsynced_groups = 0
+
+    def commit(self):
+        """Write and fsync every pending record now"""
+        with self._lock:
+            self._write_group(sync=True)
+
+    def checkpoint(self, lot, snapshot_path):
+        """Save a new snapshot of the lot and start the journal over
+
+        The snapshot is written next to the old one and renamed over it, then
+        the journal is emptied. Replaying the old journal over the new snapshot
+        (a crash in between) gives the same lot, so no step can lose state.
+        """
+        with self._lock:
+            self._write_group(sync=True)
+            lot.save(snapshot_path + ".tmp")
+            os.replace(snapshot_path + ".tmp", snapshot_path)
+            os.ftruncate(self._fd, 0)
+            os.write(self._fd, MAGIC)
+            os.fsync(self._fd)
+
+    def close(self):
+        if self._fd is not None:
+            self.commit()
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_journal(path):
+    """The journal's records as a read-only structured array (memory-mapped)
+
+    A record torn by a crash in the middle of a write is ignored.
+    """
+    size = os.path.getsize(path)
+    if size < len(MAGIC):
+        raise JournalError("not a parking lot journal (file too short)")
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise JournalError("not a parking lot journal (bad magic)")
+    records_sz = (size - len(MAGIC)) // RECORD_DTYPE.itemsize
+    if records_sz == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=len(MAGIC), shape=(records_sz,))
+
+
+def final_states(records):
+    """The last record of every spot in the journal
+
+    returns (spots, vehicle sizes) - vehicle size 0 where the last record
+    was an unpark
+    """
+    # the first occurrence of every spot in the reversed journal is its last record
+    spots, last = np.unique(records["spot"][::-1], return_index=True)
+    last = len(records) - 1 - last
+    vehicle_sizes = np.where(records["op"][last] == PARK, records["vehicle_size"][last], 0).astype(np.int8)
+    return spots, vehicle_sizes
+
+
+def replay(snapshot_path, journal_path, lot_class=ParkingLot):
+    """Rebuild a lot from its last snapshot and the journal written since"""
+    lot = lot_class.load(snapshot_path)
+    spots, vehicle_sizes = final_states(read_journal(journal_path))
+    lot._apply_spot_states(spots, vehicle_sizes)
+    return lot
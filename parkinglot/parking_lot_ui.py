@@ -12,11 +12,15 @@ Created on Wed Jul  4 09:14:28 2018
 import sys
 import os
 import time
-from random import shuffle
+
+import numpy as np
 
 # Add the current directory to the path to import ParkingLot
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from ParkingLot import ParkingLot
+from parking_events import PrintSink
+from lot_display import LotDisplay
+from lot_generation import generate_fleet
 
 def get_user_input():
     """Get user input for parking lot configuration"""
@@ -149,15 +153,23 @@ def get_display_preferences():
     
     return int(choice), delay
 
-def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses, display_mode, delay=0):
-    """Run the parking lot simulation with given parameters"""
+def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses, display_mode, delay=0,
+                   lot_class=ParkingLot, seed=None):
+    """Run the parking lot simulation with given parameters
+    
+    lot_class selects the parking lot backend, e.g. ArrayParkingLot for huge lots.
+    seed makes the spot layout and the arrival order reproducible (None: random).
+    """
+    # independent seeds for the lot and the fleet
+    lot_seed, fleet_seed = (None, None) if seed is None else np.random.SeedSequence(seed).generate_state(2).tolist()
     
     # Create the parking lot
     print("\n" + "=" * 60)
     print("🏗️  CREATING PARKING LOT")
     print("=" * 60)
     
-    PL = ParkingLot(small_spots, med_spots, big_spots)
+    PL = lot_class(small_spots, med_spots, big_spots, rng=lot_seed)
+    PL.setEventSink(PrintSink())
     
     # Display parking lot setup
     print(f"Parking lot created with {PL.getTotalSpotsSz()} spots:")
@@ -170,22 +182,8 @@ def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses,
     print("🚗 CREATING VEHICLES")
     print("-" * 20)
     
-    vec_set = []
-    
-    # Add motorcycles
-    for i in range(motorcycles):
-        vec_set.append(Motorcycle())
-    
-    # Add cars
-    for i in range(cars):
-        vec_set.append(Car())
-    
-    # Add buses
-    for i in range(buses):
-        vec_set.append(Bus())
-    
-    # Shuffle the vehicles for random parking order
-    shuffle(vec_set)
+    # a shuffled fleet - each Vehicle is only created when it arrives
+    vec_set = generate_fleet(motorcycles, cars, buses, rng=fleet_seed)
     
     print(f"Created {len(vec_set)} vehicles:")
     print(f"  • {motorcycles} Motorcycles")
@@ -206,6 +204,13 @@ def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses,
     print("🚗 STARTING PARKING PROCESS")
     print("-" * 30)
     
+    # On a terminal, step-by-step mode keeps the lot at the top of the screen
+    # and repaints only the spots that change
+    live_display = None
+    if display_mode == 1 and sys.stdout.isatty():
+        live_display = LotDisplay(PL)
+        live_display.begin()
+    
     # Try to park all vehicles
     for i, vehicle in enumerate(vec_set):
         if PL.park_new_vec(vehicle):
@@ -214,7 +219,14 @@ def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses,
             failed_parking += 1
         
         # Show updated parking lot status based on display mode
-        if display_mode == 1:  # Step-by-step
+        if live_display is not None:
+            print(f"After vehicle {i+1}/{len(vec_set)}")
+            if PL.getVehicleSpot(vehicle) >= 0:
+                live_display.reveal(PL.getVehicleSpot(vehicle))
+            live_display.refresh()
+            if delay > 0 and i < len(vec_set) - 1:
+                time.sleep(delay)
+        elif display_mode == 1:  # Step-by-step
             print(f"\nAfter vehicle {i+1}/{len(vec_set)}:")
             PL.display_parking_lot()
             if delay > 0 and i < len(vec_set) - 1:  # Don't delay after the last vehicle
@@ -224,6 +236,9 @@ def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses,
             print("-" * 30)
             PL.display_parking_lot()
     
+    if live_display is not None:
+        live_display.end()
+    
     # Display final summary
     print("\n" + "=" * 60)
     print("📊 PARKING SUMMARY")
@@ -248,9 +263,10 @@ def run_simulation(small_spots, med_spots, big_spots, motorcycles, cars, buses,
     
     # Show spot utilization
     print(f"\nSpot Utilization:")
-    print(f"  • Small spots: {small_spots - sum(1 for spot in PL.getAllSpots() if spot.getSpotSize() == 1 and spot.is_open())}/{small_spots}")
-    print(f"  • Medium spots: {med_spots - sum(1 for spot in PL.getAllSpots() if spot.getSpotSize() == 2 and spot.is_open())}/{med_spots}")
-    print(f"  • Big spots: {big_spots - sum(1 for spot in PL.getAllSpots() if spot.getSpotSize() == 3 and spot.is_open())}/{big_spots}")
+    occupied = PL.getOccupiedSpotsBySize()
+    print(f"  • Small spots: {occupied.get(1, 0)}/{small_spots}")
+    print(f"  • Medium spots: {occupied.get(2, 0)}/{med_spots}")
+    print(f"  • Big spots: {occupied.get(3, 0)}/{big_spots}")
     
     print("=" * 60)
     
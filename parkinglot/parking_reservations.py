@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Advance reservations for the Parking Lot Simulation
+
+A ReservationBook sells spots of a size class for a time window
+[start, end) ahead of time. Every size class has an interval index (a
+dynamic segment tree over integer time) holding how many reservations
+overlap each moment, so reserving, cancelling and checking the
+availability of a window all take O(log span) time, however many
+reservations there are.
+
+The live parking path respects the book through ReservationPolicy, an
+allocation policy: a walk-in vehicle may only take a spot of a size class
+while more spots of that class are open than there are reservations
+running right now whose vehicle has not arrived yet. A vehicle with a
+reservation parks through claim().
+
+Times are integers in the caller's unit (e.g. minutes); fractional times
+are widened to whole units (start rounded down, end rounded up).
+
+Example:
+    book = ReservationBook(PL, clock=lambda: current_minute)
+    PL.setPolicy(ReservationPolicy(book))
+    booking = book.reserve(3, 8 * 60, 10 * 60)     # a big spot 8:00-10:00, or -1
+    book.getAvailable(3, 9 * 60, 12 * 60)          # big spots still free all along
+    book.claim(booking, Bus())                     # the bus arrived - park it
+    book.cancel(other_booking)
+
+@author: Maya Galili
+"""
+
+import math
+from array import array
+
+from allocation_policies import AllocationPolicy, FirstFit
+
+
+#%% interval index
+
+class IntervalCounter:
+    # how many intervals [start, end) overlap each integer time in [0, span),
+    # as a dynamic segment tree: nodes are created only along the paths that
+    # intervals touch. Every node keeps the count added to its whole range
+    # (never pushed down) and the max count inside its range
+
+    def __init__(self, span=1 << 24):
+        self._span = span
+        # node 0 is the empty node, node 1 the root
+        self._left = array('l', [0, 0])
+        self._right = array('l', [0, 0])
+        self._max = array('q', [0, 0])
+        self._add = array('q', [0, 0])
+
+    def getSpan(self):
+        return self._span
+
+    def _new_node(self):
+        self._left.append(0)
+        self._right.append(0)
+        self._max.append(0)
+        self._add.append(0)
+        return len(self._max) - 1
+
+    def add(self, start, end, value=1):
+        """Add value to the count of every time in [start, end)"""
+        if not 0 <= start < end <= self._span:
+            raise ValueError(f"interval [{start}, {end}) outside [0, {self._span})")
+        self._update(1, 0, self._span, start, end, value)
+
+    def _update(self, node, lo, hi, start, end, value):
+        if start <= lo and hi <= end:
+            self._add[node] += value
+            self._max[node] += value
+            return
+        mid = (lo + hi) // 2
+        if start < mid:
+            if not self._left[node]:
+                self._left[node] = self._new_node()
+            self._update(self._left[node], lo, mid, start, end, value)
+        if end > mid:
+            if not self._right[node]:
+                self._right[node] = self._new_node()
+            self._update(self._right[node], mid, hi, start, end, value)
+        self._max[node] = self._add[node] + max(self._max[self._left[node]], self._max[self._right[node]])
+
+    def max(self, start, end):
+        """The highest count at any time in [start, end)"""
+        start = max(start, 0)
+        end = min(end, self._span)
+        if start >= end:
+            return 0
+        return self._query(1, 0, self._span, start, end)
+
+    def _query(self, node, lo, hi, start, end):
+        if not node:
+            return 0
+        if start <= lo and hi <= end:
+            return self._max[node]
+        mid = (lo + hi) // 2
+        highest = 0
+        if start < mid:
+            highest = self._query(self._left[node], lo, mid, start, end)
+        if end > mid:
+            highest = max(highest, self._query(self._right[node], mid, hi, start, end))
+        return self._add[node] + highest
+
+    def at(self, t):
+        """The count at time t"""
+        return self.max(t, t + 1)
+
+
+#%% reservations
+
+class ReservationBook:
+    # lot   - the ParkingLot the reservations are for
+    # clock - callable returning the current time (same unit as the reservations)
+    # span  - reservations must lie within [0, span)
+
+    def __init__(self, lot, clock, span=1 << 24):
+        self._lot = lot
+        self._clock = clock
+        self._span = span
+        # spot size -> reservations overlapping each time
+        self._reserved = {spot_size: IntervalCounter(span) for spot_size in lot.getSpotsBySize()}
+        # spot size -> reservations whose vehicle is parked, from its arrival to the end
+        self._claimed = {spot_size: IntervalCounter(span) for spot_size in lot.getSpotsBySize()}
+        # reservation id -> [spot size, start, end, claimed from (None until the vehicle parks)]
+        self._bookings = {}
+        self._next_id = 0
+
+    def now(self):
+        return math.floor(self._clock())
+
+    @staticmethod
+    def _window(start, end):
+        return math.floor(start), math.ceil(end)
+
+    # getters
+    # spots of the size class free for the whole window [start, end)
+    def getAvailable(self, spot_size, start, end):
+        reserved = self._reserved.get(spot_size)
+        if reserved is None:
+            return 0
+        start, end = self._window(start, end)
+        available = self._lot.getSpotsBySize()[spot_size] - reserved.max(start, end)
+        now = self.now()
+        if start <= now < end:
+            # right now the spot has to be open, not just unreserved
+            available = min(available, self._lot.getOpenSpotsBySize()[spot_size] - self.getUnclaimedAt(spot_size, now))
+        return max(available, 0)
+
+    def is_available(self, spot_size, start, end, count=1):
+        return self.getAvailable(spot_size, start, end) >= count
+
+    # reservations of the size class running at time t whose vehicle has not parked
+    def getUnclaimedAt(self, spot_size, t):
+        reserved = self._reserved.get(spot_size)
+        if reserved is None:
+            return 0
+        return reserved.at(t) - self._claimed[spot_size].at(t)
+
+    def getReservationsSz(self):
+        return len(self._bookings)
+
+    # (spot size, start, end) of a reservation, or None
+    def getReservation(self, booking):
+        entry = self._bookings.get(booking)
+        return None if entry is None else tuple(entry[:3])
+
+    def reserve(self, spot_size, start, end):
+        """Reserve a spot of the size class for [start, end), returns the reservation id or -1"""
+        start, end = self._window(start, end)
+        if end <= self.now() or not self.is_available(spot_size, start, end):
+            return -1
+        self._reserved[spot_size].add(start, end)
+        booking = self._next_id
+        self._next_id += 1
+        self._bookings[booking] = [spot_size, start, end, None]
+        return booking
+
+    def cancel(self, booking):
+        """Drop a reservation (a parked vehicle stays parked), returns False if it is unknown"""
+        entry = self._bookings.pop(booking, None)
+        if entry is None:
+            return False
+        spot_size, start, end, claimed_from = entry
+        self._reserved[spot_size].add(start, end, -1)
+        if claimed_from is not None:
+            self._claimed[spot_size].add(claimed_from, end, -1)
+        return True
+
+    def claim(self, booking, vehicle):
+        """The reserved vehicle arrived: park it in a spot of the reserved size class
+
+        returns the spot index, or -1 if the reservation is unknown, not running
+        now, already claimed, or the vehicle does not fit the size class
+        """
+        entry = self._bookings.get(booking)
+        now = self.now()
+        if entry is None or entry[3] is not None or not entry[1] <= now < entry[2]:
+            return -1
+        spot_size = entry[0]
+        i = self._lot.park_many([vehicle], policy=SizeClassPolicy(spot_size))[0]
+        if i >= 0:
+            entry[3] = now
+            self._claimed[spot_size].add(now, entry[2])
+        return i
+
+
+#%% live parking path
+
+class SizeClassPolicy(AllocationPolicy):
+    # park only in the given size class
+
+    def __init__(self, spot_size):
+        self._spot_size = spot_size
+
+    def pick(self, free_spots, need):
+        free = free_spots.get(self._spot_size)
+        if self._spot_size >= need and free is not None and len(free):
+            return self._spot_size
+        return None
+
+
+class ReservationPolicy(AllocationPolicy):
+    # walk-in vehicles leave enough spots open for the reservations running now
+    #
+    # book   - the ReservationBook of the lot
+    # policy - how walk-ins pick among the classes they may use (default FirstFit)
+
+    def __init__(self, book, policy=None):
+        self._book = book
+        self._policy = policy or FirstFit()
+
+    def pick(self, free_spots, need):
+        now = self._book.now()
+        blocked = [spot_size for spot_size, free in free_spots.items()
+                   if spot_size >= need and len(free) <= self._book.getUnclaimedAt(spot_size, now)]
+        if blocked:
+            free_spots = {spot_size: free for spot_size, free in free_spots.items() if spot_size not in blocked}
+        return self._policy.pick(free_spots, need)
+
+    def take(self, free):
+        return self._policy.take(free)
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Discrete-event simulation of a parking lot over time.
+
+Vehicles arrive (Poisson process or a recorded trace), stay for a dwell
+time drawn from a distribution and leave. When the lot is full they wait
+in a FIFO queue (optionally bounded, with a maximum wait) or are rejected.
+Events are kept in a heap, nothing is printed, and the run returns a
+SimulationReport with the occupancy time series, rejections and wait times.
+
+Example:
+    PL = ParkingLot(20, 60, 20)
+    sim = ParkingSimulation(PL, PoissonArrivals(rate=2.0, seed=1), ExponentialDwell(60), queue_size=10)
+    report = sim.run(until=24 * 60)
+    print(report.summary())
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+from array import array
+from bisect import bisect_left
+from collections import deque
+from heapq import heappush, heappop
+from itertools import accumulate
+from random import Random
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import Motorcycle, Car, Bus
+from parking_events import NullSink
+
+# event kinds, in the order they are handled when they happen at the same time
+DEPARTURE, ABANDON, ARRIVAL = 0, 1, 2
+
+DEFAULT_MIX = {Motorcycle: 0.2, Car: 0.7, Bus: 0.1}
+
+
+#%% arrival processes
+
+class PoissonArrivals:
+    # vehicles arrive at `rate` per time unit, their type drawn from `mix`
+    # ({vehicle class: weight})
+
+    def __init__(self, rate, mix=None, seed=None):
+        self._rate = rate
+        self._mix = mix or DEFAULT_MIX
+        self._seed = seed
+
+    # yields (arrival time, vehicle, dwell time or None) in time order
+    def events(self):
+        rng = Random(self._seed)
+        vehicle_classes = list(self._mix)
+        cum_weights = list(accumulate(self._mix.values()))
+        t = 0.0
+        while True:
+            t += rng.expovariate(self._rate)
+            vehicle_class = rng.choices(vehicle_classes, cum_weights=cum_weights)[0]
+            yield t, vehicle_class(), None
+
+
+class TraceArrivals:
+    # recorded arrivals: an iterable of (time, vehicle) or (time, vehicle, dwell)
+    # in time order. a recorded dwell overrides the simulation's dwell distribution
+
+    def __init__(self, trace):
+        self._trace = trace
+
+    def events(self):
+        for event in self._trace:
+            if len(event) == 2:
+                yield event[0], event[1], None
+            else:
+                yield event
+
+
+#%% dwell-time distributions
+
+class ExponentialDwell:
+    # memoryless stays with the given mean
+
+    def __init__(self, mean):
+        self._rate = 1.0 / mean
+
+    def __call__(self, rng, vehicle):
+        return rng.expovariate(self._rate)
+
+
+class LognormalDwell:
+    # long-tailed stays - mu and sigma of the underlying normal distribution
+
+    def __init__(self, mu, sigma):
+        self._mu = mu
+        self._sigma = sigma
+
+    def __call__(self, rng, vehicle):
+        return rng.lognormvariate(self._mu, self._sigma)
+
+
+class FixedDwell:
+    # every vehicle stays exactly `duration`
+
+    def __init__(self, duration):
+        self._duration = duration
+
+    def __call__(self, rng, vehicle):
+        return self._duration
+
+
+#%% simulation
+
+class ParkingSimulation:
+    # lot          - a ParkingLot (or ArrayParkingLot) to park in
+    # arrivals     - an arrival process (PoissonArrivals / TraceArrivals)
+    # dwell        - callable(rng, vehicle) -> how long the vehicle stays
+    # queue_size   - how many vehicles may wait for a spot (0 = reject at once)
+    # max_wait     - a waiting vehicle leaves after this long (None = waits forever)
+    # sample_every - interval of the occupancy time series
+
+    def __init__(self, lot, arrivals, dwell, queue_size=0, max_wait=None, sample_every=1.0, seed=None):
+        self._lot = lot
+        self._arrivals = arrivals
+        self._dwell = dwell
+        self._queue_size = queue_size
+        self._max_wait = max_wait
+        self._sample_every = sample_every
+        self._rng = Random(seed)
+        # time of the event being handled - e.g. the clock of an EventRecorder
+        self.now = 0.0
+
+    def run(self, until=float('inf')):
+        """Run the simulation until time `until` (or the end of the arrival trace)"""
+        lot = self._lot
+        rng = self._rng
+        dwell = self._dwell
+        report = SimulationReport(lot.getTotalSpotsSz())
+        # the lot's event sink sees one outcome per arrival: parked (at once or
+        # after waiting) or rejected (queue full or gave up) - failed tries of
+        # a waiting vehicle are not reported
+        sink = lot.getEventSink()
+        if sink is None:
+            sink = NullSink()
+
+        events = []
+        seq = 0
+        arrivals = self._arrivals.events()
+        # queue entries are [vehicle, arrival time, dwell, waiting] - an entry that
+        # gave up is only flagged, and skipped when it reaches the head
+        queue = deque()
+        waiting = 0
+        next_sample = 0.0
+        t = 0.0
+
+        def schedule_departure(t, vehicle, stay):
+            nonlocal seq
+            heappush(events, (t + stay, DEPARTURE, seq, vehicle))
+            seq += 1
+
+        def next_arrival():
+            nonlocal seq
+            for t, vehicle, stay in arrivals:
+                heappush(events, (t, ARRIVAL, seq, (vehicle, stay)))
+                seq += 1
+                return
+
+        # park the waiting vehicles that fit now - FIFO, the head of the queue
+        # parks first and blocks the ones behind it
+        def drain_queue(t):
+            nonlocal waiting
+            while queue:
+                entry = queue[0]
+                vehicle, arrived_at, stay, is_waiting = entry
+                if not is_waiting:
+                    queue.popleft()
+                elif lot.try_park(vehicle) >= 0:
+                    queue.popleft()
+                    entry[3] = False
+                    waiting -= 1
+                    report.wait_times.append(t - arrived_at)
+                    schedule_departure(t, vehicle, stay)
+                else:
+                    break
+
+        next_arrival()
+        while events and events[0][0] < until:
+            t, kind, n, payload = heappop(events)
+            self.now = t
+
+            # a sample shows the lot after every event up to and including its time
+            while next_sample < t:
+                report._sample(next_sample, lot.getParkedSz(), waiting)
+                next_sample += self._sample_every
+
+            if kind == ARRIVAL:
+                next_arrival()
+                vehicle, stay = payload
+                if stay is None:
+                    stay = dwell(rng, vehicle)
+                report.arrival_times.append(t)
+                sink.arriving(vehicle)
+                # a new arrival never jumps the queue
+                if not waiting and lot.try_park(vehicle) >= 0:
+                    report.wait_times.append(0.0)
+                    schedule_departure(t, vehicle, stay)
+                elif waiting < self._queue_size:
+                    entry = [vehicle, t, stay, True]
+                    queue.append(entry)
+                    waiting += 1
+                    if self._max_wait is not None:
+                        heappush(events, (t + self._max_wait, ABANDON, seq, entry))
+                        seq += 1
+                else:
+                    report._reject(t)
+                    sink.rejected(vehicle)
+
+            elif kind == DEPARTURE:
+                lot.unpark(payload)
+                report.departed += 1
+                drain_queue(t)
+
+            elif payload[3]:  # ABANDON of a vehicle that is still waiting
+                payload[3] = False
+                waiting -= 1
+                report._abandon(payload[1])
+                sink.rejected(payload[0])
+                # the vehicles behind it may fit where it did not
+                drain_queue(t)
+
+        while next_sample < until and (events or next_sample <= t):
+            report._sample(next_sample, lot.getParkedSz(), waiting)
+            next_sample += self._sample_every
+
+        report.still_waiting = waiting
+        return report
+
+
+#%% results
+
+class SimulationReport:
+    # the outcome of one ParkingSimulation run
+
+    def __init__(self, total_spots):
+        self.total_spots = total_spots
+        self.departed = 0
+        self.rejected = 0
+        self.abandoned = 0
+        self.still_waiting = 0
+        # arrival time of every vehicle
+        self.arrival_times = array('d')
+        # wait of every vehicle that got a spot (0 if it parked on arrival)
+        self.wait_times = array('d')
+        # arrival time of every vehicle that was rejected (queue full) or gave up waiting
+        self.rejection_times = array('d')
+        # occupancy time series, one sample every `sample_every`
+        self.sample_times = array('d')
+        self.occupied = array('l')
+        self.queue_lengths = array('l')
+
+    @property
+    def arrived(self):
+        return len(self.arrival_times)
+
+    def _sample(self, t, occupied, queue_length):
+        self.sample_times.append(t)
+        self.occupied.append(occupied)
+        self.queue_lengths.append(queue_length)
+
+    def _reject(self, arrived_at):
+        self.rejected += 1
+        self.rejection_times.append(arrived_at)
+
+    def _abandon(self, arrived_at):
+        self.abandoned += 1
+        self.rejection_times.append(arrived_at)
+
+    def rejection_rate(self, start=0.0, end=float('inf')):
+        """Share of the vehicles arriving in [start, end) that were rejected or gave up waiting
+
+        e.g. the peak-hour rejection rate is rejection_rate(8 * 60, 9 * 60) for minute time units
+        """
+        arrived = bisect_left(self.arrival_times, end) - bisect_left(self.arrival_times, start)
+        rejected = sum(1 for t in self.rejection_times if start <= t < end)
+        return rejected / arrived if arrived else 0.0
+
+    def mean_wait(self):
+        return sum(self.wait_times) / len(self.wait_times) if self.wait_times else 0.0
+
+    def summary(self):
+        """Key numbers of the run as a dict"""
+        return {
+            "arrived": self.arrived,
+            "parked": len(self.wait_times),
+            "departed": self.departed,
+            "rejected": self.rejected,
+            "abandoned": self.abandoned,
+            "still_waiting": self.still_waiting,
+            "rejection_rate": self.rejection_rate(),
+            "mean_wait": self.mean_wait(),
+            "max_wait": max(self.wait_times) if self.wait_times else 0.0,
+            "peak_occupancy": max(self.occupied) / self.total_spots if self.occupied and self.total_spots else 0.0,
+        }
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Binary snapshot format of a parking lot (ParkingLot.save / ParkingLot.load)
+
+A snapshot holds the real spot layout and who is parked where, in fixed
+width little-endian fields, so it can be memory-mapped and used as is:
+
+    header          32 bytes   magic b"PKLOT\\x00\\x01\\x00", spot count (uint64),
+                               vehicle count (uint64), 8 reserved bytes
+    spot sizes      int8  x spots
+    padding         up to the next multiple of 8 bytes
+    occupants       int64 x spots      vehicle id parked in the spot, -1 if open
+    vehicle sizes   int8  x vehicles   size class of every vehicle id, 0 if unused
+
+Vehicle ids are 0..vehicles-1, in the order of their spots, unless the
+saver numbers them itself (e.g. the gate server keeps the ids it handed out).
+
+Only ArrayParkingLot.load memory-maps the file; ParkingLot.load reads it
+whole and builds every Spot up front.
+
+@author: Maya Galili
+"""
+
+import struct
+import sys
+from array import array
+
+MAGIC = b"PKLOT\x00\x01\x00"
+HEADER = struct.Struct("<8sQQ8x")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+# byte offsets of the spot sizes, occupants and vehicle sizes sections
+def section_offsets(spots_sz):
+    sizes_offset = HEADER.size
+    occupants_offset = sizes_offset + -(-spots_sz // 8) * 8
+    vehicles_offset = occupants_offset + 8 * spots_sz
+    return sizes_offset, occupants_offset, vehicles_offset
+
+
+# snapshot vehicle id of every vehicle: its id in vehicle_ids (a dict vehicle ->
+# id) if it has one there, otherwise the next id after the largest - by default
+# 0..len(vehicles)-1 in order
+def number_vehicles(vehicles, vehicle_ids=None):
+    if not vehicle_ids:
+        return list(range(len(vehicles)))
+    next_id = max(vehicle_ids.values()) + 1
+    ids = []
+    for vehicle in vehicles:
+        vehicle_id = vehicle_ids.get(vehicle)
+        if vehicle_id is None:
+            vehicle_id = next_id
+            next_id += 1
+        ids.append(vehicle_id)
+    return ids
+
+
+def write_snapshot(path, spot_sizes, occupants, vehicle_sizes):
+    """Write a snapshot - the arrays may be array.array or numpy arrays of the format's types"""
+    spots_sz = len(spot_sizes)
+    sizes_offset, occupants_offset, vehicles_offset = section_offsets(spots_sz)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, spots_sz, len(vehicle_sizes)))
+        f.write(_little_endian(spot_sizes))
+        f.write(bytes(occupants_offset - sizes_offset - spots_sz))
+        f.write(_little_endian(occupants))
+        f.write(_little_endian(vehicle_sizes))
+
+
+def read_header(f):
+    """Returns (spot count, vehicle count) of the snapshot open in f"""
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise SnapshotError("not a parking lot snapshot (file too short)")
+    magic, spots_sz, vehicles_sz = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise SnapshotError("not a parking lot snapshot (bad magic)")
+    return spots_sz, vehicles_sz
+
+
+def read_snapshot(path):
+    """Read a whole snapshot into (spot sizes, occupants, vehicle sizes) array.arrays"""
+    with open(path, "rb") as f:
+        spots_sz, vehicles_sz = read_header(f)
+        sizes_offset, occupants_offset, vehicles_offset = section_offsets(spots_sz)
+        spot_sizes = _read_array(f, "b", spots_sz)
+        f.seek(occupants_offset)
+        occupants = _read_array(f, "q", spots_sz)
+        vehicle_sizes = _read_array(f, "b", vehicles_sz)
+    return spot_sizes, occupants, vehicle_sizes
+
+
+def _read_array(f, typecode, length):
+    values = array(typecode)
+    data = f.read(length * values.itemsize)
+    if len(data) < length * values.itemsize:
+        raise SnapshotError("truncated parking lot snapshot")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _little_endian(values):
+    if sys.byteorder == "big" and isinstance(values, array):
+        values = array(values.typecode, values)
+        values.byteswap()
+    return memoryview(values).cast("B")
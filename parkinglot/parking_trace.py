@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming replay of recorded gate traces through a parking lot
+
+A trace is a time-ordered log of arrivals and departures:
+
+    time        float64   when it happened (any unit - minutes, epoch seconds)
+    event       int8      1 = arrival, 2 = departure
+    vehicle     int64     id of the vehicle, the same on arrival and departure
+    size        int8      size class of the vehicle (1 motorcycle, 2 car, 3 bus)
+
+stored as a CSV with that header or as a .npy structured array of
+TRACE_DTYPE. replay_trace() reads it in chunks of `chunk_size` rows
+(pandas read_csv(chunksize=...) / a memory-mapped .npy), feeds every event
+to the lot and emits one metrics row per `interval` of trace time. Memory
+is one chunk plus the vehicles parked at the time, however long the trace.
+A departure of a vehicle the lot had rejected (or never saw), and an
+arrival of a vehicle id that is still parked, are counted and skipped.
+
+    python parking_trace.py gates.csv --spots 200 600 200 --interval 60
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to the path to import ParkingLot
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ParkingLot import ParkingLot, VEHICLE_BY_SIZE
+from array_parking_lot import ArrayParkingLot
+
+ARRIVAL = 1
+DEPARTURE = 2
+TRACE_DTYPE = np.dtype([("time", "<f8"), ("event", "i1"), ("vehicle", "<i8"), ("size", "i1")])
+CSV_DTYPES = {name: TRACE_DTYPE[name].str for name in TRACE_DTYPE.names}
+
+
+#%% reading and writing traces
+
+def read_trace(path, chunk_size=1_000_000):
+    """Yield the trace in (time, event, vehicle, size) array chunks of at most chunk_size rows"""
+    if path.endswith(".npy"):
+        trace = np.load(path, mmap_mode="r")
+        if trace.dtype.names is None or set(TRACE_DTYPE.names) - set(trace.dtype.names):
+            raise ValueError(f"{path} is not a trace (needs fields {', '.join(TRACE_DTYPE.names)})")
+        for start in range(0, len(trace), chunk_size):
+            chunk = trace[start:start + chunk_size]
+            yield tuple(np.asarray(chunk[name]) for name in TRACE_DTYPE.names)
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=list(TRACE_DTYPE.names), dtype=CSV_DTYPES):
+            yield tuple(chunk[name].to_numpy() for name in TRACE_DTYPE.names)
+
+
+def write_trace(path, trace):
+    """Write a TRACE_DTYPE array as .npy, or as CSV for any other extension"""
+    if path.endswith(".npy"):
+        np.save(path, trace)
+    else:
+        pd.DataFrame({name: trace[name] for name in TRACE_DTYPE.names}).to_csv(path, index=False)
+
+
+def generate_trace(vehicles_sz, rate=2.0, mean_stay=60.0, mix=(0.2, 0.7, 0.1), seed=None):
+    """A synthetic trace: Poisson arrivals at `rate`, exponential stays, vehicle sizes from `mix`"""
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(rng.exponential(1.0 / rate, vehicles_sz))
+    trace = np.zeros(2 * vehicles_sz, dtype=TRACE_DTYPE)
+    trace["time"][:vehicles_sz] = arrivals
+    trace["time"][vehicles_sz:] = arrivals + rng.exponential(mean_stay, vehicles_sz)
+    trace["event"][:vehicles_sz] = ARRIVAL
+    trace["event"][vehicles_sz:] = DEPARTURE
+    trace["vehicle"] = np.tile(np.arange(vehicles_sz), 2)
+    trace["size"] = np.tile(rng.choice([1, 2, 3], size=vehicles_sz, p=mix), 2)
+    # departures first when they happen at the same time as an arrival
+    return trace[np.lexsort((trace["event"] == ARRIVAL, trace["time"]))]
+
+
+#%% replay
+
+class TraceReplay:
+    # lot        - the ParkingLot (or ArrayParkingLot) the trace is replayed into
+    # interval   - trace time between two metrics rows
+    # on_metrics - called with every metrics row as it is emitted (e.g. print)
+
+    def __init__(self, lot, interval=60.0, on_metrics=None):
+        self._lot = lot
+        self._interval = interval
+        self._on_metrics = on_metrics
+        # vehicle id -> the Vehicle parked for it
+        self._parked = {}
+        self._next_emit = None
+        self._last_time = -np.inf
+        self._counts = dict.fromkeys(("arrivals", "parked", "rejected", "departures", "skipped_departures",
+                                      "duplicate_arrivals"), 0)
+        self.metrics = []
+        self.events = 0
+
+    def feed(self, times, events, vehicles, sizes):
+        """Replay one chunk of the trace (arrays in time order)"""
+        if not len(times):
+            return
+        if times[0] < self._last_time or (len(times) > 1 and np.any(np.diff(times) < 0)):
+            raise ValueError("the trace is not in time order")
+        self._last_time = times[-1]
+        if self._next_emit is None:
+            self._next_emit = (np.floor(times[0] / self._interval) + 1) * self._interval
+
+        start = 0
+        while True:
+            # everything before the next metrics boundary, in one Python loop
+            cut = int(np.searchsorted(times, self._next_emit, side="left"))
+            if cut > start:
+                self._apply(events[start:cut].tolist(), vehicles[start:cut].tolist(), sizes[start:cut].tolist())
+                start = cut
+            if cut == len(times):
+                break
+            self._emit()
+        self.events += len(times)
+
+    def _apply(self, events, vehicles, sizes):
+        lot = self._lot
+        parked = self._parked
+        park = lot.park_new_vec
+        unpark = lot.unpark
+        vehicle_by_size = VEHICLE_BY_SIZE
+        arrivals = parked_sz = departures = skipped = duplicates = 0
+        for event, vehicle_id, size in zip(events, vehicles, sizes):
+            if event == ARRIVAL:
+                # parking it again would lose the spot of the one already parked
+                if vehicle_id in parked:
+                    duplicates += 1
+                    continue
+                arrivals += 1
+                vehicle = vehicle_by_size[size]()
+                if park(vehicle):
+                    parked[vehicle_id] = vehicle
+                    parked_sz += 1
+            else:
+                vehicle = parked.pop(vehicle_id, None)
+                if vehicle is None:
+                    skipped += 1
+                else:
+                    unpark(vehicle)
+                    departures += 1
+        counts = self._counts
+        counts["arrivals"] += arrivals
+        counts["parked"] += parked_sz
+        counts["rejected"] += arrivals - parked_sz
+        counts["departures"] += departures
+        counts["skipped_departures"] += skipped
+        counts["duplicate_arrivals"] += duplicates
+
+    # one metrics row for the interval ending at the next boundary
+    def _emit(self):
+        lot = self._lot
+        row = {"time": float(self._next_emit)}
+        row.update(self._counts)
+        row["occupied"] = lot.getParkedSz()
+        row["utilization"] = lot.getUtilization()
+        for spot_size, occupied in lot.getOccupiedSpotsBySize().items():
+            row[f"occupied_{spot_size}"] = occupied
+        self.metrics.append(row)
+        if self._on_metrics is not None:
+            self._on_metrics(row)
+        self._counts = dict.fromkeys(self._counts, 0)
+        self._next_emit += self._interval
+
+    def finish(self):
+        """Emit the last, partial interval - returns the metrics as a DataFrame"""
+        if any(self._counts.values()):
+            self._emit()
+        return self.getMetrics()
+
+    # getters
+    def getMetrics(self):
+        return pd.DataFrame(self.metrics)
+
+    def getParkedSz(self):
+        return len(self._parked)
+
+
+def replay_trace(lot, path, chunk_size=1_000_000, interval=60.0, on_metrics=None):
+    """Stream the trace at path through the lot, returns the TraceReplay (metrics in .getMetrics())"""
+    replay = TraceReplay(lot, interval, on_metrics)
+    for chunk in read_trace(path, chunk_size):
+        replay.feed(*chunk)
+    replay.finish()
+    return replay
+
+
+#%% command line
+
+def print_metrics(row):
+    print(f"t={row['time']:>12,.0f}  arrivals {row['arrivals']:>8,}  rejected {row['rejected']:>7,}  "
+          f"departures {row['departures']:>8,}  occupied {row['occupied']:>8,} ({row['utilization']:.1%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded gate trace through a parking lot")
+    parser.add_argument("trace", help="CSV (time,event,vehicle,size) or .npy trace")
+    parser.add_argument("--spots", type=int, nargs=3, default=[200, 600, 200], metavar=("SMALL", "MEDIUM", "BIG"))
+    parser.add_argument("--array", action="store_true", help="use the array-backed lot (for huge lots)")
+    parser.add_argument("--seed", type=int, help="seed of the spot layout")
+    parser.add_argument("--interval", type=float, default=60.0, help="trace time between metrics rows")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="rows read at a time")
+    parser.add_argument("--metrics", help="write the metrics to this CSV file")
+    parser.add_argument("--quiet", action="store_true", help="no metrics rows on the console")
+    args = parser.parse_args(argv)
+
+    lot_class = ArrayParkingLot if args.array else ParkingLot
+    lot = lot_class(*args.spots, rng=args.seed)
+    print(f"🅿️  Replaying {args.trace} through {lot.getTotalSpotsSz():,} spots")
+    start = time.perf_counter()
+    replay = replay_trace(lot, args.trace, args.chunk_size, args.interval, None if args.quiet else print_metrics)
+    elapsed = time.perf_counter() - start
+
+    metrics = replay.getMetrics()
+    if args.metrics:
+        metrics.to_csv(args.metrics, index=False)
+    arrivals = int(metrics["arrivals"].sum()) if len(metrics) else 0
+    rejected = int(metrics["rejected"].sum()) if len(metrics) else 0
+    print(f"📊 {replay.events:,} events in {elapsed:.1f} s ({replay.events / max(elapsed, 1e-9):,.0f} events/s)")
+    print(f"   {arrivals:,} arrivals, {rejected:,} rejected ({rejected / arrivals if arrivals else 0:.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import random
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from concurrent_parking_lot import ConcurrentParkingLot
+from allocation_policies import FirstFit, BestFit, WorstFit, ReservedQuota
+
+
+def scan(spots, vehicle, choose_size):
+    """Reference answer: the lowest open spot of the size class choose_size picks among the fitting open spots"""
+    sizes = {spot.getSpotSize() for spot in spots if spot.is_open() and spot.getSpotSize() >= vehicle.getSize()}
+    if not sizes:
+        return -1
+    spot_size = choose_size(sizes)
+    if spot_size is None:
+        return -1
+    return next(i for i, spot in enumerate(spots) if spot.is_open() and spot.getSpotSize() == spot_size)
+
+
+class TestAllocationPolicies(unittest.TestCase):
+    @staticmethod
+    def create_random_vehicles(vehicles_sz):
+        return [random.choice([Motorcycle, Car, Bus])() for i in range(vehicles_sz)]
+
+    def churn(self, PL, policy, choose_size):
+        PL.setPolicy(policy)
+        parked = []
+        for step in range(600):
+            if parked and random.random() < 0.4:
+                PL.unpark(parked.pop(random.randrange(len(parked))))
+            else:
+                vehicle = self.create_random_vehicles(1)[0]
+                expected = scan(PL.getAllSpots(), vehicle, choose_size)
+                self.assertEqual(PL._park(vehicle), expected)
+                if expected >= 0:
+                    parked.append(vehicle)
+
+    def test_best_and_worst_fit(self):
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            self.churn(lot_class(10, 10, 10), BestFit(), min)
+            self.churn(lot_class(10, 10, 10), WorstFit(), max)
+
+    def test_reserved_quota(self):
+        # only the last 3 big spots are kept for buses
+        def keep_big_spots(PL, vehicle):
+            def choose_size(sizes):
+                open_big = sum(1 for spot in PL.getAllSpots() if spot.is_open() and spot.getSpotSize() == 3)
+                allowed = [spot_size for spot_size in sizes
+                           if not (spot_size == 3 and vehicle.getSize() < 3 and open_big <= 3)]
+                return min(allowed) if allowed else None
+            return choose_size
+
+        PL = ParkingLot(10, 10, 10)
+        PL.setPolicy(ReservedQuota({3: 3}))
+        for step in range(300):
+            if PL.getVehicleSet() and random.random() < 0.4:
+                PL.unpark(random.choice(PL.getVehicleSet()))
+            else:
+                vehicle = self.create_random_vehicles(1)[0]
+                expected = scan(PL.getAllSpots(), vehicle, keep_big_spots(PL, vehicle))
+                self.assertEqual(PL._park(vehicle), expected)
+
+        PL = ParkingLot(0, 0, 4)
+        spots = PL.park_many([Car(), Car(), Car(), Bus(), Bus()], policy=ReservedQuota({3: 2}))
+        self.assertEqual([i >= 0 for i in spots], [True, True, False, True, True])
+
+    def test_park_many_with_policy(self):
+        vehicles = self.create_random_vehicles(80)
+        # the same rng gives both lots the same layout
+        lots = [ParkingLot(20, 20, 20, rng=3) for i in range(2)]
+        self.assertEqual(lots[0].park_many(vehicles, policy='best_fit'),
+                         lots[1].park_many(vehicles, policy=BestFit()))
+        self.assertIsInstance(lots[0].getPolicy(), FirstFit)
+
+    def test_policy_by_name(self):
+        vehicles = self.create_random_vehicles(80)
+        for lot_class in (ParkingLot, ArrayParkingLot, ConcurrentParkingLot):
+            lots = [lot_class(20, 20, 20, rng=3) for i in range(3)]
+            self.assertEqual(lots[0].park_many(vehicles, policy='worst_fit'),
+                             lots[1].park_many(vehicles, policy=WorstFit()))
+            lots[2].setPolicy('worst_fit')
+            self.assertIsInstance(lots[2].getPolicy(), WorstFit)
+            # 'first_fit' parks one by one with the lot's own policy
+            self.assertEqual(lots[2].park_many(vehicles, policy='first_fit'),
+                             [lots[1].getVehicleSpot(vehicle) for vehicle in vehicles])
+            with self.assertRaises(ValueError):
+                lots[2].park_many(vehicles, policy='nearest')
+            with self.assertRaises(ValueError):
+                lots[2].setPolicy('nearest')
+
+
+if __name__ == '__main__':
+    unittest.main()
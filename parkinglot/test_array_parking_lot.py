@@ -0,0 +1,144 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from test_parking_lot import first_fit_scan, max_matching
+
+
+class TestArrayParkingLot(unittest.TestCase):
+    @staticmethod
+    def create_random_vehicles(vehicles_sz=200):
+        return [random.choice([Motorcycle, Car, Bus])() for i in range(vehicles_sz)]
+
+    def test_generate_open_spots(self):
+        PL = ArrayParkingLot(3, 4, 5)
+        sizes = [spot.getSpotSize() for spot in PL.getAllSpots()]
+        self.assertEqual(sorted(sizes), [1] * 3 + [2] * 4 + [3] * 5)
+        self.assertEqual(PL.getOpenSpotsSz(), 12)
+        self.assertTrue(all(spot.is_open() for spot in PL.getAllSpots()))
+        self.assertEqual(PL.getSpotsBySize(), {1: 3, 2: 4, 3: 5})
+
+    def test_occupancy_counters(self):
+        PL = ArrayParkingLot(5, 5, 5)
+        vehicles = [Car(), Car(), Bus(), Motorcycle()]
+        PL.park_many(vehicles)
+        self.assertEqual(PL.getOccupiedSpotsBySize(), {1: 1, 2: 2, 3: 1})
+        self.assertEqual(PL.getParkedByType(), {'CAR': 2, 'BUS': 1, 'MOTORCYCLE': 1})
+        PL.unpark(vehicles[2])
+        self.assertEqual(PL.getParkedByType(), {'CAR': 2, 'MOTORCYCLE': 1})
+        self.assertEqual(PL.getRoomFor(Bus()), 5)
+        self.assertEqual(PL.getUtilization(), 3 / 15)
+
+    def test_churn_matches_first_fit_scan(self):
+        PL = ArrayParkingLot(20, 20, 20)
+        parked = []
+        for step in range(2000):
+            if parked and random.random() < 0.5:
+                vehicle = parked.pop(random.randrange(len(parked)))
+                i = PL.getVehicleSpot(vehicle)
+                self.assertTrue(PL.unpark(vehicle))
+                self.assertTrue(PL.getAllSpots()[i].is_open())
+            else:
+                vehicle = self.create_random_vehicles(1)[0]
+                expected = first_fit_scan(PL.getAllSpots(), vehicle)
+                self.assertEqual(PL._park(vehicle), expected)
+                if expected >= 0:
+                    self.assertIs(PL.getAllSpots()[expected].getParkedVec(), vehicle)
+                    parked.append(vehicle)
+            self.assertEqual(PL.getOpenSpotsSz(), sum(1 for spot in PL.getAllSpots() if spot.is_open()))
+
+    def test_park_many_after_churn(self):
+        PL = ArrayParkingLot(10, 10, 10)
+        vehicles = self.create_random_vehicles(20)
+        PL.park_many(vehicles, policy='first_fit')
+        for vehicle in vehicles[::2]:
+            PL.unpark(vehicle)
+
+        wave = self.create_random_vehicles(30)
+        expected = max_matching([spot for spot in PL.getAllSpots() if spot.is_open()], wave)
+        spots = PL.park_many(wave)
+        taken = [i for i in spots if i >= 0]
+        self.assertEqual(len(taken), expected)
+        self.assertEqual(len(taken), len(set(taken)))
+        for vehicle, i in zip(wave, spots):
+            if i >= 0:
+                self.assertIs(PL.getAllSpots()[i].getParkedVec(), vehicle)
+                self.assertEqual(PL.getVehicleSpot(vehicle), i)
+        self.assertEqual(PL.getOpenSpotsSz(), sum(1 for spot in PL.getAllSpots() if spot.is_open()))
+
+    def test_save_load(self):
+        PL = ArrayParkingLot(30, 30, 30)
+        vehicles = self.create_random_vehicles(60)
+        PL.park_many(vehicles)
+        for vehicle in vehicles[::3]:
+            PL.unpark(vehicle)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lot.snapshot")
+            PL.save(path)
+            with open(path, "rb") as f:
+                saved = f.read()
+
+            restored = ArrayParkingLot.load(path)
+            self.assertIsInstance(restored._spot_sizes, np.memmap)
+            self.assertEqual(restored.getSpotCells(), PL.getSpotCells())
+            self.assertEqual(restored.getParkedByType(), PL.getParkedByType())
+            for vehicle in self.create_random_vehicles(40):
+                self.assertEqual(restored._park(vehicle), PL._park(vehicle))
+            # changes to the restored lot never reach the file
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), saved)
+
+            # the object-based lot reads the same snapshot
+            self.assertEqual(ParkingLot.load(path).getSpotCells(), ArrayParkingLot.load(path).getSpotCells())
+            del restored
+
+    def test_load_creates_vehicles_lazily(self):
+        PL = ArrayParkingLot(30, 30, 30)
+        vehicles = self.create_random_vehicles(60)
+        PL.park_many(vehicles)
+        for vehicle in vehicles[::2]:
+            PL.unpark(vehicle)
+        PL.park_many(self.create_random_vehicles(20))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lot.snapshot")
+            PL.save(path)
+            restored = ArrayParkingLot.load(path)
+
+            # ids are compacted to 0..parked-1, however many were handed out
+            self.assertEqual(len(restored._vehicles._sizes), PL.getParkedSz())
+            # counting the restored lot creates no vehicles
+            self.assertEqual(restored.getParkedSz(), PL.getParkedSz())
+            self.assertEqual(restored.getParkedByType(), PL.getParkedByType())
+            self.assertEqual(len(restored._vehicle_spots), 0)
+
+            # a vehicle is created the first time its spot is looked at
+            i = restored._occupants.tolist().index(0)
+            vehicle = restored.getAllSpots()[i].getParkedVec()
+            self.assertIs(restored.getAllSpots()[i].getParkedVec(), vehicle)
+            self.assertEqual(restored.getVehicleSpot(vehicle), i)
+            self.assertTrue(restored.unpark(vehicle))
+            self.assertIsNotNone(restored.unpark_spot(restored._occupants.tolist().index(1)))
+            self.assertEqual(restored.getParkedSz(), PL.getParkedSz() - 2)
+            self.assertEqual(len(restored._vehicle_spots), 0)
+
+            self.assertEqual(len(restored.getVehicleSet()), PL.getParkedSz() - 2)
+            self.assertEqual(restored.getParkedSz(), PL.getParkedSz() - 2)
+            del restored, vehicle
+
+    def test_display_parking_lot(self):
+        PL = ArrayParkingLot(10, 10, 10)
+        PL.park_many(self.create_random_vehicles(15))
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            PL.display_parking_lot()
+        self.assertEqual(out.getvalue().count("│"), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
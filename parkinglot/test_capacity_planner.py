@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+from capacity_planner import CapacityPlanner, pareto_front, score_mix
+from monte_carlo import run_seeds
+
+
+def front_mixes(front):
+    """The (small, med, big) spot mixes of a Pareto front"""
+    return front[["small", "med", "big"]].values.tolist()
+
+
+class TestCapacityPlanner(unittest.TestCase):
+    def test_pareto_front(self):
+        scores = pd.DataFrame({"cost": [1, 2, 2, 3, 4, 5], "efficiency": [0.2, 0.5, 0.4, 0.45, 0.9, 0.9]})
+        front = pareto_front(scores)
+        self.assertEqual(front["cost"].tolist(), [1, 2, 4])
+        self.assertEqual(front["efficiency"].tolist(), [0.2, 0.5, 0.9])
+
+    def test_candidates_fit_the_budget(self):
+        planner = CapacityPlanner(budget=12, vehicles=(2, 3, 1), runs=4, workers=1)
+        grid = planner.grid(2)
+        self.assertIn((0, 0, 4), grid)
+        self.assertNotIn((0, 0, 0), grid)
+        self.assertTrue(all(planner.getArea(mix) <= 12 for mix in grid))
+        neighbors = planner.neighbors((2, 2, 2), 1)
+        self.assertEqual(len(neighbors), 6)
+        self.assertIn((3, 1, 2), neighbors)
+        self.assertTrue(all(planner.fits(mix) for mix in neighbors))
+
+    def test_memoized_scores(self):
+        planner = CapacityPlanner(budget=12, vehicles=(2, 3, 1), runs=20, seed=1, workers=1)
+        self.assertEqual(planner.evaluate([(1, 2, 1), (0, 3, 1), (1, 2, 1)]), 2)
+        self.assertEqual(planner.evaluate([(1, 2, 1), (2, 2, 1)]), 1)
+        self.assertEqual(planner.cache_hits, 1)
+        scores = planner.getScores().set_index(["small", "med", "big"])
+        expected, std = score_mix((1, 2, 1, 2, 3, 1), run_seeds(20, 1))
+        self.assertEqual(scores.loc[(1, 2, 1), "efficiency"], expected)
+        self.assertEqual(scores.loc[(1, 2, 1), "area"], 8)
+
+    def test_refined_front_is_not_dominated(self):
+        vehicles = (2, 4, 1)
+        exhaustive = CapacityPlanner(budget=14, vehicles=vehicles, runs=30, workers=1)
+        full_front = exhaustive.plan(grid_step=1)
+        # a grid step of 1 scores every mix that fits
+        self.assertEqual(len(exhaustive.getScores()), len(exhaustive.grid(1)))
+
+        planner = CapacityPlanner(budget=14, vehicles=vehicles, runs=30, workers=2)
+        front = planner.plan(grid_step=3)
+        self.assertLess(len(planner.getScores()), len(exhaustive.getScores()))
+        # same seeds, same scores - the refinement finds the same front with far fewer candidates
+        self.assertEqual(front_mixes(front), front_mixes(full_front))
+
+
+if __name__ == '__main__':
+    unittest.main()
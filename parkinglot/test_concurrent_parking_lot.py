@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+
+from ParkingLot import Motorcycle, Car, Bus
+from concurrent_parking_lot import ConcurrentParkingLot
+
+
+class TestConcurrentParkingLot(unittest.TestCase):
+    def setUp(self):
+        # switch threads as often as possible to provoke races
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._switch_interval)
+
+    def test_gates_stress(self):
+        PL = ConcurrentParkingLot(30, 60, 30)
+        errors = []
+
+        def gate(seed):
+            rng = random.Random(seed)
+            parked = []
+            for step in range(3000):
+                if parked and rng.random() < 0.45:
+                    vehicle = parked.pop(rng.randrange(len(parked)))
+                    if not PL.unpark(vehicle):
+                        errors.append("lost a parked vehicle")
+                else:
+                    vehicle = rng.choice([Motorcycle, Car, Bus])()
+                    i = PL._park(vehicle)
+                    if i >= 0:
+                        if PL.getAllSpots()[i].getParkedVec() is not vehicle:
+                            errors.append(f"spot {i} given to two vehicles")
+                        parked.append(vehicle)
+                if not 0 <= PL.getOpenSpotsSz() <= PL.getTotalSpotsSz():
+                    errors.append("open count out of range")
+            return parked
+
+        threads = [threading.Thread(target=gate, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        occupied = [spot.getParkedVec() for spot in PL.getAllSpots() if not spot.is_open()]
+        self.assertEqual(len(occupied), len(set(map(id, occupied))))
+        self.assertEqual(len(occupied), len(PL.getVehicleSet()))
+        self.assertEqual(PL.getOpenSpotsSz(), PL.getTotalSpotsSz() - len(occupied))
+        for vehicle in occupied:
+            self.assertIs(PL.getAllSpots()[PL.getVehicleSpot(vehicle)].getParkedVec(), vehicle)
+        for spot_size, count in PL.getOccupiedSpotsBySize().items():
+            self.assertEqual(count, sum(1 for spot in PL.getAllSpots() if spot.getSpotSize() == spot_size and not spot.is_open()))
+        self.assertEqual(sum(PL.getParkedByType().values()), len(occupied))
+
+    def test_double_unpark(self):
+        PL = ConcurrentParkingLot(0, 50, 0)
+        vehicles = [Car() for i in range(50)]
+        PL.park_many(vehicles)
+        results = []
+
+        def gate():
+            results.extend(PL.unpark(vehicle) for vehicle in vehicles)
+
+        threads = [threading.Thread(target=gate) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 50)
+        self.assertEqual(PL.getOpenSpotsSz(), 50)
+
+    def test_load(self):
+        PL = ConcurrentParkingLot(5, 5, 5)
+        PL.park_many([Car(), Bus()])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lot.snapshot")
+            PL.save(path)
+            restored = ConcurrentParkingLot.load(path)
+        self.assertEqual(restored.getOpenSpotsBySize(), {1: 5, 2: 4, 3: 4})
+        self.assertGreaterEqual(restored._park(Bus()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from parking_sim import ParkingSimulation, PoissonArrivals, ExponentialDwell
+from event_recorder import EventRecorder, PARKED, REJECTED, UNPARKED, BLOCK_SIZE
+
+
+def record_events(outcomes, times):
+    """A recorder holding one car event per outcome, at the given times"""
+    tick = iter(times).__next__
+    recorder = EventRecorder(clock=tick, capacity=2)
+    car = Car()
+    for spot, outcome in enumerate(outcomes):
+        if outcome == PARKED:
+            recorder.parked(car, spot, 2)
+        elif outcome == UNPARKED:
+            recorder.unparked(car, spot, 2)
+        else:
+            recorder.rejected(car)
+    return recorder
+
+
+class TestEventRecorder(unittest.TestCase):
+    def test_columns_grow(self):
+        recorder = EventRecorder(clock=iter(range(3 * BLOCK_SIZE)).__next__, capacity=1)
+        vehicles = [Motorcycle(), Car(), Bus()]
+        for n in range(3 * BLOCK_SIZE):
+            vehicle = vehicles[n % 3]
+            if n % 5:
+                recorder.parked(vehicle, n, vehicle.getSize())
+            else:
+                recorder.rejected(vehicle)
+        self.assertEqual(len(recorder), 3 * BLOCK_SIZE)
+        frame = recorder.to_frame()
+        self.assertEqual(frame["time"].tolist(), list(range(3 * BLOCK_SIZE)))
+        self.assertEqual(frame["vehicle"].tolist()[:3], ["MOTORCYCLE", "CAR", "BUS"])
+        self.assertEqual(frame["spot"].tolist()[:3], [-1, 1, 2])
+        self.assertEqual(frame["spot_size"].tolist()[:3], [0, 2, 3])
+        self.assertEqual(frame["outcome"].tolist()[:2], ["rejected", "parked"])
+
+    def test_frame_shares_memory(self):
+        recorder = record_events([PARKED, PARKED, UNPARKED], [0.0, 1.0, 2.0])
+        frame = recorder.to_frame()
+        self.assertTrue(np.shares_memory(frame["time"].to_numpy(), recorder.column("time")))
+        self.assertTrue(np.shares_memory(frame["spot"].to_numpy(), recorder.column("spot")))
+
+    def test_npz_round_trip(self):
+        recorder = record_events([PARKED, REJECTED, UNPARKED, PARKED], [0.5, 1.0, 2.5, 3.0])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.npz")
+            recorder.save(path)
+            loaded = EventRecorder.load(path)
+        self.assertEqual(len(loaded), 4)
+        self.assertTrue(loaded.to_frame().equals(recorder.to_frame()))
+
+    def test_rolling_aggregates(self):
+        rng = np.random.default_rng(4)
+        times = np.cumsum(rng.exponential(1.0, 2_000))
+        outcomes, occupied = [], 0
+        for draw in rng.random(2_000):
+            if occupied and draw < 0.4:
+                outcomes.append(UNPARKED)
+                occupied -= 1
+            else:
+                outcomes.append(PARKED if draw < 0.85 else REJECTED)
+                occupied += outcomes[-1] == PARKED
+        recorder = record_events(outcomes, times.tolist())
+        window = 25.0
+
+        occupancy = recorder.occupancy().to_numpy()
+        self.assertEqual(occupancy[-1], occupied)
+        self.assertTrue((occupancy >= 0).all())
+
+        # brute force: step function integrated event by event
+        rolling = recorder.rolling_occupancy(window).to_numpy()
+        for k in range(0, len(times), 97):
+            start = times[k] - window
+            area = 0.0
+            for j in range(k):
+                low, high = max(times[j], start), times[j + 1]
+                if high > low:
+                    area += occupancy[j] * (high - low)
+            if start >= times[0]:
+                self.assertAlmostEqual(rolling[k], area / window)
+
+        rates = recorder.rolling_rejection_rate(window)
+        arrivals = [(t, outcome) for t, outcome in zip(times, outcomes) if outcome != UNPARKED]
+        self.assertEqual(len(rates), len(arrivals))
+        for k in range(0, len(arrivals), 89):
+            recent = [outcome for t, outcome in arrivals[:k + 1] if t > arrivals[k][0] - window]
+            self.assertAlmostEqual(rates.iloc[k], recent.count(REJECTED) / len(recent))
+
+    def test_simulation_clock(self):
+        PL = ParkingLot(2, 4, 1, rng=1)
+        sim = ParkingSimulation(PL, PoissonArrivals(rate=2.0, seed=1), ExponentialDwell(5), seed=2)
+        recorder = EventRecorder(clock=lambda: sim.now)
+        PL.setEventSink(recorder)
+        result = sim.run(until=100)
+        frame = recorder.to_frame()
+        self.assertTrue((np.diff(frame["time"]) >= 0).all())
+        self.assertLessEqual(frame["time"].iloc[-1], 100)
+        self.assertEqual((frame["outcome"] == "parked").sum(), len(result.wait_times))
+        self.assertEqual((frame["outcome"] == "rejected").sum(), result.rejected)
+        self.assertEqual(recorder.occupancy().iloc[-1], PL.getParkedSz())
+
+    def test_one_outcome_per_arrival(self):
+        # waiting vehicles retry on every departure - only their final outcome is recorded
+        PL = ParkingLot(1, 2, 1, rng=1)
+        sim = ParkingSimulation(PL, PoissonArrivals(rate=2.0, seed=3), ExponentialDwell(5), queue_size=2,
+                                max_wait=2.0, seed=4)
+        recorder = EventRecorder(clock=lambda: sim.now)
+        PL.setEventSink(recorder)
+        result = sim.run(until=200)
+        outcomes = recorder.to_frame()["outcome"]
+        self.assertGreater(result.abandoned, 0)
+        self.assertEqual((outcomes == "parked").sum(), len(result.wait_times))
+        self.assertEqual((outcomes == "rejected").sum(), result.rejected + result.abandoned)
+        self.assertEqual((outcomes != "unparked").sum() + result.still_waiting, result.arrived)
+
+
+if __name__ == '__main__':
+    unittest.main()
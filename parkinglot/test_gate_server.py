@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from ParkingLot import ParkingLot
+from gate_server import GateServer
+from gate_client import run_load
+
+
+async def talk(port, lines):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write("".join(line + "\n" for line in lines).encode())
+    await writer.drain()
+    answers = [(await reader.readline()).decode().split() for line in lines]
+    writer.close()
+    await writer.wait_closed()
+    return answers
+
+
+class TestGateServer(unittest.TestCase):
+    def run_with_server(self, lot, client, server=None):
+        async def main():
+            nonlocal server
+            if server is None:
+                server = GateServer(lot, batch_window=0.01)
+            tcp_server = await server.start('127.0.0.1', 0)
+            async with tcp_server:
+                return server, await client(tcp_server.sockets[0].getsockname()[1])
+        return asyncio.run(main())
+
+    def test_protocol(self):
+        lines = ["PARK BUS", "PARK CAR", "PARK motorcycle", "STATUS", "UNPARK 0", "UNPARK 0", "FLY AWAY"]
+        server, answers = self.run_with_server(ParkingLot(1, 0, 1), lambda port: talk(port, lines))
+
+        # the three PARKs are allocated as one optimal batch: the bus gets the big spot
+        self.assertEqual(server.batches, 1)
+        self.assertEqual([answer[0] for answer in answers], ["OK", "FULL", "OK", "OK", "OK", "UNKNOWN", "ERROR"])
+        self.assertEqual(answers[3][1:], ["0", "2", "2"])
+
+    def test_malformed_requests(self):
+        async def client(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write("UNPARK ²\nUNPARK ٣\n".encode() + b"PARK \xff\xfe\n\xff\n" + b"STATUS\n")
+            await writer.drain()
+            answers = [(await reader.readline()).decode().split() for i in range(5)]
+            writer.close()
+            await writer.wait_closed()
+            return answers
+        server, answers = self.run_with_server(ParkingLot(1, 1, 1), client)
+
+        # bad input gets an ERROR and the connection keeps serving
+        self.assertEqual([answer[0] for answer in answers], ["ERROR"] * 4 + ["OK"])
+        self.assertEqual(answers[4], ["OK", "3", "3", "0"])
+
+    def test_snapshot_keeps_vehicle_ids(self):
+        lines = ["PARK CAR", "PARK BUS", "PARK MOTORCYCLE", "UNPARK 0"]
+        server, answers = self.run_with_server(ParkingLot(1, 1, 1), lambda port: talk(port, lines))
+        spots = {answer[1]: answer[2] for answer in answers[:3]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lot.snapshot")
+            server.save(path)
+            restored = GateServer.load(path, batch_window=0.01)
+
+        # the vehicles parked before the restart can still leave
+        lines = ["STATUS", "UNPARK 2", "UNPARK 1", "UNPARK 0", "PARK CAR", "STATUS"]
+        server, answers = self.run_with_server(None, lambda port: talk(port, lines), restored)
+        self.assertEqual(answers[0], ["OK", "1", "3", "2"])
+        self.assertEqual(answers[1:4], [["OK", spots["2"]], ["OK", spots["1"]], ["UNKNOWN"]])
+        # the lowest free id is handed out again
+        self.assertEqual(answers[4][:2], ["OK", "0"])
+        self.assertEqual(answers[5], ["OK", "2", "3", "1"])
+
+    def test_load(self):
+        lot = ParkingLot(100, 300, 100)
+        server, result = self.run_with_server(
+            lot, lambda port: run_load('127.0.0.1', port, connections=4, requests=2000, pipeline=16))
+
+        self.assertEqual(result["parked"], result["unparked"])
+        self.assertEqual(result["requests"], result["parked"] + result["full"] + result["unparked"])
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertLess(server.batches, result["parked"] + result["full"])
+        self.assertEqual(lot.getOpenSpotsSz(), 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
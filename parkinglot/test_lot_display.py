@@ -0,0 +1,86 @@
+import io
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from lot_display import LotDisplay
+
+
+def spot_sizes(PL):
+    return [spot.getSpotSize() for spot in PL.getAllSpots()]
+
+
+class TestRender(unittest.TestCase):
+    def test_render_parking_lot(self):
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            # rng=15 lays the spots out small, medium, medium, big
+            PL = lot_class(1, 2, 1, rng=15)
+            self.assertEqual(spot_sizes(PL), [1, 2, 2, 3])
+            PL.park_many([Car(), Bus(), Motorcycle()], policy='first_fit')
+            self.assertEqual(PL.render_parking_lot(), "\n".join([
+                "🅿️  Current Parking Lot Status:",
+                "┌───────────────┐",
+                "│ (M) [C] [ ] {B} │",
+                "└───────────────┘",
+                "Legend: ( )=Small spot, [ ]=Medium spot, { }=Big spot",
+                "        M=Motorcycle, C=Car, B=Bus",
+                "", ""]))
+
+    def test_render_window(self):
+        PL = ParkingLot(30, 20, 5, rng=1)
+        frame = PL.render_parking_lot(start=20, count=25)
+        self.assertIn("spots 20-44 of 55", frame.splitlines()[0])
+        # 20 spots in the first row, 5 in the second
+        self.assertEqual(frame.count("│"), 4)
+        cells = "".join(line for line in frame.splitlines() if line.startswith("│"))
+        self.assertEqual(cells.count(" ( )"), spot_sizes(PL)[20:45].count(1))
+        self.assertEqual(cells.count(" [ ]"), spot_sizes(PL)[20:45].count(2))
+
+    def test_same_cells_for_both_backends(self):
+        lots = [lot_class(30, 40, 30, rng=1) for lot_class in (ParkingLot, ArrayParkingLot)]
+        for PL in lots:
+            PL.park_many([Car() for i in range(50)] + [Bus() for i in range(20)] + [Motorcycle() for i in range(10)])
+            PL.unpark_spot(35)
+        self.assertEqual(lots[0].getSpotCells(10, 90), lots[1].getSpotCells(10, 90))
+
+
+class TestLotDisplay(unittest.TestCase):
+    def test_refresh_repaints_changed_cells(self):
+        # rng=1 starts the lot with medium, medium, medium, big
+        PL = ParkingLot(10, 20, 10, rng=1)
+        self.assertEqual(spot_sizes(PL)[:4], [2, 2, 2, 3])
+        out = io.StringIO()
+        display = LotDisplay(PL, out, rows=2, spots_per_row=2)
+        display.draw()
+        self.assertEqual(display.refresh(), 0)
+
+        out.truncate(0)
+        out.seek(0)
+        PL.park_new_vec(Car())      # spot 0: row 0, column 0
+        PL.park_new_vec(Bus())      # spot 3: row 1, column 1
+        self.assertEqual(display.refresh(), 2)
+        self.assertEqual(out.getvalue(), "\x1b7\x1b[3;2H [C]\x1b[6;6H {B}\x1b8")
+
+    def test_windows(self):
+        # rng=163 leaves the first 23 spots small
+        PL = ParkingLot(50, 0, 10, rng=163)
+        self.assertEqual(spot_sizes(PL).index(3), 23)
+        display = LotDisplay(PL, io.StringIO(), rows=2, spots_per_row=10)
+        self.assertEqual(display.getWindowSz(), 20)
+        display.page_down()
+        display.page_down()
+        self.assertEqual(display.getFirstSpot(), 40)
+        display.page_down()
+        self.assertEqual(display.getFirstSpot(), 40)
+
+        display.reveal(5)
+        self.assertEqual(display.getFirstSpot(), 0)
+        # a change outside the window is not painted
+        PL.park_new_vec(Bus())
+        self.assertEqual(display.refresh(), 0)
+        display.reveal(PL.getVehicleSpot(PL.getVehicleSet()[0]))
+        self.assertEqual(display.getFirstSpot(), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
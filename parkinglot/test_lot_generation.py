@@ -0,0 +1,81 @@
+import random
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from lot_generation import generate_spot_sizes, generate_fleet, random_fleet, shuffled_sizes
+
+
+def spot_sizes(PL):
+    return [spot.getSpotSize() for spot in PL.getAllSpots()]
+
+
+class TestLotGeneration(unittest.TestCase):
+    def test_exact_counts(self):
+        for counts in ([5, 10, 3], [0, 7, 0], [1000, 0, 1], [0, 0, 0]):
+            sizes = generate_spot_sizes(*counts, rng=1)
+            self.assertEqual(sizes.dtype, np.int8)
+            self.assertEqual(np.bincount(sizes, minlength=4)[1:].tolist(), counts)
+
+    def test_every_order_equally_likely(self):
+        rng = np.random.default_rng(0)
+        orders = Counter(tuple(shuffled_sizes([1, 1, 1], rng).tolist()) for n in range(6000))
+        self.assertEqual(len(orders), 6)
+        for count in orders.values():
+            self.assertAlmostEqual(count / 6000, 1 / 6, delta=0.03)
+        # every position sees each class in proportion to its count
+        positions = sum(shuffled_sizes([2, 5, 1], rng) == 2 for n in range(4000)) / 4000
+        np.testing.assert_allclose(positions, 5 / 8, atol=0.04)
+
+    def test_seeded_runs_repeat(self):
+        np.testing.assert_array_equal(generate_spot_sizes(50, 100, 30, rng=7), generate_spot_sizes(50, 100, 30, rng=7))
+        self.assertEqual(spot_sizes(ParkingLot(5, 10, 3, rng=7)), spot_sizes(ParkingLot(5, 10, 3, rng=7)))
+        self.assertEqual(spot_sizes(ArrayParkingLot(5, 10, 3, rng=7)), spot_sizes(ArrayParkingLot(5, 10, 3, rng=7)))
+        np.testing.assert_array_equal(generate_fleet(3, 8, 2, rng=7).getSizes(), generate_fleet(3, 8, 2, rng=7).getSizes())
+
+    def test_backends_share_layouts(self):
+        expected = generate_spot_sizes(20, 30, 10, rng=11).tolist()
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            self.assertEqual(spot_sizes(lot_class(20, 30, 10, rng=11)), expected)
+            self.assertEqual(spot_sizes(lot_class(20, 30, 10, rng=np.random.default_rng(11))), expected)
+        # a random.Random, or the global random state, works for both too
+        self.assertEqual(spot_sizes(ParkingLot(20, 30, 10, rng=random.Random(5))),
+                         spot_sizes(ArrayParkingLot(20, 30, 10, rng=random.Random(5))))
+        random.seed(5)
+        first = spot_sizes(ArrayParkingLot(20, 30, 10))
+        random.seed(5)
+        self.assertEqual(spot_sizes(ParkingLot(20, 30, 10)), first)
+
+    def test_fleet_creates_vehicles_lazily(self):
+        fleet = generate_fleet(30, 80, 20, rng=3)
+        self.assertEqual(len(fleet), 130)
+        self.assertEqual(fleet.getTypeCounts(), {'MOTORCYCLE': 30, 'CAR': 80, 'BUS': 20})
+        self.assertEqual(fleet.getMaterializedSz(), 0)
+
+        self.assertIs(fleet[5], fleet[5])
+        self.assertIs(fleet[-1], fleet[129])
+        self.assertEqual(fleet[5].getSize(), fleet.getSizes()[5])
+        self.assertEqual(len(fleet[10:20]), 10)
+        self.assertEqual(fleet.getMaterializedSz(), 12)
+        with self.assertRaises(IndexError):
+            fleet[130]
+
+        types = Counter(type(vehicle) for vehicle in fleet)
+        self.assertEqual(types, {Motorcycle: 30, Car: 80, Bus: 20})
+
+    def test_fleet_parks_and_leaves(self):
+        PL = ArrayParkingLot(20, 60, 20, rng=1)
+        fleet = random_fleet(100, rng=2)
+        spots = PL.park_many(fleet)
+        for vehicle, i in zip(fleet, spots):
+            self.assertEqual(PL.getVehicleSpot(vehicle), i)
+        for vehicle in fleet:
+            PL.unpark(vehicle)
+        self.assertEqual(PL.getOpenSpotsSz(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from concurrent_parking_lot import ConcurrentParkingLot
+from allocation_policies import FirstFit, NearestSpot, ReservedQuota
+from lot_layout import LotLayout, manhattan
+
+
+def nearest(PL, vehicle, distances):
+    """Reference answer: the open spot that fits with the smallest (distance, size, index)"""
+    candidates = [(distances[i], spot.getSpotSize(), i) for i, spot in enumerate(PL.getAllSpots())
+                  if spot.is_open() and spot.getSpotSize() >= vehicle.getSize()]
+    return min(candidates)[2] if candidates else -1
+
+
+class TestLotLayout(unittest.TestCase):
+    @staticmethod
+    def create_random_vehicles(vehicles_sz):
+        return [random.choice([Motorcycle, Car, Bus])() for i in range(vehicles_sz)]
+
+    def test_grid(self):
+        layout = LotLayout.grid(45, entrances=[(0, 0), (19, 2)], metric=manhattan)
+        self.assertEqual(layout.getSpotsSz(), 45)
+        self.assertEqual(layout.getEntrancesSz(), 2)
+        self.assertEqual(layout.getCoordinates(43), (3, 2))
+        self.assertEqual(layout.distances[0][43], 5)
+        self.assertEqual(layout.distances[1][43], 16)
+        with self.assertRaises(ValueError):
+            LotLayout.grid(10, entrances=[])
+
+    def test_nearest_spot_matches_scan(self):
+        for lot_class in (ParkingLot, ArrayParkingLot, ConcurrentParkingLot):
+            layout = LotLayout([(random.random(), random.random()) for i in range(60)],
+                               entrances=[(0, 0), (1, 1), (0.5, 0)])
+            PL = lot_class(15, 30, 15, layout=layout)
+            for step in range(800):
+                if PL.getVehicleSet() and random.random() < 0.4:
+                    PL.unpark(random.choice(PL.getVehicleSet()))
+                    continue
+                vehicle = self.create_random_vehicles(1)[0]
+                entrance = random.randrange(3)
+                expected = nearest(PL, vehicle, layout.distances[entrance])
+                self.assertEqual(PL._park(vehicle, NearestSpot(entrance)), expected)
+            self.assertEqual(sum(PL.getOpenSpotsBySize().values()),
+                             sum(1 for spot in PL.getAllSpots() if spot.is_open()))
+
+    def test_other_policies_keep_working(self):
+        # first fit and batches still take the lowest open spots of a layout lot
+        PL = ParkingLot(10, 10, 10, layout=LotLayout.grid(30))
+        PL.setPolicy(NearestSpot())
+        PL.park_many(self.create_random_vehicles(12), policy=NearestSpot())
+        vehicle = Motorcycle()
+        open_spots = [i for i, spot in enumerate(PL.getAllSpots()) if spot.is_open()]
+        self.assertEqual(PL._park(vehicle, FirstFit()), open_spots[0])
+        vec_set = [Motorcycle() for n in range(5)]
+        spots = PL.park_many(vec_set, policy='best_fit')
+        self.assertNotIn(-1, spots)
+        for vehicle in PL.getVehicleSet()[:]:
+            PL.unpark(vehicle)
+        self.assertEqual(PL.getOpenSpotsSz(), 30)
+
+    def test_park_many_array_lot(self):
+        PL = ArrayParkingLot(5, 5, 5, rng=1, layout=LotLayout.grid(15))
+        self.assertNotIn(-1, PL.park_many([Car(), Bus()]))
+        vec_set = self.create_random_vehicles(12)
+        for policy in ('optimal', 'best_fit'):
+            spots = PL.park_many(vec_set, policy=policy)
+            for vehicle, i in zip(vec_set, spots):
+                self.assertEqual(PL.getVehicleSpot(vehicle), i)
+                if i >= 0:
+                    self.assertGreaterEqual(PL.getAllSpots()[i].getSpotSize(), vehicle.getSize())
+                    PL.unpark(vehicle)
+            self.assertEqual(PL.getOpenSpotsSz(), 13)
+
+    def test_wrapped_in_a_quota(self):
+        # the quota decides the class, the nearest spot of that class is taken
+        PL = ParkingLot(0, 5, 5, layout=LotLayout.grid(10))
+        PL.setPolicy(ReservedQuota({3: 5}, NearestSpot()))
+        distances = PL.getLayout().distances[0]
+        for n in range(5):
+            i = PL._park(Car())
+            open_med = [j for j, spot in enumerate(PL.getAllSpots()) if spot.getSpotSize() == 2 and spot.is_open()]
+            self.assertEqual(PL.getAllSpots()[i].getSpotSize(), 2)
+            self.assertTrue(all(distances[i] <= distances[j] for j in open_med))
+        self.assertEqual(PL._park(Car()), -1)
+
+    def test_layout_must_match_the_lot(self):
+        with self.assertRaises(ValueError):
+            ParkingLot(2, 2, 2, layout=LotLayout.grid(5))
+        PL = ParkingLot(2, 2, 2)
+        PL.park_many([Motorcycle(), Car(), Bus()])
+        PL.setLayout(LotLayout.grid(6, entrances=[(5, 0)]))
+        self.assertEqual(PL.getOpenSpotsSz(), 3)
+        expected = nearest(PL, Motorcycle(), PL.getLayout().distances[0])
+        self.assertEqual(PL._park(Motorcycle(), NearestSpot()), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from monte_carlo import run_monte_carlo, simulate_once, summarize
+
+
+class TestMonteCarlo(unittest.TestCase):
+    config = (5, 10, 3, 3, 8, 2)
+
+    def test_reproducible_by_seed(self):
+        in_process = run_monte_carlo(self.config, runs=40, seed=3, workers=1)
+        pooled = run_monte_carlo(self.config, runs=40, seed=3, workers=2)
+        self.assertTrue(in_process.equals(pooled))
+        self.assertFalse(in_process.equals(run_monte_carlo(self.config, runs=40, seed=4, workers=1)))
+
+    def test_simulate_once(self):
+        run = simulate_once((0, 0, 2, 1, 1, 1), seed=1, policy='optimal')
+        self.assertEqual(run["parked"], 2)
+        self.assertEqual(run["failed"], 1)
+        self.assertEqual(run["big_utilization"], 1.0)
+
+    def test_summarize(self):
+        summary = summarize(run_monte_carlo(self.config, runs=50, seed=0, workers=1))
+        self.assertEqual(list(summary.index), ["efficiency", "small_utilization", "med_utilization", "big_utilization"])
+        self.assertTrue((summary["p5"] <= summary["p50"]).all())
+        self.assertTrue((summary["p50"] <= summary["p95"]).all())
+        self.assertTrue(((summary["mean"] >= 0) & (summary["mean"] <= 1)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
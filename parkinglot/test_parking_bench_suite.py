@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+from parking_bench_suite import run_suite, compare, load_baseline, DEFAULT_TOLERANCE
+
+
+class TestBenchSuite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.suite = run_suite(quick=True)
+
+    def test_results(self):
+        results = self.suite["results"]
+        self.assertIn("arrival/10000/fill_90%", results)
+        self.assertIn("render/refresh/1000", results)
+        for name, result in results.items():
+            self.assertGreater(result["value"], 0, name)
+            self.assertIn(result["unit"], ("s", "bytes"))
+        json.dumps(self.suite)
+
+    def test_compare(self):
+        baseline = json.loads(json.dumps(self.suite))
+        baseline["results"]["render/full/1000"]["value"] /= 2
+        rows, regressions = compare(self.suite, baseline, tolerance=0.5)
+        self.assertEqual(len(rows), len(self.suite["results"]))
+        self.assertEqual(regressions, ["render/full/1000"])
+
+    def test_first_run_saves_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench_baseline.json")
+            self.assertIsNone(load_baseline(path, self.suite))
+            self.assertEqual(load_baseline(path, {}), json.loads(json.dumps(self.suite)))
+
+    # set PARKING_BENCH_BASELINE to a baseline written with
+    # `python parking_bench_suite.py --quick --save-baseline <path>` to fail on regressions
+    @unittest.skipUnless(os.environ.get("PARKING_BENCH_BASELINE"), "no baseline to compare with")
+    def test_no_regressions(self):
+        with open(os.environ["PARKING_BENCH_BASELINE"]) as f:
+            baseline = json.load(f)
+        tolerance = float(os.environ.get("PARKING_BENCH_TOLERANCE", DEFAULT_TOLERANCE))
+        rows, regressions = compare(self.suite, baseline, tolerance)
+        self.assertEqual(regressions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
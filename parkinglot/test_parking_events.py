@@ -0,0 +1,70 @@
+import contextlib
+import io
+import json
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from parking_events import CounterSink, LogSink, NullSink, PrintSink
+
+
+class TestParkingEvents(unittest.TestCase):
+    @staticmethod
+    def create_lot():
+        # rng=15 lays the spots out small, small, medium, big
+        return ParkingLot(2, 1, 1, rng=15)
+
+    def test_lot_layout(self):
+        self.assertEqual([spot.getSpotSize() for spot in self.create_lot().getAllSpots()], [1, 1, 2, 3])
+
+    def test_quiet_by_default(self):
+        PL = self.create_lot()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            PL.park_new_vec(Bus())
+            PL.setEventSink(NullSink())
+            PL.park_new_vec(Car())
+        self.assertEqual(out.getvalue(), "")
+        self.assertIsNone(PL.getEventSink())
+
+    def test_counter_sink(self):
+        PL = self.create_lot()
+        sink = CounterSink(spot_events=True)
+        PL.setEventSink(sink)
+        for vehicle in [Bus(), Bus(), Car(), Motorcycle()]:
+            PL.park_new_vec(vehicle)
+        PL.unpark_spot(3)
+
+        self.assertEqual(sink.counts['parked', 'BUS'], 1)
+        self.assertEqual(sink.counts['rejected', 'BUS'], 1)
+        self.assertEqual(sink.counts['unparked', 'BUS'], 1)
+        self.assertEqual(sink.total('parked'), 3)
+        # first bus: 2 small + 1 medium, second bus: same three, car: 2 small
+        self.assertEqual(sink.total('spot_too_small'), 8)
+
+    def test_log_sink(self):
+        PL = self.create_lot()
+        stream = io.StringIO()
+        sink = LogSink(stream, buffer_size=2)
+        PL.setEventSink(sink)
+        PL.park_many([Car(), Bus(), Bus()])
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+        sink.close()
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([record["event"] for record in records], ["parked", "parked", "rejected"])
+        self.assertEqual(records[1], {"event": "parked", "vehicle": "BUS", "spot": 3, "spot_size": 3})
+
+    def test_print_sink(self):
+        PL = self.create_lot()
+        PL.setEventSink(PrintSink())
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            PL.park_new_vec(Car())
+        self.assertEqual(out.getvalue().splitlines(), [
+            "🚗 CAR trying to park...",
+            "   Spot 0 (size 1) too small for CAR",
+            "   Spot 1 (size 1) too small for CAR",
+            "✅ CAR parked in spot 2 (size 2)",
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import random
+import unittest
+
+import numpy as np
+
+from ParkingLot import Motorcycle, Car, Bus
+from parking_fleet import ParkingLotFleet, split_count
+
+
+class TestParkingLotFleet(unittest.TestCase):
+    def test_park_and_unpark(self):
+        with ParkingLotFleet([(5, 10, 5), (0, 10, 10), (10, 0, 0)]) as fleet:
+            self.assertEqual(fleet.getShardCount(), 3)
+            self.assertEqual(fleet.getTotalSpotsSz(), 50)
+            self.assertEqual(fleet.getOpenSpotsBySize(), {1: 15, 2: 20, 3: 15})
+
+            vehicles = [random.choice([Motorcycle, Car, Bus])() for i in range(60)]
+            handles = fleet.park_many(vehicles)
+            parked = [vehicle for vehicle, handle in zip(vehicles, handles) if handle is not None]
+            self.assertEqual(len(set(h for h in handles if h is not None)), len(parked))
+            self.assertEqual(fleet.getOpenSpotsSz(), 50 - len(parked))
+
+            shard_sizes = [fleet.getShardSpotSizes(shard) for shard in range(3)]
+            for vehicle, handle in zip(vehicles, handles):
+                if handle is not None:
+                    self.assertLessEqual(vehicle.getSize(), shard_sizes[handle[0]][handle[1]])
+
+            self.assertEqual(fleet.unpark_many(parked[::2]), len(parked[::2]))
+            self.assertFalse(fleet.unpark(parked[0]))
+            self.assertEqual(fleet.getOpenSpotsSz(), 50 - len(parked[1::2]))
+
+    def test_routes_to_shard_with_room(self):
+        with ParkingLotFleet([(10, 0, 0), (0, 0, 1)]) as fleet:
+            self.assertEqual(fleet.park(Bus()), (1, 0))
+            self.assertIsNone(fleet.park(Bus()))
+            self.assertEqual(fleet.park_many([Car(), Motorcycle()])[1][0], 0)
+            self.assertAlmostEqual(fleet.getUtilization(), 2 / 11)
+
+
+    def test_split_count(self):
+        room = np.array([10, 0, 30, 5])
+        self.assertEqual(split_count(9, room).tolist(), [2, 0, 6, 1])
+        self.assertEqual(split_count(100, room).tolist(), room.tolist())
+        for count in range(46):
+            shares = split_count(count, room)
+            self.assertEqual(shares.sum(), min(count, 45))
+            self.assertTrue((shares <= room).all())
+
+    def test_route_in_bulk(self):
+        # buses are routed first and take the big spots (one bus is left over),
+        # the cars only find the two medium spots
+        free = np.array([[0, 2, 1], [4, 0, 3]])
+        sizes = np.array([2, 3, 2, 1, 3, 2, 2, 2, 3, 3, 3])
+        routed = ParkingLotFleet._route(sizes, free)
+        self.assertEqual(routed.tolist(), [0, 0, 0, 1, 1, -1, -1, -1, 1, 1, -1])
+        self.assertEqual(free.tolist(), [[0, 0, 0], [3, 0, 0]])
+
+    def test_big_wave(self):
+        with ParkingLotFleet([(200, 600, 200)] * 3) as fleet:
+            vehicles = [random.choice([Motorcycle, Car, Bus])() for i in range(2500)]
+            handles = fleet.park_many(vehicles)
+            parked = [handle for handle in handles if handle is not None]
+            self.assertEqual(len(set(parked)), len(parked))
+            self.assertEqual(fleet.getOpenSpotsSz(), 3000 - len(parked))
+            self.assertEqual(fleet.unpark_many(vehicles), len(parked))
+            self.assertEqual(fleet.getOpenSpotsSz(), 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import random
+import tempfile
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from parking_journal import ParkingJournal, JournalError, read_journal, replay
+
+
+class TestParkingJournal(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self._tmp.name, "lot.snapshot")
+        self.journal = os.path.join(self._tmp.name, "lot.journal")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @staticmethod
+    def churn(PL, steps, rng):
+        parked = list(PL.getVehicleSet())
+        for step in range(steps):
+            if parked and rng.random() < 0.4:
+                PL.unpark(parked.pop(rng.randrange(len(parked))))
+            elif rng.random() < 0.2:
+                wave = [rng.choice([Motorcycle, Car, Bus])() for i in range(rng.randint(1, 6))]
+                parked += [vehicle for vehicle, i in zip(wave, PL.park_many(wave)) if i >= 0]
+            else:
+                vehicle = rng.choice([Motorcycle, Car, Bus])()
+                if PL._park(vehicle) >= 0:
+                    parked.append(vehicle)
+
+    def test_replay(self):
+        rng = random.Random(3)
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            for replay_class in (ParkingLot, ArrayParkingLot):
+                PL = lot_class(15, 15, 15)
+                self.churn(PL, 50, rng)
+                PL.save(self.snapshot)
+                with ParkingJournal(self.journal, group_size=7, fsync_every=0) as journal:
+                    PL.setJournal(journal)
+                    self.churn(PL, 400, rng)
+                PL.setJournal(None)
+                restored = replay(self.snapshot, self.journal, replay_class)
+
+                self.assertEqual(restored.getSpotCells(), PL.getSpotCells())
+                self.assertEqual(restored.getParkedByType(), PL.getParkedByType())
+                self.assertEqual(restored.getOpenSpotsBySize(), PL.getOpenSpotsBySize())
+                for vehicle in [rng.choice([Motorcycle, Car, Bus])() for i in range(20)]:
+                    self.assertEqual(restored._park(vehicle), PL._park(vehicle))
+                os.remove(self.journal)
+
+    def test_group_commit(self):
+        PL = ParkingLot(0, 100, 0)
+        journal = ParkingJournal(self.journal, group_size=10)
+        PL.setJournal(journal)
+        for i in range(25):
+            PL._park(Car())
+        # two full groups are on disk, the rest waits for the next group or commit()
+        self.assertEqual(len(read_journal(self.journal)), 20)
+        journal.commit()
+        self.assertEqual(len(read_journal(self.journal)), 25)
+        PL.park_many([Car() for i in range(5)])
+        journal.close()
+        records = read_journal(self.journal)
+        self.assertEqual(records["spot"].tolist(), sorted(PL.getVehicleSpot(vehicle) for vehicle in PL.getVehicleSet()))
+
+    def test_checkpoint_and_torn_record(self):
+        PL = ArrayParkingLot(10, 10, 10)
+        PL.save(self.snapshot)
+        journal = ParkingJournal(self.journal, group_size=1)
+        PL.setJournal(journal)
+        PL.park_many([Car() for i in range(5)])
+        journal.checkpoint(PL, self.snapshot)
+        self.assertEqual(len(read_journal(self.journal)), 0)
+        PL._park(Bus())
+        journal.close()
+
+        # a crash in the middle of a write leaves part of a record behind
+        with open(self.journal, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        restored = replay(self.snapshot, self.journal, ArrayParkingLot)
+        self.assertEqual(restored.getParkedByType(), {'CAR': 5, 'BUS': 1})
+
+        with open(self.journal, "wb") as f:
+            f.write(b"not a journal at all")
+        with self.assertRaises(JournalError):
+            read_journal(self.journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
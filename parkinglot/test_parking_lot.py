@@ -0,0 +1,247 @@
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from ParkingLot import ParkingLot, Vehicle, Motorcycle, Car, Bus
+from allocation_policies import BestFit
+from array_parking_lot import ArrayParkingLot
+from parking_snapshot import SnapshotError
+
+
+def first_fit_scan(spots, vehicle):
+    """Reference answer: the original linear first-fit scan over the lot"""
+    for i, spot in enumerate(spots):
+        if spot.is_open() and vehicle.getWheelNum() / 2 <= spot.getSpotSize():
+            return i
+    return -1
+
+
+def max_matching(spots, vehicles):
+    """Reference answer: size of a maximum vehicle-to-spot matching (Kuhn's algorithm)"""
+    owner = {}
+
+    def try_park(v, seen):
+        for i, spot in enumerate(spots):
+            if i not in seen and vehicles[v].getWheelNum() / 2 <= spot.getSpotSize():
+                seen.add(i)
+                if i not in owner or try_park(owner[i], seen):
+                    owner[i] = v
+                    return True
+        return False
+
+    return sum(try_park(v, set()) for v in range(len(vehicles)))
+
+
+class TestParkingLot(unittest.TestCase):
+    @staticmethod
+    def create_random_vehicles(vehicles_sz=200):
+        return [random.choice([Motorcycle, Car, Bus])() for i in range(vehicles_sz)]
+
+    def test_matches_first_fit_scan(self):
+        for trial in range(20):
+            PL = ParkingLot(random.randint(0, 30), random.randint(0, 30), random.randint(0, 30))
+            for vehicle in self.create_random_vehicles(100):
+                expected = first_fit_scan(PL.getAllSpots(), vehicle)
+                self.assertEqual(PL._park(vehicle), expected)
+                if expected >= 0:
+                    self.assertIs(PL.getAllSpots()[expected].getParkedVec(), vehicle)
+
+    def test_unpark_churn(self):
+        PL = ParkingLot(20, 20, 20)
+        parked = []
+        for step in range(2000):
+            if parked and random.random() < 0.5:
+                vehicle = parked.pop(random.randrange(len(parked)))
+                i = PL.getVehicleSpot(vehicle)
+                self.assertTrue(PL.unpark(vehicle))
+                self.assertTrue(PL.getAllSpots()[i].is_open())
+                self.assertFalse(PL.unpark(vehicle))
+            else:
+                vehicle = self.create_random_vehicles(1)[0]
+                expected = first_fit_scan(PL.getAllSpots(), vehicle)
+                self.assertEqual(PL._park(vehicle), expected)
+                if expected >= 0:
+                    parked.append(vehicle)
+            open_spots = sum(1 for spot in PL.getAllSpots() if spot.is_open())
+            self.assertEqual(PL.getOpenSpotsSz(), open_spots)
+            self.assertEqual(len(PL.getVehicleSet()), len(parked))
+
+    def test_unpark_spot(self):
+        PL = ParkingLot(0, 0, 2)
+        bus = Bus()
+        i = PL._park(bus)
+        self.assertIs(PL.unpark_spot(i), bus)
+        self.assertIsNone(PL.unpark_spot(i))
+        self.assertEqual(PL.getVehicleSpot(bus), -1)
+        self.assertEqual(PL.getOpenSpotsSz(), 2)
+
+    def test_unpark_spot_out_of_range(self):
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            PL = lot_class(0, 0, 2)
+            i = PL._park(Bus())
+            for j in (-1, -2, 2):
+                with self.assertRaises(IndexError):
+                    PL.unpark_spot(j)
+            # the free spot heap is intact - the open spot is handed out once
+            self.assertEqual(PL.getParkedSz(), 1)
+            self.assertEqual(PL._park(Bus()), 1 - i)
+            self.assertEqual(PL._park(Bus()), -1)
+
+    def test_park_many_optimal(self):
+        for trial in range(200):
+            PL = ParkingLot(random.randint(0, 4), random.randint(0, 4), random.randint(0, 4))
+            vehicles = self.create_random_vehicles(random.randint(0, 12))
+            expected = max_matching(PL.getAllSpots(), vehicles)
+
+            spots = PL.park_many(vehicles)
+            self.assertEqual(sum(1 for i in spots if i >= 0), expected)
+            for vehicle, i in zip(vehicles, spots):
+                if i >= 0:
+                    self.assertIs(PL.getAllSpots()[i].getParkedVec(), vehicle)
+                    self.assertEqual(PL.getVehicleSpot(vehicle), i)
+            self.assertEqual(len(set(i for i in spots if i >= 0)), expected)
+            self.assertEqual(PL.getOpenSpotsSz(), PL.getTotalSpotsSz() - expected)
+
+    def test_park_many_policies(self):
+        vehicles = [Car(), Bus()]
+        self.assertEqual(ParkingLot(0, 0, 1).park_many(vehicles, policy='best_fit'), [0, -1])
+        self.assertEqual(ParkingLot(0, 0, 1).park_many(vehicles, policy='first_fit'), [0, -1])
+        self.assertEqual(ParkingLot(0, 0, 1).park_many(vehicles), [-1, 0])
+
+        PL = ParkingLot(2, 2, 2)
+        spots = PL.park_many([Motorcycle(), Car(), Motorcycle(), Car(), Car()], policy='best_fit')
+        self.assertEqual([PL.getAllSpots()[i].getSpotSize() for i in spots], [1, 2, 1, 2, 3])
+        with self.assertRaises(ValueError):
+            PL.park_many(vehicles, policy='random')
+
+    def test_park_many_other_vehicles(self):
+        # vehicles of no Motorcycle / Car / Bus class are grouped by their own size and type
+        for policy in ('optimal', 'best_fit'):
+            PL = ParkingLot(1, 2, 2, rng=5)
+            wave = [Vehicle(4, 'VAN'), Car(), Vehicle(8, 'TRUCK'), Bus(), Vehicle(2, 'SCOOTER'), Vehicle(4, 'VAN')]
+            spots = PL.park_many(wave, policy=policy)
+            self.assertEqual(spots[2], -1)
+            self.assertEqual(PL.getParkedByType(), {'VAN': 2, 'CAR': 1, 'BUS': 1, 'SCOOTER': 1})
+            if policy == 'best_fit':
+                reference = ParkingLot(1, 2, 2, rng=5)
+                self.assertEqual(spots, reference.park_many(wave, policy=BestFit()))
+
+    def test_occupancy_counters(self):
+        PL = ParkingLot(10, 10, 10)
+        parked = []
+        for step in range(500):
+            if parked and random.random() < 0.4:
+                PL.unpark(parked.pop(random.randrange(len(parked))))
+            elif random.random() < 0.5:
+                wave = self.create_random_vehicles(random.randint(1, 5))
+                parked += [vehicle for vehicle, i in zip(wave, PL.park_many(wave)) if i >= 0]
+            else:
+                vehicle = self.create_random_vehicles(1)[0]
+                if PL._park(vehicle) >= 0:
+                    parked.append(vehicle)
+
+            spots = PL.getAllSpots()
+            for spot_size in (1, 2, 3):
+                occupied = sum(1 for spot in spots if spot.getSpotSize() == spot_size and not spot.is_open())
+                self.assertEqual(PL.getOccupiedSpotsBySize()[spot_size], occupied)
+                self.assertEqual(PL.getUtilization(spot_size), occupied / 10)
+            by_type = {}
+            for vehicle in parked:
+                by_type[vehicle.getType()] = by_type.get(vehicle.getType(), 0) + 1
+            self.assertEqual(PL.getParkedByType(), by_type)
+            self.assertEqual(PL.getParkedSz(), len(parked))
+            self.assertEqual(PL.getRoomFor(Bus()), sum(1 for spot in spots if spot.getSpotSize() == 3 and spot.is_open()))
+            self.assertEqual(PL.getRoomFor(Motorcycle()), PL.getOpenSpotsSz())
+
+    def test_park_parked_vehicle(self):
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            PL = lot_class(0, 4, 0)
+            car = Car()
+            i = PL._park(car)
+            self.assertEqual(PL._park(car), -1)
+            for policy in ('optimal', 'best_fit', 'first_fit'):
+                self.assertEqual(PL.park_many([car], policy=policy), [-1])
+            # listed twice in one wave - only the first gets a spot
+            for policy in ('optimal', 'best_fit', 'first_fit'):
+                twice = Car()
+                spots = PL.park_many([twice, Motorcycle(), twice], policy=policy)
+                self.assertEqual(spots[2], -1)
+                self.assertEqual(PL.getVehicleSpot(twice), spots[0])
+                PL.unpark(twice)
+                PL.unpark_spot(spots[1])
+            self.assertEqual(PL.getParkedByType(), {"CAR": 1})
+            self.assertEqual((PL.getParkedSz(), PL.getOpenSpotsSz()), (1, 3))
+            self.assertIs(PL.unpark_spot(i), car)
+            self.assertEqual((PL.getParkedByType(), PL.getOpenSpotsSz()), ({}, 4))
+
+    def test_save_load(self):
+        PL = ParkingLot(7, 9, 5)
+        vehicles = self.create_random_vehicles(15)
+        PL.park_many(vehicles)
+        PL.unpark(vehicles[0])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lot.snapshot")
+            PL.save(path)
+            restored = ParkingLot.load(path)
+
+            with open(path, "r+b") as f:
+                f.write(b"NOTALOT!")
+            with self.assertRaises(SnapshotError):
+                ParkingLot.load(path)
+
+        self.assertEqual(restored.getSpotCells(), PL.getSpotCells())
+        self.assertEqual(restored.getParkedByType(), PL.getParkedByType())
+        self.assertEqual(restored.getOpenSpotsBySize(), PL.getOpenSpotsBySize())
+        for i, spot in enumerate(restored.getAllSpots()):
+            if not spot.is_open():
+                self.assertEqual(restored.getVehicleSpot(spot.getParkedVec()), i)
+        # the restored lot keeps working like the original
+        for vehicle in self.create_random_vehicles(10):
+            self.assertEqual(restored._park(vehicle), PL._park(vehicle))
+
+    def test_save_vehicle_ids(self):
+        vehicles = [Bus(), Car(), Motorcycle(), Car()]
+        ids = {vehicles[0]: 40, vehicles[2]: 7}
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            PL = lot_class(2, 2, 1, rng=3)
+            spots = PL.park_many(vehicles)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "lot.snapshot")
+                PL.save(path, ids)
+                for load_class in (ParkingLot, ArrayParkingLot):
+                    restored = {}
+                    lot = load_class.load(path, restored)
+                    # unnumbered vehicles get the ids after the largest one
+                    self.assertEqual(sorted(restored), [7, 40, 41, 42])
+                    self.assertEqual(lot.getVehicleSpot(restored[40]), spots[0])
+                    self.assertEqual(lot.getVehicleSpot(restored[7]), spots[2])
+                    self.assertEqual([vehicle.getType() for vehicle_id, vehicle in sorted(restored.items())],
+                                     ["MOTORCYCLE", "BUS", "CAR", "CAR"])
+                    lot.unpark(restored[40])
+                    self.assertEqual(lot.getParkedSz(), 3)
+
+    def test_import_from_repo_root(self):
+        # the package directory is not on sys.path there
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", "import parkinglot.ParkingLot"], cwd=root,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_park_new_vec(self):
+        PL = ParkingLot(1, 0, 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(PL.park_new_vec(Bus()))
+            self.assertFalse(PL.park_new_vec(Car()))
+            self.assertTrue(PL.park_new_vec(Motorcycle()))
+            self.assertFalse(PL.park_new_vec(Motorcycle()))
+        self.assertEqual(PL.getOpenSpotsSz(), 0)
+        self.assertFalse(PL.is_park_open())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import random
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from array_parking_lot import ArrayParkingLot
+from parking_reservations import IntervalCounter, ReservationBook, ReservationPolicy
+
+
+class Clock:
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestIntervalCounter(unittest.TestCase):
+    def test_matches_brute_force(self):
+        span = 200
+        index = IntervalCounter(span)
+        counts = [0] * span
+        intervals = []
+        for step in range(500):
+            if intervals and random.random() < 0.3:
+                start, end = intervals.pop(random.randrange(len(intervals)))
+                index.add(start, end, -1)
+                value = -1
+            else:
+                start = random.randrange(span)
+                end = random.randint(start + 1, span)
+                intervals.append((start, end))
+                index.add(start, end)
+                value = 1
+            for t in range(start, end):
+                counts[t] += value
+            a = random.randrange(span)
+            b = random.randint(a + 1, span)
+            self.assertEqual(index.max(a, b), max(counts[a:b]))
+            self.assertEqual(index.at(a), counts[a])
+
+    def test_rejects_intervals_outside_the_span(self):
+        index = IntervalCounter(100)
+        for start, end in ((-1, 5), (5, 5), (90, 101)):
+            with self.assertRaises(ValueError):
+                index.add(start, end)
+
+
+class TestReservationBook(unittest.TestCase):
+    def test_capacity_per_window(self):
+        PL = ParkingLot(0, 0, 3)
+        book = ReservationBook(PL, Clock(0))
+        self.assertEqual(book.getAvailable(3, 100, 200), 3)
+        bookings = [book.reserve(3, 100, 200) for n in range(3)]
+        self.assertNotIn(-1, bookings)
+        self.assertEqual(book.reserve(3, 150, 160), -1)
+        # windows that only touch the booked one are free
+        self.assertEqual(book.getAvailable(3, 200, 300), 3)
+        self.assertNotEqual(book.reserve(3, 50, 100), -1)
+        self.assertTrue(book.cancel(bookings[0]))
+        self.assertFalse(book.cancel(bookings[0]))
+        self.assertEqual(book.getAvailable(3, 0, 1000), 1)
+        # no such size class, or a window already over
+        self.assertEqual(book.reserve(1, 100, 200), -1)
+        book = ReservationBook(PL, Clock(500))
+        self.assertEqual(book.reserve(3, 100, 200), -1)
+
+    def test_matches_brute_force(self):
+        PL = ParkingLot(3, 4, 2)
+        book = ReservationBook(PL, Clock(0), span=100)
+        live = {}
+        for step in range(400):
+            spot_size = random.randint(1, 3)
+            if live and random.random() < 0.3:
+                booking = random.choice(list(live))
+                self.assertTrue(book.cancel(booking))
+                del live[booking]
+                continue
+            start = random.randrange(1, 100)
+            end = random.randint(start + 1, 100)
+            busiest = max(sum(1 for size, a, b in live.values() if size == spot_size and a <= t < b)
+                          for t in range(start, end))
+            expected = PL.getSpotsBySize()[spot_size] - busiest
+            self.assertEqual(book.getAvailable(spot_size, start, end), expected)
+            booking = book.reserve(spot_size, start, end)
+            self.assertEqual(booking >= 0, expected > 0)
+            if booking >= 0:
+                live[booking] = (spot_size, start, end)
+        self.assertEqual(book.getReservationsSz(), len(live))
+
+    def test_walk_ins_leave_reserved_spots_open(self):
+        for lot_class in (ParkingLot, ArrayParkingLot):
+            clock = Clock(0)
+            PL = lot_class(0, 2, 2)
+            book = ReservationBook(PL, clock)
+            PL.setPolicy(ReservationPolicy(book))
+            bus = book.reserve(3, 10, 20)
+            car = book.reserve(2, 10, 20)
+
+            # before the reservations start everything is open to walk-ins
+            self.assertEqual(book.getAvailable(3, 0, 5), 2)
+            clock.now = 10
+            # now one car spot and one big spot are held
+            self.assertTrue(PL.park_new_vec(Car()))
+            self.assertTrue(PL.park_new_vec(Car()))
+            self.assertFalse(PL.park_new_vec(Car()))
+            self.assertFalse(PL.park_new_vec(Bus()))
+            self.assertEqual(book.getAvailable(3, 10, 11), 0)
+
+            # the reserved vehicles park in their held spots
+            self.assertGreaterEqual(book.claim(bus, Bus()), 0)
+            self.assertGreaterEqual(book.claim(car, Car()), 0)
+            self.assertEqual(book.claim(car, Car()), -1)
+            self.assertEqual(PL.getOpenSpotsBySize(), {2: 0, 3: 0})
+            self.assertEqual(book.getUnclaimedAt(3, 10), 0)
+
+            # once the window is over the held spots are open to walk-ins again
+            clock.now = 20
+            vehicle = PL.getVehicleSet()[0]
+            PL.unpark(vehicle)
+            self.assertTrue(PL.park_new_vec(Motorcycle()))
+
+    def test_claim_outside_the_window(self):
+        clock = Clock(0)
+        PL = ParkingLot(1, 1, 1)
+        book = ReservationBook(PL, clock)
+        booking = book.reserve(2, 10, 20)
+        self.assertEqual(book.claim(booking, Car()), -1)
+        clock.now = 12
+        self.assertEqual(book.claim(booking, Bus()), -1)
+        i = book.claim(booking, Car())
+        self.assertEqual(PL.getAllSpots()[i].getSpotSize(), 2)
+        clock.now = 20
+        self.assertEqual(book.claim(book.reserve(1, 0, 20), Motorcycle()), -1)
+
+    def test_many_reservations(self):
+        PL = ArrayParkingLot(0, 0, 1_000)
+        book = ReservationBook(PL, Clock(0))
+        rng = random.Random(3)
+        for n in range(20_000):
+            start = rng.randrange(1, 500_000)
+            book.reserve(3, start, start + rng.randint(30, 600))
+        self.assertGreater(book.getReservationsSz(), 19_000)
+        self.assertLessEqual(book._reserved[3].max(0, 1 << 24), 1_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
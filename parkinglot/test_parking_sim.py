@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from ParkingLot import ParkingLot, Motorcycle, Car, Bus
+from parking_sim import ParkingSimulation, PoissonArrivals, TraceArrivals, ExponentialDwell, FixedDwell
+
+
+class TestParkingSimulation(unittest.TestCase):
+    def test_fifo_queue(self):
+        # one big spot, everybody stays 5 time units, one vehicle may wait
+        PL = ParkingLot(0, 0, 1)
+        trace = [(0, Bus()), (1, Car()), (2, Motorcycle()), (3, Car(), 1.0)]
+        report = ParkingSimulation(PL, TraceArrivals(trace), FixedDwell(5), queue_size=1).run()
+
+        self.assertEqual(report.arrived, 4)
+        self.assertEqual(report.rejected, 2)
+        self.assertEqual(list(report.wait_times), [0.0, 4.0])
+        self.assertEqual(report.departed, 2)
+        self.assertEqual(PL.getOpenSpotsSz(), 1)
+        self.assertEqual(report.rejection_rate(), 0.5)
+        self.assertEqual(report.rejection_rate(0, 2), 0.0)
+        self.assertEqual(list(report.occupied[:6]), [1, 1, 1, 1, 1, 1])
+        self.assertEqual(list(report.queue_lengths[:6]), [0, 1, 1, 1, 1, 0])
+
+    def test_max_wait(self):
+        PL = ParkingLot(0, 1, 0)
+        trace = [(0, Car()), (1, Car()), (2, Car())]
+        report = ParkingSimulation(PL, TraceArrivals(trace), FixedDwell(10), queue_size=5, max_wait=3).run()
+
+        self.assertEqual(report.abandoned, 2)
+        self.assertEqual(report.rejected, 0)
+        self.assertEqual(report.still_waiting, 0)
+        self.assertEqual(list(report.wait_times), [0.0])
+
+    def test_abandon_unblocks_queue(self):
+        # the waiting bus blocks the car behind it until it gives up at t=4
+        PL = ParkingLot(0, 1, 1)
+        trace = [(0, Bus(), 100), (1, Bus(), 100), (2, Car(), 100)]
+        report = ParkingSimulation(PL, TraceArrivals(trace), FixedDwell(10), queue_size=5, max_wait=3).run()
+
+        self.assertEqual(report.abandoned, 1)
+        self.assertEqual(list(report.wait_times), [0.0, 2.0])
+        self.assertEqual(report.still_waiting, 0)
+        self.assertEqual(report.departed, 2)
+
+    def test_poisson_run_is_reproducible(self):
+        def run():
+            # the lot layout is shuffled with the global random generator
+            random.seed(7)
+            PL = ParkingLot(20, 60, 20)
+            sim = ParkingSimulation(PL, PoissonArrivals(rate=2.0, seed=7), ExponentialDwell(60),
+                                    queue_size=10, max_wait=15, seed=7)
+            return sim.run(until=24 * 60)
+
+        first, second = run(), run()
+        self.assertEqual(first.summary(), second.summary())
+        summary = first.summary()
+        self.assertEqual(summary["arrived"],
+                         summary["parked"] + summary["rejected"] + summary["abandoned"] + summary["still_waiting"])
+        self.assertLessEqual(max(first.occupied), 100)
+        self.assertEqual(len(first.sample_times), 24 * 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from ParkingLot import ParkingLot, VEHICLE_BY_SIZE
+from array_parking_lot import ArrayParkingLot
+from parking_trace import (TRACE_DTYPE, ARRIVAL, DEPARTURE, TraceReplay, generate_trace, read_trace,
+                           replay_trace, write_trace)
+
+
+class TestParkingTrace(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.trace = generate_trace(3000, rate=2.0, mean_stay=30.0, seed=5)
+        cls.paths = [os.path.join(cls.tmp.name, name) for name in ("trace.csv", "trace.npy")]
+        for path in cls.paths:
+            write_trace(path, cls.trace)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_read_back_in_chunks(self):
+        for path in self.paths:
+            chunks = list(read_trace(path, chunk_size=700))
+            self.assertEqual([len(chunk[0]) for chunk in chunks], [700] * 8 + [400])
+            for k, name in enumerate(TRACE_DTYPE.names):
+                # CSV times come back to the last bit or so
+                np.testing.assert_allclose(np.concatenate([chunk[k] for chunk in chunks]), self.trace[name], rtol=1e-14)
+
+    def test_matches_event_by_event_replay(self):
+        # the same layout replayed by hand, one event at a time
+        random.seed(3)
+        PL = ParkingLot(10, 30, 10)
+        parked = {}
+        rejected = 0
+        for event in self.trace:
+            if event["event"] == ARRIVAL:
+                vehicle = VEHICLE_BY_SIZE[int(event["size"])]()
+                if PL.park_new_vec(vehicle):
+                    parked[int(event["vehicle"])] = vehicle
+                else:
+                    rejected += 1
+            elif int(event["vehicle"]) in parked:
+                PL.unpark(parked.pop(int(event["vehicle"])))
+
+        for path in self.paths:
+            for chunk_size in (7, 257, 10_000):
+                random.seed(3)
+                replay = replay_trace(ParkingLot(10, 30, 10), path, chunk_size=chunk_size, interval=50.0)
+                metrics = replay.getMetrics()
+                self.assertEqual(replay.events, len(self.trace))
+                self.assertEqual(metrics["arrivals"].sum(), 3000)
+                self.assertEqual(metrics["rejected"].sum(), rejected)
+                self.assertEqual(metrics["skipped_departures"].sum(), rejected)
+                self.assertEqual(metrics["parked"].sum(), metrics["departures"].sum())
+                self.assertEqual(replay.getParkedSz(), 0)
+                np.testing.assert_array_equal(np.diff(metrics["time"]), 50.0)
+
+    def test_metrics_rows_and_callback(self):
+        trace = np.zeros(5, dtype=TRACE_DTYPE)
+        trace["time"] = [1, 2, 15, 35, 36]
+        trace["event"] = [ARRIVAL, ARRIVAL, DEPARTURE, ARRIVAL, DEPARTURE]
+        trace["vehicle"] = [1, 2, 1, 3, 99]
+        trace["size"] = [2, 3, 2, 3, 1]
+        rows = []
+        replay = TraceReplay(ArrayParkingLot(0, 1, 2), interval=10.0, on_metrics=rows.append)
+        replay.feed(*(trace[name] for name in TRACE_DTYPE.names))
+        metrics = replay.finish()
+
+        self.assertEqual(rows, replay.metrics)
+        self.assertEqual(metrics["time"].tolist(), [10.0, 20.0, 30.0, 40.0])
+        self.assertEqual(metrics["arrivals"].tolist(), [2, 0, 0, 1])
+        self.assertEqual(metrics["departures"].tolist(), [0, 1, 0, 0])
+        self.assertEqual(metrics["skipped_departures"].tolist(), [0, 0, 0, 1])
+        self.assertEqual(metrics["occupied"].tolist(), [2, 1, 1, 2])
+        self.assertEqual(metrics["occupied_3"].tolist()[1:], [1, 1, 2])
+
+    def test_duplicate_arrival(self):
+        trace = np.zeros(4, dtype=TRACE_DTYPE)
+        trace["time"] = [1, 2, 3, 4]
+        trace["event"] = [ARRIVAL, ARRIVAL, DEPARTURE, ARRIVAL]
+        trace["vehicle"] = [7, 7, 7, 7]
+        trace["size"] = [2, 3, 2, 1]
+        PL = ParkingLot(1, 1, 1)
+        replay = TraceReplay(PL)
+        replay.feed(*(trace[name] for name in TRACE_DTYPE.names))
+        metrics = replay.finish()
+
+        # the second arrival of 7 is skipped, so its departure frees the first one's spot
+        self.assertEqual(metrics["duplicate_arrivals"].tolist(), [1])
+        self.assertEqual(metrics["arrivals"].tolist(), [2])
+        self.assertEqual(metrics["departures"].tolist(), [1])
+        self.assertEqual(PL.getParkedSz(), 1)
+        self.assertEqual(replay.getParkedSz(), 1)
+
+    def test_out_of_order_trace(self):
+        replay = TraceReplay(ParkingLot(1, 1, 1))
+        chunk = [np.array([5.0, 4.0]), np.array([1, 1]), np.array([1, 2]), np.array([1, 1])]
+        with self.assertRaises(ValueError):
+            replay.feed(*chunk)
+        replay.feed(np.array([5.0]), np.array([1]), np.array([1]), np.array([1]))
+        with self.assertRaises(ValueError):
+            replay.feed(np.array([4.0]), np.array([1]), np.array([2]), np.array([1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the spiral traversal: the cell-by-cell walk against the
+cached index plan, and list results against arrays, out= buffers, strided
+views and the chunked writer
+
+Run with `python spiral_printer/spiral_bench.py`, or give matrix sizes,
+e.g. `python spiral_printer/spiral_bench.py 1000 4000`.
+
+@author: Maya Galili
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+# Add the current directory to the path to import spiral_printer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from spiral_printer import spiral_walk, spiral_plan, spiralPrint, spiral_array, write_spiral
+
+
+def timed(func, *args):
+    """Run func once, returns (result, seconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_spiral(sizes=(500, 1000, 2000), repeats=5):
+    """Walk vs. plan on N x N matrices: first call (plan built) and repeated calls (plan cached)"""
+    print("⏱️  SPIRAL ORDER (N x N matrix)")
+    print(f"{'N':>6} {'walk':>10} {'plan (first)':>14} {'plan (cached)':>14} {'speedup':>9}")
+    results = []
+    for n in sizes:
+        a = np.arange(n * n).reshape(n, n)
+        walked, walk_time = timed(spiral_walk, a)
+
+        spiral_plan.cache_clear()
+        gather = lambda: a.ravel()[spiral_plan(a.shape)]
+        first, first_time = timed(gather)
+        cached_time = min(timed(gather)[1] for r in range(repeats))
+        if not np.array_equal(first, walked):
+            raise AssertionError(f"spiral plan of {n}x{n} differs from the walk")
+        print(f"{n:>6} {walk_time:>9.3f}s {first_time * 1e3:>12.1f}ms {cached_time * 1e3:>12.1f}ms "
+              f"{walk_time / cached_time:>8.0f}x")
+        results.append((n, walk_time, first_time, cached_time))
+    print()
+    return results
+
+
+def peak_memory(func, *args):
+    """Run func once under tracemalloc, returns (result, peak bytes allocated)"""
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def bench_output(n=2000, repeats=5):
+    """List vs. array results, out= buffers and strided views, and printing the result"""
+    a = np.arange(n * n, dtype=np.int32).reshape(n, n)
+    print(f"⏱️  SPIRAL RESULTS ({n} x {n} int32 matrix, {a.nbytes / 2**20:.0f} MB)")
+    spiral_array(a)
+    out = np.empty(a.size, dtype=a.dtype)
+    view = a[::2, ::-2]
+    steps = {
+        "spiralPrint (list)": lambda: spiralPrint(a),
+        "spiral_array": lambda: spiral_array(a),
+        "spiral_array(out=)": lambda: spiral_array(a, out=out),
+        "strided view": lambda: spiral_array(view),
+        "copy, then gather": lambda: spiral_array(np.ascontiguousarray(view)),
+    }
+    results = []
+    for name, step in steps.items():
+        step()
+        elapsed = min(timed(step)[1] for r in range(repeats))
+        peak = peak_memory(step)[1]
+        print(f"{name:>20}: {elapsed * 1e3:>8.1f} ms {peak / 2**20:>9.1f} MB allocated")
+        results.append((name, elapsed, peak))
+
+    with open(os.devnull, "w") as devnull:
+        printing = {
+            "join a list": lambda: print(" ".join(map(str, spiralPrint(a))), file=devnull),
+            "write_spiral": lambda: write_spiral(a, devnull),
+        }
+        for name, step in printing.items():
+            elapsed = timed(step)[1]
+            peak = peak_memory(step)[1]
+            print(f"{name:>20}: {elapsed * 1e3:>8.1f} ms {peak / 2**20:>9.1f} MB allocated")
+            results.append((name, elapsed, peak))
+    print()
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or (500, 1000, 2000)
+    bench_spiral(sizes)
+    bench_output(max(sizes))
@@ -1,166 +1,301 @@
-# -*- coding: utf-8 -*-
-"""
-Script Goal:
-Given a NXM matrix, print its cell in spiral way.
-
-Created on Tue May 29 10:39:50 2018
-@author: Maya Galili
-"""
-
-import numpy as np
-import time
-
-def index_to_coords(index, rows, cols):
-    """Convert row-by-row index to matrix coordinates (row, col)"""
-    return index // cols, index % cols
-
-def coords_to_index(row, col, cols):
-    """Convert matrix coordinates to row-by-row index"""
-    return row * cols + col
-
-def display_matrix(matrix, visited=None, current_cell=None, direction=""):
-    """Display the matrix with visual indicators for visited cells"""
-    rows, cols = matrix.shape
-    
-    # Calculate column widths for proper alignment
-    max_width = len(str(matrix.max()))
-    
-    # Create visited set if not provided
-    if visited is None:
-        visited = set()
-    
-    print("┌" + "─" * (cols * (max_width + 2) - 1) + "┐")
-    
-    for i in range(rows):
-        print("│", end="")
-        for j in range(cols):
-            cell_value = matrix[i][j]
-            cell_pos = (i, j)
-            
-            if cell_pos == current_cell:
-                # Currently being visited - highlight
-                print(f" [{cell_value:>{max_width}}]", end="")
-            elif cell_pos in visited:
-                # Already visited - mark with brackets
-                print(f" [{cell_value:>{max_width}}]", end="")
-            else:
-                # Not visited yet - normal display
-                print(f"  {cell_value:>{max_width}} ", end="")
-        print(" │")
-    
-    print("└" + "─" * (cols * (max_width + 2) - 1) + "┘")
-    
-    if direction:
-        print(f"Direction: {direction}")
-    print()
-
-def spiralPrint(a, visual=False):
-    
-#   init vars
-    N,M = a.shape  
-    mat_sz = N*M
-    i = 0 
-    j = 0
-    n = 0
-    m = 0
-    result = []
-    visited = set()
-    step = 1
-    
-    if visual:
-        print("\n🔄 SPIRAL TRAVERSAL (Visual Step-by-step):")
-        print("=" * 50)
-        print("Legend: [X] = Visited,  X  = Current,  X  = Not visited")
-        print()
-        print("Initial matrix:")
-        display_matrix(a, visited)
-    
-    while (mat_sz > 0):
-        
-#        go right
-        if mat_sz > 0:
-            if visual:
-                print(f"Step {step}: → Moving RIGHT")
-            for j in range(m,M) :
-                if mat_sz > 0:
-                    result.append(a[i][j])
-                    visited.add((i, j))
-                    if visual:
-                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
-                        display_matrix(a, visited, (i, j), "→ Right")
-                        time.sleep(1)
-                    mat_sz = mat_sz - 1;
-            n=n+1
-            if visual:
-                step += 1
-
-#        go down  
-        if (mat_sz > 0):
-            if visual:
-                print(f"Step {step}: ↓ Moving DOWN")
-            for i in range(n,N) :
-                if mat_sz > 0:
-                    result.append(a[i][j])
-                    visited.add((i, j))
-                    if visual:
-                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
-                        display_matrix(a, visited, (i, j), "↓ Down")
-                        time.sleep(1)
-                    mat_sz = mat_sz - 1;    
-            M=M-1   
-            if visual:
-                step += 1
-        
-#        go left
-        if (mat_sz > 0):           
-            if visual:
-                print(f"Step {step}: ← Moving LEFT")
-            for j in range(M-1,m-1,-1) :  
-                if mat_sz > 0:
-                    result.append(a[i][j])
-                    visited.add((i, j))
-                    if visual:
-                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
-                        display_matrix(a, visited, (i, j), "← Left")
-                        time.sleep(1)
-                    mat_sz = mat_sz - 1           
-            N=N-1 
-            if visual:
-                step += 1
-
-#        go up     
-        if (mat_sz > 0):            
-            if visual:
-                print(f"Step {step}: ↑ Moving UP")
-            for i in range(N-1,n-1,-1) :         
-                if mat_sz > 0:
-                    result.append(a[i][j])
-                    visited.add((i, j))
-                    if visual:
-                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
-                        display_matrix(a, visited, (i, j), "↑ Up")
-                        time.sleep(1)
-                    mat_sz = mat_sz - 1;   
-            m=m+1
-            if visual:
-                step += 1
-    
-    if visual:
-        print("✅ Spiral traversal complete!")
-        print(f"Final result: {' '.join(map(str, result))}")
-        print()
-    
-    return result
-
-
-# Driver Code
-if __name__ == "__main__":
-    a = np.array([
-        [1, 2, 3, 4, 5, 6],
-        [7, 8, 9, 10, 11, 12],
-        [13, 14, 15, 16, 17, 18], 
-        [19, 20, 21, 22, 23, 24]
-        ])
-        
-    result = spiralPrint(a)
-    print(" ".join(map(str, result)))
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+Script Goal:
+Given a NXM matrix, print its cell in spiral way.
+
+The spiral order of a matrix only depends on its shape, so spiral_plan()
+computes it once per shape as an array of row-by-row (flat) indices, one
+vectorized slice per side of every layer. The plans of the last
+PLAN_CACHE_SZ shapes are kept, so the spiral of a matrix whose shape was
+seen before is a single gather, a.ravel()[plan]. A plan costs 8 bytes per
+cell, so only shapes of up to PLAN_CACHE_CELLS cells count towards
+PLAN_CACHE_SZ; of the bigger shapes only the last one is kept.
+
+spiral_array() returns that gather as an array of the matrix dtype and
+can fill a caller's out= buffer instead of allocating. Strided views
+(a[::2, ::3], a.T, a[::-1]) are read in place: the plan is translated to
+element offsets from the strides of the view, so nothing is copied first.
+write_spiral() prints huge results a chunk at a time instead of joining
+one giant string.
+
+Created on Tue May 29 10:39:50 2018
+@author: Maya Galili
+"""
+
+import sys
+import numpy as np
+import time
+from functools import lru_cache, wraps
+from numpy.lib.stride_tricks import as_strided
+
+# spiral plans kept for this many matrix shapes (the least recently used is dropped)
+PLAN_CACHE_SZ = 16
+# shapes with more cells than this (8 MB of plan) are not among them - one is kept
+# at a time, so each plan cache holds at most about PLAN_CACHE_SZ * 8 MB plus one big plan
+PLAN_CACHE_CELLS = 1 << 20
+
+def index_to_coords(index, rows, cols):
+    """Convert row-by-row index to matrix coordinates (row, col)"""
+    return index // cols, index % cols
+
+def coords_to_index(row, col, cols):
+    """Convert matrix coordinates to row-by-row index"""
+    return row * cols + col
+
+def display_matrix(matrix, visited=None, current_cell=None, direction=""):
+    """Display the matrix with visual indicators for visited cells"""
+    rows, cols = matrix.shape
+    
+    # Calculate column widths for proper alignment
+    max_width = len(str(matrix.max()))
+    
+    # Create visited set if not provided
+    if visited is None:
+        visited = set()
+    
+    print("┌" + "─" * (cols * (max_width + 2) - 1) + "┐")
+    
+    for i in range(rows):
+        print("│", end="")
+        for j in range(cols):
+            cell_value = matrix[i][j]
+            cell_pos = (i, j)
+            
+            if cell_pos == current_cell:
+                # Currently being visited - highlight
+                print(f" [{cell_value:>{max_width}}]", end="")
+            elif cell_pos in visited:
+                # Already visited - mark with brackets
+                print(f" [{cell_value:>{max_width}}]", end="")
+            else:
+                # Not visited yet - normal display
+                print(f"  {cell_value:>{max_width}} ", end="")
+        print(" │")
+    
+    print("└" + "─" * (cols * (max_width + 2) - 1) + "┘")
+    
+    if direction:
+        print(f"Direction: {direction}")
+    print()
+
+def plan_cache(build):
+    """lru_cache for plans of a shape: PLAN_CACHE_SZ shapes of up to PLAN_CACHE_CELLS
+    cells, and the last bigger shape"""
+    small = lru_cache(maxsize=PLAN_CACHE_SZ)(build)
+    big = lru_cache(maxsize=1)(build)
+
+    @wraps(build)
+    def plan(shape, *args):
+        if shape[0] * shape[1] > PLAN_CACHE_CELLS:
+            return big(shape, *args)
+        return small(shape, *args)
+
+    def cache_info():
+        infos = small.cache_info(), big.cache_info()
+        return type(infos[0])(*map(sum, zip(*infos)))
+
+    def cache_clear():
+        small.cache_clear()
+        big.cache_clear()
+
+    plan.cache_info = cache_info
+    plan.cache_clear = cache_clear
+    return plan
+
+@plan_cache
+def spiral_plan(shape):
+    """Row-by-row indices of the cells of an NXM matrix in spiral order (read-only array)"""
+    N, M = shape
+    plan = np.empty(N * M, dtype=np.intp)
+    k = 0
+    for layer in range((min(N, M) + 1) // 2):
+        top, left = layer, layer
+        bottom, right = N - 1 - layer, M - 1 - layer
+        sides = [top * M + np.arange(left, right + 1),                   # right
+                 np.arange(top + 1, bottom + 1) * M + right]             # down
+        if bottom > top:
+            sides.append(bottom * M + np.arange(right - 1, left - 1, -1))  # left
+        if right > left:
+            sides.append(np.arange(bottom - 1, top, -1) * M + left)      # up
+        for side in sides:
+            plan[k:k + len(side)] = side
+            k += len(side)
+    return read_only(plan)
+
+def read_only(plan):
+    """A read-only view of a cached plan - shared by every caller, it must not be changed
+
+    np.take copies read-only indices, so the gathers use the writeable plan.base
+    """
+    view = plan.view()
+    view.setflags(write=False)
+    return view
+
+@plan_cache
+def offset_plan(shape, steps):
+    """spiral_plan of shape as element offsets in memory, for axes `steps` elements apart"""
+    rows, cols = np.divmod(spiral_plan(shape), shape[1])
+    # offsets from the cell with the lowest address
+    base = sum((n - 1) * step for n, step in zip(shape, steps) if step < 0)
+    return read_only(rows * steps[0] + cols * steps[1] - base)
+
+def flat_view(a):
+    """A 1-D view over the memory of matrix a and the (writeable) spiral plan into it
+
+    a is only copied if its strides are not whole elements (e.g. a field of a record array)
+    """
+    itemsize = a.itemsize
+    if a.size == 0 or any(stride % itemsize for stride in a.strides):
+        return np.ascontiguousarray(a).ravel(), spiral_plan(a.shape).base
+    steps = tuple(stride // itemsize for stride in a.strides)
+    if steps == (a.shape[1], 1):
+        return a.ravel(), spiral_plan(a.shape).base
+    span = 1 + sum((n - 1) * abs(step) for n, step in zip(a.shape, steps))
+    first = a[tuple(slice(n - 1, n) if step < 0 else slice(0, 1) for n, step in zip(a.shape, steps))]
+    flat = as_strided(first, shape=(span,), strides=(itemsize,), writeable=False)
+    return flat, offset_plan(a.shape, steps).base
+
+def spiral_array(a, out=None):
+    """The cells of matrix a in spiral order, as an array of its dtype (written to out if given)"""
+    a = np.asarray(a)
+    if a.ndim != 2:
+        raise ValueError(f"spiral order needs a 2-D matrix, got {a.ndim}-D")
+    flat, plan = flat_view(a)
+    # every index is in range - 'clip' skips the bounds check and the buffering of out
+    return np.take(flat, plan, out=out, mode='clip')
+
+def write_spiral(a, file=None, chunk_sz=1 << 16, sep=" "):
+    """Write the cells of a in spiral order to file (default stdout), chunk_sz cells at a time"""
+    file = file or sys.stdout
+    a = np.asarray(a)
+    if a.ndim != 2:
+        raise ValueError(f"spiral order needs a 2-D matrix, got {a.ndim}-D")
+    flat, plan = flat_view(a)
+    # one chunk buffer, filled again for every chunk
+    buffer = np.empty(min(chunk_sz, len(plan)), dtype=a.dtype)
+    for start in range(0, len(plan), chunk_sz):
+        index = plan[start:start + chunk_sz]
+        chunk = np.take(flat, index, out=buffer[:len(index)], mode='clip')
+        # Python ints and bools print like their NumPy scalars and are much faster to format
+        values = chunk.tolist() if chunk.dtype.kind in "iub" else chunk
+        if start:
+            file.write(sep)
+        file.write(sep.join(map(str, values)))
+    file.write("\n")
+
+def spiralPrint(a, visual=False):
+    """The cells of a in spiral order (a list); visual=True walks them step by step"""
+    if visual:
+        return spiral_walk(a, visual)
+    return list(spiral_array(a))
+
+def spiral_walk(a, visual=False):
+    """Walk the matrix cell by cell in spiral order, optionally drawing every step"""
+    
+#   init vars
+    N,M = a.shape  
+    mat_sz = N*M
+    i = 0 
+    j = 0
+    n = 0
+    m = 0
+    result = []
+    visited = set()
+    step = 1
+    
+    if visual:
+        print("\n🔄 SPIRAL TRAVERSAL (Visual Step-by-step):")
+        print("=" * 50)
+        print("Legend: [X] = Visited,  X  = Current,  X  = Not visited")
+        print()
+        print("Initial matrix:")
+        display_matrix(a, visited)
+    
+    while (mat_sz > 0):
+        
+#        go right
+        if mat_sz > 0:
+            if visual:
+                print(f"Step {step}: → Moving RIGHT")
+            for j in range(m,M) :
+                if mat_sz > 0:
+                    result.append(a[i][j])
+                    visited.add((i, j))
+                    if visual:
+                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
+                        display_matrix(a, visited, (i, j), "→ Right")
+                        time.sleep(1)
+                    mat_sz = mat_sz - 1;
+            n=n+1
+            if visual:
+                step += 1
+
+#        go down  
+        if (mat_sz > 0):
+            if visual:
+                print(f"Step {step}: ↓ Moving DOWN")
+            for i in range(n,N) :
+                if mat_sz > 0:
+                    result.append(a[i][j])
+                    visited.add((i, j))
+                    if visual:
+                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
+                        display_matrix(a, visited, (i, j), "↓ Down")
+                        time.sleep(1)
+                    mat_sz = mat_sz - 1;    
+            M=M-1   
+            if visual:
+                step += 1
+        
+#        go left
+        if (mat_sz > 0):           
+            if visual:
+                print(f"Step {step}: ← Moving LEFT")
+            for j in range(M-1,m-1,-1) :  
+                if mat_sz > 0:
+                    result.append(a[i][j])
+                    visited.add((i, j))
+                    if visual:
+                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
+                        display_matrix(a, visited, (i, j), "← Left")
+                        time.sleep(1)
+                    mat_sz = mat_sz - 1           
+            N=N-1 
+            if visual:
+                step += 1
+
+#        go up     
+        if (mat_sz > 0):            
+            if visual:
+                print(f"Step {step}: ↑ Moving UP")
+            for i in range(N-1,n-1,-1) :         
+                if mat_sz > 0:
+                    result.append(a[i][j])
+                    visited.add((i, j))
+                    if visual:
+                        print(f"  Visiting cell ({i},{j}) = {a[i][j]}")
+                        display_matrix(a, visited, (i, j), "↑ Up")
+                        time.sleep(1)
+                    mat_sz = mat_sz - 1;   
+            m=m+1
+            if visual:
+                step += 1
+    
+    if visual:
+        print("✅ Spiral traversal complete!")
+        print(f"Final result: {' '.join(map(str, result))}")
+        print()
+    
+    return result
+
+
+# Driver Code
+if __name__ == "__main__":
+    a = np.array([
+        [1, 2, 3, 4, 5, 6],
+        [7, 8, 9, 10, 11, 12],
+        [13, 14, 15, 16, 17, 18], 
+        [19, 20, 21, 22, 23, 24]
+        ])
+        
+    write_spiral(a)
\ No newline at end of file
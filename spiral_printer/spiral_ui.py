@@ -16,7 +16,7 @@ import time
 
 # Add the current directory to the path to import spiral_printer
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from spiral_printer import spiralPrint
+from spiral_printer import spiralPrint, write_spiral
 
 def get_user_input():
     """Get user input for matrix configuration"""
@@ -127,12 +127,11 @@ def run_simulation(rows, cols, display_mode):
     if display_mode == 1:  # Show only spiral output
         print("🔄 SPIRAL OUTPUT:")
         print("-" * 20)
-        result = spiralPrint(matrix)
-        print(" ".join(map(str, result)))
+        write_spiral(matrix)
         print("\n")
         
     elif display_mode == 2:  # Show visual step-by-step
-        result = spiralPrint(matrix, visual=True)
+        spiralPrint(matrix, visual=True)
     
     # Display statistics
     print("=" * 60)
@@ -0,0 +1,91 @@
+import io
+import unittest
+import numpy as np
+
+import spiral_printer
+from spiral_printer import PLAN_CACHE_SZ, spiralPrint, spiral_plan, spiral_walk, spiral_array, write_spiral
+
+
+class TestSpiralPrinter(unittest.TestCase):
+    def test_predefine_run(self):
+        a = np.arange(1, 25).reshape(4, 6)
+        expected = [1, 2, 3, 4, 5, 6, 12, 18, 24, 23, 22, 21, 20, 19, 13, 7, 8, 9, 10, 11, 17, 16, 15, 14]
+        self.assertEqual([int(x) for x in spiralPrint(a)], expected)
+
+    def test_plan_matches_walk(self):
+        # every shape up to 9x9, including single rows / columns and empty matrices
+        for N in range(10):
+            for M in range(10):
+                a = np.arange(N * M).reshape(N, M)
+                plan = spiral_plan((N, M))
+                self.assertEqual(plan.tolist(), [int(x) for x in spiral_walk(a)])
+                self.assertEqual(sorted(plan.tolist()), list(range(N * M)))
+
+    def test_plan_cache(self):
+        spiral_plan.cache_clear()
+        a = np.random.randint(100, size=(7, 5))
+        first = spiralPrint(a)
+        self.assertEqual(spiralPrint(a + 1), [x + 1 for x in first])
+        info = spiral_plan.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        self.assertIs(spiral_plan((7, 5)), spiral_plan((7, 5)))
+        with self.assertRaises(ValueError):
+            spiral_plan((7, 5))[0] = 1
+        # bounded - the oldest shapes are dropped
+        for n in range(1, PLAN_CACHE_SZ + 2):
+            spiral_plan((n, 3))
+        self.assertEqual(spiral_plan.cache_info().currsize, PLAN_CACHE_SZ)
+
+    def test_big_plans_cached_one_at_a_time(self):
+        spiral_plan.cache_clear()
+        cells = spiral_printer.PLAN_CACHE_CELLS
+        spiral_printer.PLAN_CACHE_CELLS = 20
+        try:
+            big = spiral_plan((5, 5))
+            self.assertIs(spiral_plan((5, 5)), big)
+            spiral_plan((3, 7))
+            self.assertEqual(spiral_plan.cache_info().currsize, 1)
+            self.assertIsNot(spiral_plan((5, 5)), big)
+            spiral_plan((4, 5))
+            self.assertEqual(spiral_plan.cache_info().currsize, 2)
+        finally:
+            spiral_printer.PLAN_CACHE_CELLS = cells
+
+    def test_array_keeps_dtype(self):
+        for dtype in (np.int8, np.uint16, np.float32, np.complex128, bool):
+            a = (np.arange(20) % 7).reshape(4, 5).astype(dtype)
+            result = spiral_array(a)
+            self.assertEqual(result.dtype, a.dtype)
+            self.assertTrue(np.array_equal(result, np.array(spiral_walk(a), dtype=dtype)))
+
+    def test_out_buffer(self):
+        a = np.arange(30, dtype=np.int16).reshape(5, 6)
+        out = np.empty(30, dtype=np.int16)
+        self.assertIs(spiral_array(a, out=out), out)
+        self.assertTrue(np.array_equal(out, spiral_array(a)))
+        with self.assertRaises(ValueError):
+            spiral_array(a, out=np.empty(29, dtype=np.int16))
+        with self.assertRaises(ValueError):
+            spiral_array(np.arange(8))
+
+    def test_strided_views(self):
+        a = np.random.randint(1000, size=(13, 17))
+        records = np.zeros((4, 5), dtype=[("x", "i4"), ("y", "f8")])
+        records["x"] = np.arange(20).reshape(4, 5)
+        views = [a.T, a[::2, ::3], a[::-1], a[:, ::-2], a[::-3, ::-1].T, np.asfortranarray(a),
+                 a[5:6], a[:, 4:5], a[:0], np.broadcast_to(a[0], (3, 17)), records["x"]]
+        for view in views:
+            expected = np.array(spiral_walk(np.ascontiguousarray(view)), dtype=view.dtype)
+            self.assertTrue(np.array_equal(spiral_array(view), expected), view.shape)
+
+    def test_write_spiral(self):
+        for a in (np.arange(1, 25).reshape(4, 6), np.linspace(0, 1, 35, dtype=np.float32).reshape(5, 7)[::-1]):
+            expected = " ".join(map(str, spiralPrint(a))) + "\n"
+            for chunk_sz in (1, 4, 1000):
+                out = io.StringIO()
+                write_spiral(a, out, chunk_sz=chunk_sz)
+                self.assertEqual(out.getvalue(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()